@@ -1,28 +1,67 @@
 """
 API端点
 """
-from fastapi import APIRouter, Depends, Request, HTTPException, Query
+from fastapi import APIRouter, Depends, Request, Response, HTTPException, Query
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, asc, select
 from typing import List, Optional
+from datetime import date, datetime, time, timedelta
 import math
 from enum import Enum
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
+from app.core.jobs import job_queue
+from app.scrapers.item_cache import get_item_cache
+from app.scrapers.throttle import throttle_metrics
 from app.models.sources import Source
 from app.models.posts import Post
 from app.models.products import Product
 from app.models.tag import Tag
-from app.services.product_service import ProductService
+from app.services.product_service import ProductService, ProductFilters, FEATURED_LIMIT
+from app.services.search_service import SearchService
+from app.services.source_service import SourceService
+from app.services.score_history_service import ScoreHistoryService
+from app.services.export_service import ExportService, EXPORT_MEDIA_TYPES
 from app.services.content_service import ContentService
+from app.services.tag_service import TagService
+from app.services.tag_relation_service import TagRelationService
+from app.services.task_service import TaskService
 
 # 定义排序方式的枚举类
 class ProductSortBy(str, Enum):
     latest = "latest"  # 最新添加
     popular = "popular" # 热门程度
     name = "name"     # 名称
+    trending = "trending"  # 随时间衰减的热度
+
+class TagMatchMode(str, Enum):
+    all = "all"  # 包含全部标签
+    any = "any"  # 包含任一标签
+
+class TagSortBy(str, Enum):
+    popular = "popular"  # 关联产品数量
+    name = "name"        # 名称
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"  # 每行一个JSON对象
+    csv = "csv"        # 带表头的CSV
+
+# 产品列表页过滤器中显示的标签数量
+FILTER_TAG_LIMIT = 50
+
+# 批量获取产品详情时单次请求的最大产品数量
+PRODUCT_BATCH_LIMIT = 200
+
+# 分数增速查询的最长时间窗口（小时）
+VELOCITY_MAX_HOURS = 7 * 24
+
+class ProductBatchRequest(BaseModel):
+    """批量获取产品详情的请求体"""
+    ids: List[int] = Field(..., min_length=1, max_length=PRODUCT_BATCH_LIMIT, description="产品ID列表")
 
 router = APIRouter()
 
@@ -30,20 +69,19 @@ router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 
 @router.get("/")
-async def home(request: Request, db: Session = Depends(get_db)):
+async def home(request: Request, db: AsyncSession = Depends(get_async_db)):
     """首页视图"""
-    # 获取数据源列表
-    sources = db.query(Source).filter(Source.active == True).all()
-    
-    # 获取精选产品
+    # 精选产品从预先计算的快照中按主键读取
     product_service = ProductService(db)
-    featured_products = await product_service.get_featured_products(limit=3)
+    featured_products = await product_service.get_featured_cards()
+    if featured_products is None:
+        # 快照尚未生成（如首次部署），回退为实时查询
+        featured_products = await product_service.get_featured_products(limit=FEATURED_LIMIT)
     
     return templates.TemplateResponse(
         "index.html",
         {
             "request": request, 
-            "sources": sources, 
             "products": featured_products,
             "is_featured": True
         }
@@ -56,25 +94,32 @@ async def products_page(
     tag: Optional[str] = None,
     source: Optional[str] = None,
     sort_by: Optional[ProductSortBy] = Query(ProductSortBy.latest, description="排序方式"),
-    db: Session = Depends(get_db)
+    q: Optional[str] = Query(None, max_length=200, description="搜索关键词"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """产品列表页"""
     per_page = 12
-    product_service = ProductService(db)
+    search_query = q.strip() if q else None
     
-    products_data = await product_service.get_products_with_pagination(
-        page=page,
-        per_page=per_page,
-        tag_name=tag,
-        source_name=source,
-        sort_by_value=sort_by.value if sort_by else ProductSortBy.latest.value
-    )
+    if search_query:
+        # 搜索模式：按相关度排序，忽略标签和来源过滤
+        products_data = await SearchService(db).search_products(search_query, page=page, per_page=per_page)
+        products_data["sort_by"] = None
+    else:
+        product_service = ProductService(db)
+        products_data = await product_service.get_products_with_pagination(
+            page=page,
+            per_page=per_page,
+            tag_name=tag,
+            source_name=source,
+            sort_by_value=sort_by.value if sort_by else ProductSortBy.latest.value
+        )
     
-    # 获取所有标签供过滤使用
-    tags = db.query(Tag).all()
+    # 获取最常用的标签供过滤使用
+    tags = await db.run_sync(TagService.get_popular_tags, FILTER_TAG_LIMIT)
     
     # 获取数据源列表供过滤使用
-    sources = db.query(Source).filter(Source.active == True).all()
+    sources = (await db.execute(select(Source).where(Source.active == True))).scalars().all()
     
     return templates.TemplateResponse(
         "products.html",
@@ -86,16 +131,19 @@ async def products_page(
             "current_page": page,
             "total_pages": products_data["pages"],
             "total_products": products_data["total"],
-            "filter_tag": tag,
-            "filter_source": source,
-            "current_sort": products_data["sort_by"]
+            "filter_tag": None if search_query else tag,
+            "filter_source": None if search_query else source,
+            "current_sort": products_data["sort_by"],
+            "search_query": search_query,
+            "highlights": products_data.get("highlights", {})
         }
     )
 
 @router.get("/products/{product_id}")
-async def product_detail(request: Request, product_id: int, db: Session = Depends(get_db)):
+async def product_detail(request: Request, product_id: int, db: AsyncSession = Depends(get_async_db)):
     """产品详情页"""
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product_service = ProductService(db)
+    product = await product_service.get_product_detail(product_id)
     
     if not product:
         raise HTTPException(status_code=404, detail="产品不存在")
@@ -106,20 +154,10 @@ async def product_detail(request: Request, product_id: int, db: Session = Depend
     )
 
 @router.get("/sources")
-async def sources_page(request: Request, db: Session = Depends(get_db)):
+async def sources_page(request: Request, db: AsyncSession = Depends(get_async_db)):
     """数据源页面"""
-    sources = db.query(Source).all()
-    
-    # 获取每个来源的帖子数量
-    sources_with_counts = []
-    for source in sources:
-        post_count = db.query(Post).filter(Post.source_id == source.id).count()
-        product_count = db.query(Product).join(Post).filter(Post.source_id == source.id).count()
-        sources_with_counts.append({
-            "source": source,
-            "post_count": post_count,
-            "product_count": product_count
-        })
+    # 所有来源的统计在一次分组查询中完成
+    sources_with_counts = await SourceService(db).get_source_stats()
     
     return templates.TemplateResponse(
         "sources.html",
@@ -131,113 +169,248 @@ async def sources_page(request: Request, db: Session = Depends(get_db)):
 async def api_products(
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
-    tag: Optional[str] = None,
-    source: Optional[str] = None,
+    tag: Optional[List[str]] = Query(None, description="按标签过滤，可重复传入多个"),
+    mode: TagMatchMode = Query(TagMatchMode.all, description="多个标签的匹配方式：all 包含全部，any 包含任一"),
+    source: Optional[List[str]] = Query(None, description="按来源过滤，可重复传入多个（任一匹配）"),
+    date_from: Optional[date] = Query(None, description="创建日期下限（包含）"),
+    date_to: Optional[date] = Query(None, description="创建日期上限（包含）"),
     sort_by: Optional[ProductSortBy] = Query(ProductSortBy.latest, description="排序方式"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="游标分页：首页传空字符串，之后传上一页返回的next_cursor"),
+    facets: bool = Query(True, description="是否返回标签和来源的分面数量（游标分页模式不返回）"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取产品列表API"""
     product_service = ProductService(db)
+    sort_by_value = sort_by.value if sort_by else ProductSortBy.latest.value
+    
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be later than date_to")
+    filters = ProductFilters.build(
+        tag_names=tag,
+        source_names=source,
+        tag_mode=mode.value,
+        date_from=datetime.combine(date_from, time.min) if date_from else None,
+        date_to=datetime.combine(date_to + timedelta(days=1), time.min) if date_to else None
+    )
+    
+    # 游标分页模式：不计算总数，翻页代价与页深无关
+    if cursor is not None:
+        try:
+            products_data = await product_service.get_products_with_cursor(
+                per_page=per_page,
+                cursor=cursor,
+                sort_by_value=sort_by_value,
+                filters=filters
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        return {
+            "per_page": per_page,
+            "sort_by": products_data["sort_by"],
+            "next_cursor": products_data["next_cursor"],
+            "products": products_data["products_api_format"]
+        }
+    
     products_data = await product_service.get_products_with_pagination(
         page=page,
         per_page=per_page,
-        tag_name=tag,
-        source_name=source,
-        sort_by_value=sort_by.value if sort_by else ProductSortBy.latest.value
+        sort_by_value=sort_by_value,
+        filters=filters
     )
     
-    return {
+    response = {
         "total": products_data["total"],
+        "total_is_approximate": products_data["total_is_approximate"],
         "pages": products_data["pages"],
         "page": products_data["page"],
         "per_page": per_page,
         "sort_by": products_data["sort_by"],
         "products": products_data["products_api_format"]
     }
+    if facets:
+        response["facets"] = await product_service.get_facets(filters)
+    return response
+
+@router.get("/api/search")
+async def api_search(
+    q: str = Query(..., min_length=1, max_length=200, description="搜索关键词，多个词之间用空格分隔"),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """全文搜索产品API（匹配名称、描述、解决的问题、目标受众和标签，按相关度排序）"""
+    search_data = await SearchService(db).search_products(q.strip(), page=page, per_page=per_page)
+    
+    return {
+        "query": search_data["query"],
+        "total": search_data["total"],
+        "pages": search_data["pages"],
+        "page": search_data["page"],
+        "per_page": per_page,
+        "products": search_data["products_api_format"]
+    }
+
+def _export_response(entity: str, export_format: ExportFormat, updated_since: Optional[datetime]) -> StreamingResponse:
+    """构建流式导出响应"""
+    return StreamingResponse(
+        ExportService.stream(entity, export_format.value, updated_since),
+        media_type=EXPORT_MEDIA_TYPES[export_format.value],
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{export_format.value}"'}
+    )
+
+@router.get("/api/export/products")
+def api_export_products(
+    format: ExportFormat = Query(ExportFormat.ndjson, description="导出格式：ndjson 或 csv"),
+    updated_since: Optional[datetime] = Query(None, description="只导出在该时间（UTC）之后更新的产品"),
+):
+    """流式导出全部产品（按ID顺序，不分页）"""
+    return _export_response("products", format, updated_since)
+
+@router.get("/api/export/posts")
+def api_export_posts(
+    format: ExportFormat = Query(ExportFormat.ndjson, description="导出格式：ndjson 或 csv"),
+    updated_since: Optional[datetime] = Query(None, description="只导出在该时间（UTC）之后更新的帖子"),
+):
+    """流式导出全部帖子（按ID顺序，不分页，不包含正文）"""
+    return _export_response("posts", format, updated_since)
+
+async def _product_batch_response(db: AsyncSession, ids: List[int]) -> dict:
+    """按请求顺序返回产品详情（重复的ID只返回一次），并列出不存在的ID"""
+    ids = list(dict.fromkeys(ids))
+    products = await ProductService(db).get_product_details(ids)
+    found = {product.id for product in products}
+    return {
+        "products": [ProductService.format_product_detail(product) for product in products],
+        "missing": [product_id for product_id in ids if product_id not in found]
+    }
+
+# 批量接口需在 /api/products/{product_id} 之前声明，否则 "batch" 会被当作产品ID解析
+@router.get("/api/products/batch")
+async def api_products_batch(
+    ids: List[str] = Query(..., description="产品ID，逗号分隔或重复传入，如 ids=1,2,3"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """批量获取产品详情API（按请求顺序返回）"""
+    try:
+        product_ids = [int(value) for raw in ids for value in raw.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be integers")
+    if not product_ids:
+        raise HTTPException(status_code=400, detail="ids must not be empty")
+    if len(product_ids) > PRODUCT_BATCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"At most {PRODUCT_BATCH_LIMIT} ids per request")
+    return await _product_batch_response(db, product_ids)
+
+@router.post("/api/products/batch")
+async def api_products_batch_post(request: ProductBatchRequest, db: AsyncSession = Depends(get_async_db)):
+    """批量获取产品详情API（请求体传入ID列表，适合ID较多的情况）"""
+    return await _product_batch_response(db, request.ids)
 
 @router.get("/api/products/{product_id}")
-async def api_product_detail(product_id: int, db: Session = Depends(get_db)):
+async def api_product_detail(product_id: int, db: AsyncSession = Depends(get_async_db)):
     """获取产品详情API"""
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product_service = ProductService(db)
+    product = await product_service.get_product_detail(product_id)
     
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    result = {
-        "id": product.id,
-        "name": product.name,
-        "description": product.description,
-        "problem_solved": product.problem_solved,
-        "target_audience": product.target_audience,
-        "competitive_advantage": product.competitive_advantage,
-        "potential_competitors": product.potential_competitors,
-        "business_model": product.business_model,
-        "tags": [tag.name for tag in product.tags],
-        "post": {
-            "id": product.post.id,
-            "title": product.post.title,
-            "url": product.post.url,
-            "author": product.post.author,
-            "published_at": product.post.published_at.isoformat() if product.post.published_at else None,
-            "points": product.post.points,
-            "comments_count": product.post.comments_count,
-            "source": product.post.source.name if product.post.source else None
-        } if product.post else None,
-        "created_at": product.created_at.isoformat() if product.created_at else None
-    }
-    
-    return result
+    return ProductService.format_product_detail(product)
 
 @router.get("/api/tags")
-async def api_tags(db: Session = Depends(get_db)):
+async def api_tags(
+    sort_by: Optional[TagSortBy] = Query(TagSortBy.popular, description="排序方式"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """获取所有标签API"""
-    tags = db.query(Tag).all()
-    
-    # 计算每个标签关联的产品数量
-    tags_with_counts = []
-    for tag in tags:
-        product_count = db.query(Product).join(Product.tags).filter(Tag.id == tag.id).count()
-        tags_with_counts.append({
-            "id": tag.id,
-            "name": tag.name,
+    # 产品数量由 Tag.product_count 维护，单次查询即可返回
+    stmt = select(Tag.id, Tag.name, Tag.product_count)
+    if sort_by == TagSortBy.name:
+        stmt = stmt.order_by(asc(Tag.name))
+    else:
+        stmt = stmt.order_by(desc(Tag.product_count), asc(Tag.id))
+    
+    tags_with_counts = [
+        {
+            "id": tag_id,
+            "name": name,
             "product_count": product_count
-        })
+        }
+        for tag_id, name, product_count in (await db.execute(stmt)).all()
+    ]
     
     return {"tags": tags_with_counts}
 
+@router.get("/api/tags/{tag_id}/related")
+def api_related_tags(
+    tag_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """获取相关标签API（由定时任务根据标签共现预先计算）"""
+    tag = db.query(Tag.id, Tag.name).filter(Tag.id == tag_id).first()
+    
+    if not tag:
+        raise HTTPException(status_code=404, detail="Tag not found")
+    
+    return {
+        "tag": {"id": tag.id, "name": tag.name},
+        "related": TagRelationService.get_related_tags(db, tag_id, limit=limit)
+    }
+
 @router.get("/api/sources")
-async def api_sources(db: Session = Depends(get_db)):
-    """获取所有数据源API"""
-    sources = db.query(Source).all()
-    
-    # 计算每个来源的帖子和产品数量
-    sources_with_counts = []
-    for source in sources:
-        post_count = db.query(Post).filter(Post.source_id == source.id).count()
-        product_count = db.query(Product).join(Post).filter(Post.source_id == source.id).count()
-        sources_with_counts.append({
-            "id": source.id,
-            "name": source.name,
-            "url": source.url,
-            "active": source.active,
-            "post_count": post_count,
-            "product_count": product_count
-        })
+async def api_sources(db: AsyncSession = Depends(get_async_db)):
+    """获取所有数据源API（包含帖子数、产品数、最近采集时间和近24小时/7天采集量）"""
+    stats = await SourceService(db).get_source_stats()
     
-    return {"sources": sources_with_counts}
+    return {"sources": [SourceService.format_stats_for_api(item) for item in stats]}
 
-@router.post("/api/process/{post_id}")
-async def api_process_post(post_id: int, db: Session = Depends(get_db)):
-    """处理指定帖子API"""
-    post = db.query(Post).filter(Post.id == post_id).first()
+@router.get("/api/posts/velocity")
+async def api_posts_velocity(
+    hours: int = Query(24, ge=1, le=VELOCITY_MAX_HOURS, description="统计窗口（小时）"),
+    ids: Optional[str] = Query(None, description="帖子ID，逗号分隔；不传时返回窗口内增长最快的帖子"),
+    limit: int = Query(20, ge=1, le=PRODUCT_BATCH_LIMIT, description="返回数量"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """帖子分数增速API（每小时分数和评论数增长，按分数增速降序）"""
+    post_ids = None
+    if ids:
+        try:
+            post_ids = [int(value) for value in ids.split(",") if value.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be integers")
+        if len(post_ids) > PRODUCT_BATCH_LIMIT:
+            raise HTTPException(status_code=400, detail=f"At most {PRODUCT_BATCH_LIMIT} ids per request")
     
-    if not post:
+    posts = await ScoreHistoryService(db).get_velocity(hours, post_ids, limit)
+    return {"hours": hours, "posts": posts}
+
+@router.post("/api/process/{post_id}", status_code=202)
+async def api_process_post(post_id: int, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """
+    提交帖子处理任务API
+    AI分析在后台线程中执行，立即返回任务ID，通过 /api/jobs/{job_id} 查询结果；
+    同一帖子已有排队或执行中的任务时返回该任务，不重复调用AI
+    """
+    if await db.get(Post, post_id) is None:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    service = ProductService(db)
-    product = await service.process_post(post_id)
+    job, created = job_queue.submit("process_post", post_id, TaskService.run_post_processing, post_id)
+    response.headers["Location"] = f"/api/jobs/{job.id}"
     
-    if not product:
-        raise HTTPException(status_code=500, detail="Failed to process post")
-    
-    return {"success": True, "product_id": product.id} 
\ No newline at end of file
+    return {**job.to_dict(), "post_id": post_id, "coalesced": not created}
+
+@router.get("/api/jobs/{job_id}")
+def api_job_status(job_id: str):
+    """查询后台任务状态API"""
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@router.get("/api/scrapers/metrics")
+def api_scraper_metrics():
+    """爬虫请求指标API（按主机的并发上限、熔断状态和请求计数，以及HN帖子缓存命中情况，仅反映本进程内的采集）"""
+    item_cache = get_item_cache()
+    return {"hosts": throttle_metrics(), "item_cache": item_cache.snapshot() if item_cache else None}
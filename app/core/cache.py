@@ -0,0 +1,67 @@
+"""
+缓存模块 - 提供进程内TTL缓存和产品数据变更时的统一失效入口
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from app.core.config import settings
+
+
+class TTLCache:
+    """线程安全的进程内TTL缓存，超过容量时淘汰最久未使用的条目"""
+
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        """
+        初始化缓存
+
+        Args:
+            ttl: 条目有效期（秒）
+            max_entries: 最大条目数
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """获取缓存值，不存在或已过期时返回default"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """写入缓存值"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+
+# 产品列表总数缓存，键为过滤条件
+count_cache = TTLCache(ttl=settings.COUNT_CACHE_TTL)
+
+
+def invalidate_product_caches() -> None:
+    """
+    产品数据变更（采集入库、产品处理、标签合并等）后调用，使依赖产品数据的缓存失效
+    """
+    from app.core.response_cache import bump_data_version
+
+    count_cache.clear()
+    bump_data_version()
@@ -25,15 +25,61 @@ class Settings(BaseSettings):
     # 爬虫配置
     SCRAPER_INTERVAL: int = 3600  # 默认每小时运行一次
     REQUEST_TIMEOUT: int = 30  # 请求超时时间（秒）
+    SCRAPER_MAX_CONCURRENCY: int = 10  # 每个主机的最大并发请求数（自适应并发的上限）
+    SCRAPER_MAX_RETRIES: int = 3  # 超时、429和5xx的最大重试次数
+    SCRAPER_BREAKER_THRESHOLD: int = 5  # 连续失败多少次后熔断
+    SCRAPER_BREAKER_COOLDOWN: int = 30  # 熔断后暂停的秒数，连续熔断时翻倍
+    SCRAPER_MAX_WAIT: int = 120  # 单个请求等待熔断恢复的最长秒数，超过时放弃本次采集
     USER_AGENT: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
     
+    # HackerNews 采集设置
+    HN_FEEDS: str = "show,ask,new,top,best"  # 采集的帖子列表，逗号分隔：show、ask、new、top、best
+    HN_FETCH_CONCURRENCY: int = 10  # 采集时同时请求的帖子数量
+    HN_ITEM_CACHE: bool = True  # 是否在本地缓存帖子原始数据
+    HN_ITEM_CACHE_PATH: str = "./data/hn_items.db"  # 帖子缓存文件路径
+    HN_ITEM_CACHE_MAX_MB: int = 200  # 帖子缓存大小上限（MB），超过时淘汰最早获取的条目
+    HN_ITEM_CACHE_OFFLINE: bool = False  # 只读缓存、不请求帖子详情（用于重新分析和调试）
+
+    # HackerNews 分数刷新设置
+    HN_RESCORE_INTERVAL: int = 900  # 分数刷新任务的运行间隔（秒），每个帖子的实际刷新频率随帖子年龄降低
+    HN_RESCORE_WINDOW_DAYS: int = 7  # 只刷新该天数内采集的帖子
+    HN_RESCORE_CONCURRENCY: int = 10  # 同时请求的帖子数量
+    HN_RESCORE_MAX_ITEMS: int = 300  # 每次运行最多请求的帖子数量
+    HN_RESCORE_STABLE_LIMIT: int = 3  # 连续多少次刷新未变化后按最长间隔（12小时）刷新
+    SCORE_HISTORY_DOWNSAMPLE_AFTER_HOURS: int = 48  # 早于该时长的分数样本按小时降采样
+    SCORE_HISTORY_RETENTION_DAYS: int = 30  # 分数样本保留天数
+
     # 调度器配置
     ENABLE_SCHEDULER: bool = True  # 是否启用定时任务调度器
     
     # AI设置
     ENABLE_AI_ANALYSIS: bool = True  # 是否启用AI分析
     AI_ANALYSIS_MIN_POINTS: int = 10  # 启用AI分析的最低分数要求
-    
+
+    # 标签设置
+    TAG_MERGE_WORKERS: int = 0  # 计算标签相似度的进程数，0表示使用CPU核数
+    TAG_CANONICALIZE_THRESHOLD: float = 0.0  # 新标签复用已有相似标签的阈值，0表示禁用；拼写相近的不同技术（如 preact/react 为0.91）会被误合并，启用时建议不低于0.97
+    TAG_RELATION_TOP_K: int = 10  # 每个标签保留的相关标签数量
+    TAG_RELATION_METRIC: str = "jaccard"  # 相关标签的相关度指标：jaccard 或 pmi
+    TAG_RELATION_MIN_CO_COUNT: int = 2  # 计为相关标签的最低共现次数
+
+    # 缓存设置
+    COUNT_CACHE_TTL: int = 60  # 产品列表总数缓存有效期（秒）
+    APPROXIMATE_COUNTS: bool = False  # PostgreSQL上是否使用查询计划的估算行数作为列表总数
+    APPROXIMATE_COUNT_MIN_ROWS: int = 10000  # 估算行数低于该值时仍执行精确计数
+    RESPONSE_CACHE_BACKEND: str = "memory"  # 响应缓存后端：memory、sqlite（多进程共享）或 none
+    RESPONSE_CACHE_PATH: str = "./data/response_cache.db"  # sqlite 响应缓存文件路径
+    RESPONSE_CACHE_MAX_ENTRIES: int = 512  # 响应缓存最大条目数
+
+    # 热度趋势设置
+    TRENDING_GRAVITY: float = 1.8  # 热度分数的时间衰减重力系数
+    TRENDING_WINDOW_DAYS: int = 14  # 参与热度排序的帖子发布时间窗口（天）
+    TRENDING_REFRESH_INTERVAL: int = 1800  # 热度分数重新计算间隔（秒）
+
+    # 后台任务设置
+    JOB_WORKERS: int = 2  # 同时执行的后台任务（如手动处理帖子）数量
+    JOB_HISTORY_SIZE: int = 1000  # 保留供查询的已结束任务数量
+
     # 应用设置
     DEBUG: bool = False
     LOG_LEVEL: str = "INFO"
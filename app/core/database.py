@@ -2,7 +2,9 @@
 数据库模块 - 管理数据库连接
 """
 import os
-from sqlalchemy import create_engine, pool
+from typing import Any, AsyncIterator, Optional, Union
+from sqlalchemy import create_engine, pool, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 
@@ -36,6 +38,34 @@ engine = create_engine(
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def get_async_engine_args():
+    """
+    获取异步引擎的连接URL和配置
+    SQLite 使用 aiosqlite 驱动，PostgreSQL 使用 asyncpg 驱动
+    """
+    url = make_url(settings.DATABASE_URL)
+    config = get_engine_config()
+    
+    if settings.is_sqlite:
+        url = url.set(drivername="sqlite+aiosqlite")
+    elif settings.is_postgresql:
+        url = url.set(drivername="postgresql+asyncpg")
+        # asyncpg 不识别 libpq 的 sslmode 参数，改为通过 connect_args 传入
+        sslmode = url.query.get("sslmode")
+        if sslmode:
+            url = url.difference_update_query(["sslmode"])
+            if sslmode != "disable":
+                config["connect_args"] = {"ssl": sslmode}
+    
+    return url, config
+
+# 创建异步数据库引擎（供只读页面和API使用，查询期间不阻塞事件循环）
+_async_url, _async_config = get_async_engine_args()
+async_engine = create_async_engine(_async_url, **_async_config)
+
+# 创建异步会话工厂
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 # 声明基础模型类
 Base = declarative_base()
 
@@ -47,6 +77,20 @@ def get_db() -> Session:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """获取异步数据库会话"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def execute(db: Union[Session, AsyncSession], statement: Any, params: Optional[dict] = None):
+    """
+    执行查询，同时兼容同步和异步会话
+    异步会话时等待异步驱动返回结果，同步会话时直接执行
+    """
+    if isinstance(db, AsyncSession):
+        return await db.execute(statement, params)
+    return db.execute(statement, params)
+
 def init_db():
     """初始化数据库（创建所有表）"""
     # 确保数据目录存在（仅对 SQLite）
@@ -57,7 +101,7 @@ def init_db():
             os.makedirs(db_dir, exist_ok=True)
     
     # 导入所有模型以确保它们被注册
-    from app.models import base, sources, posts, products, tag, associations
+    from app.models import base, sources, posts, products, tag, associations, featured, product_card, post_score_sample
     
     # 创建所有表
     Base.metadata.create_all(bind=engine) 
\ No newline at end of file
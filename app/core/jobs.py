@@ -0,0 +1,139 @@
+"""
+后台任务模块 - 在线程池中执行耗时操作（如AI分析），请求只负责提交任务并立即返回任务ID
+
+- 同一键（如同一帖子）在排队或执行中的任务只有一个，重复提交直接返回已有任务（singleflight）；
+- 任务状态保存在进程内，已结束的任务保留最近 JOB_HISTORY_SIZE 条供查询；
+- 多进程部署时任务状态不在进程间共享，查询请求需要落到提交任务的进程（或使用单个Web进程）。
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.logger import logger
+
+# 任务状态
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """后台任务"""
+    id: str
+    kind: str
+    key: Hashable
+    status: str = JOB_QUEUED
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为API返回格式"""
+        def iso(value: Optional[datetime]) -> Optional[str]:
+            return value.isoformat() if value else None
+
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": iso(self.created_at),
+            "started_at": iso(self.started_at),
+            "finished_at": iso(self.finished_at),
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class JobQueue:
+    """线程池后台任务队列，按键合并重复提交的任务"""
+
+    def __init__(self, max_workers: int = 2, history_size: int = 1000):
+        """
+        初始化任务队列
+
+        Args:
+            max_workers: 同时执行的任务数量
+            history_size: 保留的已结束任务数量
+        """
+        self.history_size = history_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, Hashable], str] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, key: Hashable, func: Callable[..., Optional[Dict[str, Any]]], *args) -> Tuple[Job, bool]:
+        """
+        提交任务，同一 (kind, key) 已有排队或执行中的任务时不重复提交
+
+        Args:
+            kind: 任务类型
+            key: 合并键
+            func: 在工作线程中执行的函数，返回值作为任务结果，抛出异常时任务失败
+
+        Returns:
+            (任务, 是否为新提交的任务)
+        """
+        with self._lock:
+            job_id = self._inflight.get((kind, key))
+            if job_id is not None:
+                return self._jobs[job_id], False
+
+            job = Job(id=uuid.uuid4().hex, kind=kind, key=key)
+            self._jobs[job.id] = job
+            self._inflight[(kind, key)] = job.id
+            self._evict_finished()
+
+        self._executor.submit(self._run, job, func, args)
+        return job, True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """按ID查询任务"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: Job, func: Callable, args: tuple) -> None:
+        """在工作线程中执行任务并记录状态"""
+        with self._lock:
+            job.status = JOB_RUNNING
+            job.started_at = datetime.utcnow()
+        try:
+            result = func(*args)
+            status, error = JOB_SUCCEEDED, None
+        except Exception as e:
+            logger.error(f"后台任务 {job.kind}:{job.key} ({job.id}) 执行失败: {e}")
+            result, status, error = None, JOB_FAILED, str(e)
+        with self._lock:
+            job.result = result
+            job.error = error
+            job.status = status
+            job.finished_at = datetime.utcnow()
+            self._inflight.pop((job.kind, job.key), None)
+
+    def _evict_finished(self) -> None:
+        """已结束的任务超过保留数量时淘汰最早提交的（调用方持有锁）"""
+        excess = len(self._jobs) - len(self._inflight) - self.history_size
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:excess]:
+            del self._jobs[job_id]
+
+    def shutdown(self, wait: bool = False) -> None:
+        """关闭线程池，未开始的任务被取消"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# 全局任务队列
+job_queue = JobQueue(settings.JOB_WORKERS, settings.JOB_HISTORY_SIZE)
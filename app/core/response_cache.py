@@ -0,0 +1,273 @@
+"""
+响应缓存模块 - 缓存只读页面和API的响应，并支持强ETag和304协商
+
+产品数据只在采集入库、产品处理和标签合并时变化，因此缓存不按时间失效，而是使用一个全局的数据版本号：
+写入方通过 invalidate_product_caches() 递增版本号，缓存键中包含版本号，旧版本的条目随之失效。
+
+提供两种后端：
+- memory: 进程内缓存，适合单进程部署，版本号只在当前进程内有效；
+- sqlite: 基于本地SQLite文件的共享缓存，Web进程和独立运行的调度器进程（scripts/run_scheduler.py）
+  共享同一个版本号和缓存条目，调度器写入数据后Web进程立即可见。
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import settings
+from app.utils.logger import logger
+
+# 可缓存的路由（仅GET请求）；来源统计包含按时间滚动的采集量，不适合按版本号缓存，由总数缓存按 COUNT_CACHE_TTL 过期
+CACHEABLE_PATHS = re.compile(r"^/(products|api/products(/\d+|/batch)?|api/tags|api/search)?$")
+
+
+@dataclass
+class CachedResponse:
+    """缓存的响应内容"""
+    body: bytes
+    media_type: str
+    etag: str
+    created_at: float
+
+
+class ResponseCacheBackend:
+    """响应缓存后端基类"""
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        raise NotImplementedError
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        raise NotImplementedError
+
+    def get_version(self) -> int:
+        """获取当前数据版本号"""
+        raise NotImplementedError
+
+    def bump_version(self) -> int:
+        """递增数据版本号并清除旧条目，返回新版本号"""
+        raise NotImplementedError
+
+
+class MemoryResponseCache(ResponseCacheBackend):
+    """进程内响应缓存，超过容量时淘汰最久未使用的条目"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_version(self) -> int:
+        return self._version
+
+    def bump_version(self) -> int:
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            return self._version
+
+
+class SQLiteResponseCache(ResponseCacheBackend):
+    """基于SQLite文件的共享响应缓存，可在多个进程之间共享"""
+
+    def __init__(self, path: str, max_entries: int = 512):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, body BLOB NOT NULL, media_type TEXT NOT NULL, "
+                "etag TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute("INSERT OR IGNORE INTO meta (name, value) VALUES ('version', 0)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """每个线程使用独立的连接"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        row = self._connect().execute(
+            "SELECT body, media_type, etag, created_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(body=row[0], media_type=row[1], etag=row[2], created_at=row[3])
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, body, media_type, etag, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, entry.body, entry.media_type, entry.etag, entry.created_at)
+            )
+            # 超过容量时删除最早写入的条目
+            conn.execute(
+                "DELETE FROM entries WHERE key NOT IN "
+                "(SELECT key FROM entries ORDER BY created_at DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+    def get_version(self) -> int:
+        row = self._connect().execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+        return row[0] if row else 0
+
+    def bump_version(self) -> int:
+        conn = self._connect()
+        with conn:
+            conn.execute("UPDATE meta SET value = value + 1 WHERE name = 'version'")
+            conn.execute("DELETE FROM entries")
+            return conn.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()[0]
+
+
+def create_response_cache() -> Optional[ResponseCacheBackend]:
+    """根据配置创建响应缓存后端，RESPONSE_CACHE_BACKEND 为 none 时返回None"""
+    backend = settings.RESPONSE_CACHE_BACKEND.lower()
+    if backend == "memory":
+        return MemoryResponseCache(settings.RESPONSE_CACHE_MAX_ENTRIES)
+    if backend == "sqlite":
+        try:
+            return SQLiteResponseCache(settings.RESPONSE_CACHE_PATH, settings.RESPONSE_CACHE_MAX_ENTRIES)
+        except Exception as e:
+            logger.error(f"无法初始化SQLite响应缓存，改用内存缓存: {e}")
+            return MemoryResponseCache(settings.RESPONSE_CACHE_MAX_ENTRIES)
+    if backend != "none":
+        logger.warning(f"未知的响应缓存后端 '{backend}'，响应缓存已禁用")
+    return None
+
+
+# 全局响应缓存实例
+response_cache = create_response_cache()
+
+
+def bump_data_version() -> None:
+    """递增数据版本号，使所有缓存的响应失效"""
+    if response_cache is None:
+        return
+    try:
+        response_cache.bump_version()
+    except Exception as e:
+        logger.error(f"递增响应缓存版本号失败: {e}")
+
+
+def make_cache_key(version: int, path: str, query: str) -> str:
+    """
+    生成缓存键：查询参数按参数名排序，同名参数保持原有顺序
+    （如 /api/products/batch?ids=1&ids=3 与 ids=3&ids=1 的结果顺序不同，不能共用缓存）
+    """
+    params = sorted(query.split("&"), key=lambda param: param.split("=", 1)[0]) if query else []
+    return f"{version}:{path}?{'&'.join(params)}"
+
+
+def make_etag(body: bytes) -> str:
+    """根据响应内容生成强ETag"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """判断 If-None-Match 请求头是否与ETag匹配"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (value.strip() for value in if_none_match.split(","))
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """
+    响应缓存中间件
+
+    对可缓存路由的GET请求，按 版本号+路径+查询参数 查找缓存；
+    命中时不访问数据库，直接返回缓存内容，If-None-Match 匹配时返回304。
+    """
+
+    def __init__(self, app, cache: Optional[ResponseCacheBackend] = None):
+        super().__init__(app)
+        self.cache = cache
+        self._seen_version: Optional[int] = None
+
+    async def dispatch(self, request: Request, call_next):
+        if self.cache is None or request.method != "GET" or not CACHEABLE_PATHS.match(request.url.path):
+            return await call_next(request)
+
+        try:
+            version = self.cache.get_version()
+        except Exception as e:
+            logger.error(f"读取响应缓存版本号失败: {e}")
+            return await call_next(request)
+
+        if version != self._seen_version:
+            # 其他进程（如调度器）更新了数据，同时清除当前进程的总数缓存
+            if self._seen_version is not None:
+                from app.core.cache import count_cache
+                count_cache.clear()
+            self._seen_version = version
+
+        key = make_cache_key(version, request.url.path, request.url.query)
+        if_none_match = request.headers.get("if-none-match")
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            return self._build_response(entry, if_none_match, "HIT")
+
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        entry = CachedResponse(
+            body=body,
+            media_type=response.headers.get("content-type", "application/octet-stream"),
+            etag=make_etag(body),
+            created_at=time.time()
+        )
+        # 生成响应期间数据版本已变化时不写入缓存，避免缓存旧数据
+        if self.cache.get_version() == version:
+            self.cache.set(key, entry)
+        return self._build_response(entry, if_none_match, "MISS")
+
+    @staticmethod
+    def _build_response(entry: CachedResponse, if_none_match: Optional[str], status: str) -> Response:
+        headers = {
+            "ETag": entry.etag,
+            "Cache-Control": "no-cache",
+            "X-Cache": status
+        }
+        if etag_matches(if_none_match, entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type=entry.media_type, headers=headers)
@@ -47,7 +47,12 @@ class TagNormalizer:
             if normalized_target == normalized_tag:
                 continue
             
-            similarity = TagNormalizer.calculate_similarity(normalized_target, normalized_tag)
+            # real_quick_ratio / quick_ratio 是 ratio 的上界，先用它们排除明显不相似的标签
+            matcher = SequenceMatcher(None, normalized_target, normalized_tag)
+            if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+                continue
+            
+            similarity = matcher.ratio()
             if similarity >= threshold:
                 similar_tags.append(tag)
                 
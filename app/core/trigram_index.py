@@ -0,0 +1,167 @@
+"""
+三元组（trigram）索引模块 - 提供与 PostgreSQL pg_trgm 一致的相似度计算和内存倒排索引
+
+PostgreSQL 上标签相似度搜索直接使用 pg_trgm 的 GIN 索引；
+SQLite 没有对应扩展，因此在进程内维护一个倒排索引，并在每次搜索前与数据库增量同步。
+"""
+import heapq
+import re
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+_WORD_PATTERN = re.compile(r"[^\W_]+")
+
+
+def extract_trigrams(text: str) -> FrozenSet[str]:
+    """
+    提取文本的三元组集合，规则与 pg_trgm 的 show_trgm 一致：
+    按非字母数字字符分词，每个单词前补两个空格、后补一个空格后切分
+    """
+    trigrams: Set[str] = set()
+    for word in _WORD_PATTERN.findall(text.lower()):
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            trigrams.add(padded[i:i + 3])
+    return frozenset(trigrams)
+
+
+def trigram_similarity(text1: str, text2: str) -> float:
+    """计算两个文本的三元组相似度（与 pg_trgm 的 similarity() 一致）"""
+    trigrams1 = extract_trigrams(text1)
+    trigrams2 = extract_trigrams(text2)
+    if not trigrams1 or not trigrams2:
+        return 0.0
+    shared = len(trigrams1 & trigrams2)
+    return shared / (len(trigrams1) + len(trigrams2) - shared)
+
+
+class TrigramIndex:
+    """三元组倒排索引，支持增删和 top-k 相似度查询"""
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._trigrams: Dict[int, FrozenSet[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._trigrams)
+
+    def add(self, key: int, text: str) -> None:
+        """添加或更新一个条目"""
+        self.remove(key)
+        trigrams = extract_trigrams(text)
+        self._trigrams[key] = trigrams
+        for trigram in trigrams:
+            self._postings[trigram].add(key)
+
+    def remove(self, key: int) -> None:
+        """移除一个条目（不存在时忽略）"""
+        trigrams = self._trigrams.pop(key, None)
+        if not trigrams:
+            return
+        for trigram in trigrams:
+            postings = self._postings.get(trigram)
+            if postings is not None:
+                postings.discard(key)
+                if not postings:
+                    del self._postings[trigram]
+
+    def clear(self) -> None:
+        """清空索引"""
+        self._postings.clear()
+        self._trigrams.clear()
+
+    def search(self, text: str, limit: int = 10, min_score: float = 0.3) -> List[Tuple[int, float]]:
+        """
+        查询与文本最相似的条目
+
+        Args:
+            text: 查询文本
+            limit: 返回的最大数量
+            min_score: 最低相似度
+
+        Returns:
+            按相似度降序排列的 (key, score) 列表
+        """
+        query_trigrams = extract_trigrams(text)
+        if not query_trigrams:
+            return []
+
+        shared_counts: Dict[int, int] = defaultdict(int)
+        for trigram in query_trigrams:
+            for key in self._postings.get(trigram, ()):
+                shared_counts[key] += 1
+
+        query_size = len(query_trigrams)
+        scored = []
+        for key, shared in shared_counts.items():
+            score = shared / (query_size + len(self._trigrams[key]) - shared)
+            if score >= min_score:
+                scored.append((key, score))
+
+        return heapq.nlargest(limit, scored, key=lambda item: (item[1], -item[0]))
+
+
+class TagTrigramIndex:
+    """
+    标签名称的内存三元组索引（SQLite 后端使用）
+
+    每次查询前执行一次轻量的增量同步：读取 updated_at 不早于上次同步时间的标签；
+    如果标签总数与索引不一致（说明有标签被删除或合并），则整体重建。
+    """
+
+    def __init__(self):
+        self._index = TrigramIndex()
+        self._lock = threading.Lock()
+        self._synced_at: Optional[datetime] = None
+        self._max_id = 0
+
+    def invalidate(self) -> None:
+        """丢弃索引，下次查询时整体重建"""
+        with self._lock:
+            self._index.clear()
+            self._synced_at = None
+            self._max_id = 0
+
+    def _load(self, rows: Iterable) -> None:
+        for tag_id, normalized_name, updated_at in rows:
+            self._index.add(tag_id, normalized_name or "")
+            self._max_id = max(self._max_id, tag_id)
+            if updated_at and (self._synced_at is None or updated_at > self._synced_at):
+                self._synced_at = updated_at
+
+    def sync(self, db: Session) -> None:
+        """与数据库同步索引"""
+        from app.models.tag import Tag
+
+        columns = (Tag.id, Tag.normalized_name, Tag.updated_at)
+        with self._lock:
+            if self._synced_at is not None:
+                changed = db.execute(
+                    select(*columns).where(
+                        (Tag.updated_at >= self._synced_at) | (Tag.id > self._max_id)
+                    )
+                ).all()
+                self._load(changed)
+                total = db.execute(select(func.count(Tag.id))).scalar()
+                if total == len(self._index):
+                    return
+
+            self._index.clear()
+            self._synced_at = None
+            self._max_id = 0
+            self._load(db.execute(select(*columns)).all())
+
+    def search(self, db: Session, text: str, limit: int = 10, min_score: float = 0.3) -> List[Tuple[int, float]]:
+        """同步后查询最相似的标签，返回 (tag_id, score) 列表"""
+        self.sync(db)
+        with self._lock:
+            return self._index.search(text, limit=limit, min_score=min_score)
+
+
+# 全局标签三元组索引实例
+tag_trigram_index = TagTrigramIndex()
@@ -25,11 +25,26 @@ from app.core.database import Base
 from app.models.sources import Source
 from app.models.posts import Post
 from app.models.products import Product
-from app.models.tag import Tag, TagCategory
+from app.models.tag import Tag, TagCategory, TagAlias, TagRelation
+from app.models.featured import FeaturedSnapshot
+from app.models.product_card import ProductCard
+from app.models.post_score_sample import PostScoreSample
+from app.models.search import FTS_TABLE
 # Add other models here if they exist and define tables
 
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    """全文索引对象（FTS5表、search_text生成列及其索引）由迁移中的DDL维护，不参与autogenerate比较"""
+    if type_ == "table" and name.startswith(FTS_TABLE):
+        return False
+    if type_ == "column" and name in ("search_text", "search_vector"):
+        return False
+    if type_ == "index" and name in ("ix_products_search_text_trgm", "ix_products_search_vector"):
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -52,6 +67,7 @@ def run_migrations_offline():
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -75,7 +91,8 @@ def run_migrations_online():
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
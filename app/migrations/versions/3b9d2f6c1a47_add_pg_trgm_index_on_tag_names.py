@@ -0,0 +1,37 @@
+"""Add pg_trgm index on tag names
+
+Revision ID: 3b9d2f6c1a47
+Revises: 7f85fe8a5753
+Create Date: 2026-10-19 09:12:41.503117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9d2f6c1a47'
+down_revision = '7f85fe8a5753'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 仅 PostgreSQL 需要：SQLite 使用内存三元组索引
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_tags_normalized_name_trgm',
+        'tags',
+        ['normalized_name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'normalized_name': 'gin_trgm_ops'}
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_tags_normalized_name_trgm', table_name='tags')
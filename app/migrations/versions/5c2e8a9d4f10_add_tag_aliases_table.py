@@ -0,0 +1,61 @@
+"""Add tag_aliases table
+
+Revision ID: 5c2e8a9d4f10
+Revises: 3b9d2f6c1a47
+Create Date: 2026-10-19 10:03:17.218405
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.tag_utils import TagNormalizer
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2e8a9d4f10'
+down_revision = '3b9d2f6c1a47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tag_aliases = op.create_table('tag_aliases',
+    sa.Column('alias_normalized', sa.String(), nullable=False),
+    sa.Column('alias', sa.String(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tag_aliases_id'), 'tag_aliases', ['id'], unique=False)
+    op.create_index(op.f('ix_tag_aliases_alias_normalized'), 'tag_aliases', ['alias_normalized'], unique=True)
+    op.create_index(op.f('ix_tag_aliases_tag_id'), 'tag_aliases', ['tag_id'], unique=False)
+
+    # 从 tags.aliases JSON 字段回填别名表
+    bind = op.get_bind()
+    tags = sa.table('tags', sa.column('id'), sa.column('name'), sa.column('normalized_name'), sa.column('aliases', sa.JSON))
+    now = datetime.utcnow()
+    rows = []
+    seen = set()
+    for tag_id, name, normalized_name, aliases in bind.execute(sa.select(tags.c.id, tags.c.name, tags.c.normalized_name, tags.c.aliases).order_by(tags.c.id)):
+        reserved = {normalized_name, TagNormalizer.normalize_tag_name(name or '')}
+        for alias in aliases or []:
+            alias_normalized = TagNormalizer.normalize_tag_name(alias or '')
+            if not alias_normalized or alias_normalized in seen or alias_normalized in reserved:
+                continue
+            seen.add(alias_normalized)
+            rows.append({'alias_normalized': alias_normalized, 'alias': alias, 'tag_id': tag_id,
+                         'created_at': now, 'updated_at': now})
+    if rows:
+        op.bulk_insert(tag_aliases, rows)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_tag_aliases_tag_id'), table_name='tag_aliases')
+    op.drop_index(op.f('ix_tag_aliases_alias_normalized'), table_name='tag_aliases')
+    op.drop_index(op.f('ix_tag_aliases_id'), table_name='tag_aliases')
+    op.drop_table('tag_aliases')
@@ -0,0 +1,32 @@
+"""Add product_count to tags
+
+Revision ID: 9a4f7c3e2b85
+Revises: 5c2e8a9d4f10
+Create Date: 2026-10-19 10:48:52.660913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4f7c3e2b85'
+down_revision = '5c2e8a9d4f10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('tags', sa.Column('product_count', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_tags_product_count'), 'tags', ['product_count'], unique=False)
+
+    # 根据现有的产品关联回填产品数量
+    op.execute(
+        'UPDATE tags SET product_count = '
+        '(SELECT COUNT(*) FROM product_tag WHERE product_tag.tag_id = tags.id)'
+    )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_tags_product_count'), table_name='tags')
+    op.drop_column('tags', 'product_count')
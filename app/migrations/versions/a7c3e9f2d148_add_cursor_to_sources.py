@@ -0,0 +1,24 @@
+"""Add cursor to sources
+
+Revision ID: a7c3e9f2d148
+Revises: f4b8d2a6c937
+Create Date: 2026-10-19 20:58:36.129504
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e9f2d148'
+down_revision = 'f4b8d2a6c937'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('sources', sa.Column('cursor', sa.Text(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('sources', 'cursor')
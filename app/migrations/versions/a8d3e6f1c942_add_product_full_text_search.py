@@ -0,0 +1,46 @@
+"""Add product full-text search index
+
+Revision ID: a8d3e6f1c942
+Revises: e4b19a7d6c53
+Create Date: 2026-10-19 14:26:08.517392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.search import (
+    POSTGRESQL_SEARCH_DDL,
+    POSTGRESQL_SEARCH_DROP,
+    SQLITE_SEARCH_BACKFILL,
+    SQLITE_SEARCH_DDL,
+    SQLITE_SEARCH_DROP,
+)
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8d3e6f1c942'
+down_revision = 'e4b19a7d6c53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # 生成列在添加时自动为已有行计算
+        for statement in POSTGRESQL_SEARCH_DDL:
+            op.execute(statement)
+    elif dialect == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+        op.execute(SQLITE_SEARCH_BACKFILL)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for statement in POSTGRESQL_SEARCH_DROP:
+            op.execute(statement)
+    elif dialect == 'sqlite':
+        for statement in SQLITE_SEARCH_DROP:
+            op.execute(statement)
@@ -0,0 +1,48 @@
+"""Switch PostgreSQL product search to pg_trgm
+
+Revision ID: b3f7d1c9e520
+Revises: a7c3e9f2d148
+Create Date: 2026-10-20 10:04:52.318406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.search import POSTGRESQL_SEARCH_DDL
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f7d1c9e520'
+down_revision = 'a7c3e9f2d148'
+branch_labels = None
+depends_on = None
+
+# 切换前的 tsvector 生成列及其索引，降级时恢复
+LEGACY_SEARCH_DDL = [
+    """ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(problem_solved, '') || ' ' || coalesce(target_audience, '')), 'C')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING gin (search_vector)",
+]
+
+
+def upgrade():
+    # 仅 PostgreSQL 需要：SQLite 的 FTS5 索引不变
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("DROP INDEX IF EXISTS ix_products_search_vector")
+    op.execute("ALTER TABLE products DROP COLUMN IF EXISTS search_vector")
+    # 生成列在添加时自动为已有行计算
+    for statement in POSTGRESQL_SEARCH_DDL:
+        op.execute(statement)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("DROP INDEX IF EXISTS ix_products_search_text_trgm")
+    op.execute("ALTER TABLE products DROP COLUMN IF EXISTS search_text")
+    for statement in LEGACY_SEARCH_DDL:
+        op.execute(statement)
@@ -0,0 +1,33 @@
+"""Add featured_snapshots table
+
+Revision ID: b52e7c0d9a16
+Revises: a8d3e6f1c942
+Create Date: 2026-10-19 15:02:44.731590
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b52e7c0d9a16'
+down_revision = 'a8d3e6f1c942'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('featured_snapshots',
+    sa.Column('product_ids', sa.JSON(), nullable=False),
+    sa.Column('cards', sa.JSON(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_featured_snapshots_id'), 'featured_snapshots', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_featured_snapshots_id'), table_name='featured_snapshots')
+    op.drop_table('featured_snapshots')
@@ -0,0 +1,89 @@
+"""Add product_cards read model
+
+Revision ID: c6f2a41d8e07
+Revises: b52e7c0d9a16
+Create Date: 2026-10-19 15:47:12.308154
+
+"""
+from collections import defaultdict
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6f2a41d8e07'
+down_revision = 'b52e7c0d9a16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    product_cards = op.create_table('product_cards',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('problem_solved', sa.Text(), nullable=True),
+    sa.Column('target_audience', sa.Text(), nullable=True),
+    sa.Column('concept_image_url', sa.String(length=1000), nullable=True),
+    sa.Column('tags', sa.JSON(), nullable=False),
+    sa.Column('source_id', sa.Integer(), nullable=True),
+    sa.Column('source_name', sa.String(length=100), nullable=True),
+    sa.Column('points', sa.Integer(), nullable=False),
+    sa.Column('comments_count', sa.Integer(), nullable=False),
+    sa.Column('popularity', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_product_cards_created_at_id', 'product_cards', ['created_at', 'id'], unique=False)
+    op.create_index('ix_product_cards_popularity_id', 'product_cards', ['popularity', 'id'], unique=False)
+    op.create_index('ix_product_cards_name_id', 'product_cards', ['name', 'id'], unique=False)
+    op.create_index('ix_product_cards_source_name', 'product_cards', ['source_name'], unique=False)
+
+    # 根据现有产品回填卡片
+    bind = op.get_bind()
+    products = sa.table('products', sa.column('id'), sa.column('post_id'), sa.column('name'),
+                        sa.column('description'), sa.column('problem_solved'), sa.column('target_audience'),
+                        sa.column('concept_image_url'), sa.column('created_at', sa.DateTime))
+    posts = sa.table('posts', sa.column('id'), sa.column('source_id'), sa.column('points'), sa.column('comments_count'))
+    sources = sa.table('sources', sa.column('id'), sa.column('name'))
+    product_tag = sa.table('product_tag', sa.column('product_id'), sa.column('tag_id'))
+    tags = sa.table('tags', sa.column('id'), sa.column('name'))
+
+    tags_by_product = defaultdict(list)
+    for product_id, tag_id, tag_name in bind.execute(
+        sa.select(product_tag.c.product_id, tags.c.id, tags.c.name)
+        .join(tags, tags.c.id == product_tag.c.tag_id)
+        .order_by(product_tag.c.product_id, tags.c.id)
+    ):
+        tags_by_product[product_id].append({'id': tag_id, 'name': tag_name})
+
+    now = datetime.utcnow()
+    rows = []
+    for row in bind.execute(
+        sa.select(products, posts.c.points, posts.c.comments_count,
+                  sources.c.id.label('source_id'), sources.c.name.label('source_name'))
+        .join(posts, posts.c.id == products.c.post_id)
+        .outerjoin(sources, sources.c.id == posts.c.source_id)
+    ):
+        points = row.points or 0
+        comments_count = row.comments_count or 0
+        rows.append({'id': row.id, 'name': row.name, 'description': row.description,
+                     'problem_solved': row.problem_solved, 'target_audience': row.target_audience,
+                     'concept_image_url': row.concept_image_url, 'tags': tags_by_product.get(row.id, []),
+                     'source_id': row.source_id, 'source_name': row.source_name,
+                     'points': points, 'comments_count': comments_count, 'popularity': points + comments_count,
+                     'created_at': row.created_at, 'updated_at': now})
+    if rows:
+        op.bulk_insert(product_cards, rows)
+
+
+def downgrade():
+    op.drop_index('ix_product_cards_source_name', table_name='product_cards')
+    op.drop_index('ix_product_cards_name_id', table_name='product_cards')
+    op.drop_index('ix_product_cards_popularity_id', table_name='product_cards')
+    op.drop_index('ix_product_cards_created_at_id', table_name='product_cards')
+    op.drop_table('product_cards')
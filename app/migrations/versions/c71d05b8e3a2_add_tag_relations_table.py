@@ -0,0 +1,40 @@
+"""Add tag_relations table
+
+Revision ID: c71d05b8e3a2
+Revises: 9a4f7c3e2b85
+Create Date: 2026-10-19 11:36:05.184392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c71d05b8e3a2'
+down_revision = '9a4f7c3e2b85'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tag_relations',
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.Column('related_tag_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('co_count', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['related_tag_id'], ['tags.id'], ),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('tag_id', 'related_tag_id', name='uq_tag_relations_pair')
+    )
+    op.create_index(op.f('ix_tag_relations_id'), 'tag_relations', ['id'], unique=False)
+    op.create_index('ix_tag_relations_tag_score', 'tag_relations', ['tag_id', 'score'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_tag_relations_tag_score', table_name='tag_relations')
+    op.drop_index(op.f('ix_tag_relations_id'), table_name='tag_relations')
+    op.drop_table('tag_relations')
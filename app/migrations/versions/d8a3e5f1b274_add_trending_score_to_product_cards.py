@@ -0,0 +1,27 @@
+"""Add trending_score to product_cards
+
+Revision ID: d8a3e5f1b274
+Revises: c6f2a41d8e07
+Create Date: 2026-10-19 17:05:41.552093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8a3e5f1b274'
+down_revision = 'c6f2a41d8e07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 分数由定时任务 refresh_trending_scores 计算，升级后首次运行前 trending 排序退化为按ID排序
+    op.add_column('product_cards', sa.Column('trending_score', sa.Float(), server_default='0', nullable=False))
+    op.create_index('ix_product_cards_trending_score_id', 'product_cards', ['trending_score', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_product_cards_trending_score_id', table_name='product_cards')
+    op.drop_column('product_cards', 'trending_score')
@@ -0,0 +1,26 @@
+"""Add score refresh state to posts
+
+Revision ID: e2c7b9d4f615
+Revises: d8a3e5f1b274
+Create Date: 2026-10-19 18:22:09.417736
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2c7b9d4f615'
+down_revision = 'd8a3e5f1b274'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('posts', sa.Column('score_checked_at', sa.DateTime(), nullable=True))
+    op.add_column('posts', sa.Column('score_stable_count', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    op.drop_column('posts', 'score_stable_count')
+    op.drop_column('posts', 'score_checked_at')
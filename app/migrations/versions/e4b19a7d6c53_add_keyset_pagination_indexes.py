@@ -0,0 +1,28 @@
+"""Add keyset pagination indexes
+
+Revision ID: e4b19a7d6c53
+Revises: c71d05b8e3a2
+Create Date: 2026-10-19 12:21:48.907136
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b19a7d6c53'
+down_revision = 'c71d05b8e3a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_products_created_at_id', 'products', ['created_at', 'id'], unique=False)
+    op.create_index('ix_products_name_id', 'products', ['name', 'id'], unique=False)
+    op.create_index('ix_posts_popularity', 'posts', [sa.text('(points + comments_count)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_posts_popularity', table_name='posts')
+    op.drop_index('ix_products_name_id', table_name='products')
+    op.drop_index('ix_products_created_at_id', table_name='products')
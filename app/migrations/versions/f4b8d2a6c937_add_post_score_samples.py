@@ -0,0 +1,40 @@
+"""Add post_score_samples time series
+
+Revision ID: f4b8d2a6c937
+Revises: e2c7b9d4f615
+Create Date: 2026-10-19 19:41:27.806315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4b8d2a6c937'
+down_revision = 'e2c7b9d4f615'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('post_score_samples',
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('ts', sa.DateTime(), nullable=False),
+    sa.Column('points', sa.Integer(), nullable=False),
+    sa.Column('comments_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('post_id', 'ts')
+    )
+    op.create_index('ix_post_score_samples_ts', 'post_score_samples', ['ts'], unique=False)
+
+    # 以现有分数作为每个帖子的首个样本
+    op.execute(
+        'INSERT INTO post_score_samples (post_id, ts, points, comments_count) '
+        'SELECT id, COALESCE(score_checked_at, collected_at), COALESCE(points, 0), COALESCE(comments_count, 0) '
+        'FROM posts'
+    )
+
+
+def downgrade():
+    op.drop_index('ix_post_score_samples_ts', table_name='post_score_samples')
+    op.drop_table('post_score_samples')
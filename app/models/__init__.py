@@ -7,7 +7,13 @@ from app.models.posts import Post
 from app.models.products import Product
 from app.models.tag import Tag
 from app.models.tag import TagCategory
+from app.models.tag import TagAlias
+from app.models.tag import TagRelation
+from app.models.featured import FeaturedSnapshot
+from app.models.product_card import ProductCard
+from app.models.post_score_sample import PostScoreSample
 from app.models.associations import product_tag_association
+from app.models import search  # 注册全文索引的建表事件
 
 # 在添加其他模型后从这里导入
 # from app.models.products import Product, Tag, ProductTag
@@ -0,0 +1,22 @@
+"""
+精选产品快照模型模块
+"""
+from sqlalchemy import Column, JSON
+
+from app.core.database import Base
+from app.models.base import BaseModel
+
+
+class FeaturedSnapshot(Base, BaseModel):
+    """
+    首页精选产品快照（单行表）
+    由精选产品更新任务和产品处理后刷新，首页只需按主键读取一行
+    """
+
+    __tablename__ = "featured_snapshots"
+
+    product_ids = Column(JSON, nullable=False, default=list)  # 按展示顺序排列的产品ID
+    cards = Column(JSON, nullable=False, default=list)  # 首页卡片所需的产品数据
+
+    def __repr__(self):
+        return f"<FeaturedSnapshot {self.product_ids}>"
@@ -0,0 +1,27 @@
+"""
+帖子分数时间序列模型模块
+"""
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer
+
+from app.core.database import Base
+
+
+class PostScoreSample(Base):
+    """
+    帖子分数样本 (post_id, ts, points, comments_count)
+    只在分数或评论数变化时追加（序列按阶梯函数解读，未变化的刷新不产生新行），
+    较早的样本由 ScoreHistoryService.compact 按小时降采样并按保留期删除。
+    """
+
+    __tablename__ = "post_score_samples"
+    __table_args__ = (
+        Index("ix_post_score_samples_ts", "ts"),
+    )
+
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    ts = Column(DateTime, primary_key=True)  # 采样时间（UTC）
+    points = Column(Integer, nullable=False, default=0)
+    comments_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<PostScoreSample {self.post_id} {self.ts} {self.points}>"
@@ -1,7 +1,7 @@
 """
 帖子模型模块
 """
-from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -22,6 +22,8 @@ class Post(Base, BaseModel):
     points = Column(Integer, default=0)
     comments_count = Column(Integer, default=0)
     collected_at = Column(DateTime, nullable=False)
+    score_checked_at = Column(DateTime, nullable=True)  # 最近一次刷新分数和评论数的时间（UTC）
+    score_stable_count = Column(Integer, nullable=False, default=0, server_default="0")  # 连续刷新未变化的次数
     processed = Column(Integer, default=0)  # 0-未处理, 1-已处理, 2-处理失败
     
     # 关联关系
@@ -29,4 +31,7 @@ class Post(Base, BaseModel):
     product = relationship("Product", back_populates="post", uselist=False)
     
     def __repr__(self):
-        return f"<Post {self.title}>" 
\ No newline at end of file
+        return f"<Post {self.title}>" 
+
+# 热门排序（点赞数 + 评论数）的表达式索引
+Index("ix_posts_popularity", Post.points + Post.comments_count)
@@ -0,0 +1,44 @@
+"""
+产品卡片读模型模块
+"""
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, JSON, String, Text
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class ProductCard(Base):
+    """
+    产品卡片读模型（反范式化）
+    汇总列表页所需的产品、标签、帖子和来源字段，列表查询只需读取这一张表。
+    主键即产品ID，由 ProductCardService 在产品创建、重新打标签、帖子重新评分和标签合并时同步。
+    """
+
+    __tablename__ = "product_cards"
+    __table_args__ = (
+        # 每种排序方式对应一个 (排序键, id) 索引，同时支持偏移分页和游标分页
+        Index("ix_product_cards_created_at_id", "created_at", "id"),
+        Index("ix_product_cards_popularity_id", "popularity", "id"),
+        Index("ix_product_cards_name_id", "name", "id"),
+        Index("ix_product_cards_trending_score_id", "trending_score", "id"),
+        Index("ix_product_cards_source_name", "source_name"),
+    )
+
+    id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    name = Column(String(200), nullable=False)
+    description = Column(Text, nullable=True)
+    problem_solved = Column(Text, nullable=True)
+    target_audience = Column(Text, nullable=True)
+    concept_image_url = Column(String(1000), nullable=True)
+    tags = Column(JSON, nullable=False, default=list)  # [{"id": ..., "name": ...}]，与模板中访问标签的方式一致
+    source_id = Column(Integer, nullable=True)
+    source_name = Column(String(100), nullable=True)
+    points = Column(Integer, nullable=False, default=0)
+    comments_count = Column(Integer, nullable=False, default=0)
+    popularity = Column(Integer, nullable=False, default=0)  # points + comments_count，popular 排序键
+    trending_score = Column(Float, nullable=False, default=0.0, server_default="0")  # 随时间衰减的热度，trending 排序键
+    created_at = Column(DateTime, nullable=False)  # 产品的创建时间，latest 排序键
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<ProductCard {self.id} {self.name}>"
@@ -1,7 +1,7 @@
 """
 产品模型模块
 """
-from sqlalchemy import Column, String, Integer, Text, ForeignKey
+from sqlalchemy import Column, String, Integer, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -12,6 +12,11 @@ class Product(Base, BaseModel):
     """产品模型，存储从帖子中提取的结构化产品信息"""
     
     __tablename__ = "products"
+    __table_args__ = (
+        # 游标分页按 (排序键, id) 定位，分别支持 latest 和 name 排序
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_name_id", "name", "id"),
+    )
     
     post_id = Column(Integer, ForeignKey("posts.id"), nullable=False, unique=True)
     name = Column(String(200), nullable=False, index=True)
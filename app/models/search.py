@@ -0,0 +1,101 @@
+"""
+产品全文索引定义模块
+
+- SQLite: FTS5 虚拟表 products_fts（rowid 即产品ID），使用 trigram 分词器以支持中英文混合的子串匹配，
+  由 products、product_tag、tags 三张表上的触发器保持同步；
+- PostgreSQL: products 表上的生成列 search_text（名称、描述等字段拼接的文本）及其 pg_trgm GIN 索引，
+  与 SQLite 的 trigram 分词一样支持中英文混合的子串匹配（simple 配置的 tsvector 不切分中文，也无法匹配词的一部分）；
+  标签名称通过关联表匹配。
+
+索引对象不是ORM模型，这里以DDL语句的形式定义，供 create_all 和数据库迁移共用。
+"""
+from typing import List
+
+from sqlalchemy import DDL, event
+
+from .associations import product_tag_association
+
+# SQLite FTS5 虚拟表名
+FTS_TABLE = "products_fts"
+
+# 参与全文索引的产品字段
+FTS_COLUMNS = ["name", "description", "problem_solved", "target_audience", "tags"]
+
+
+def _sqlite_insert(where: str) -> str:
+    """生成为满足条件的产品写入索引行的SQL（p 为 products 表别名）"""
+    return f"""INSERT INTO {FTS_TABLE} (rowid, name, description, problem_solved, target_audience, tags)
+    SELECT p.id, p.name, coalesce(p.description, ''), coalesce(p.problem_solved, ''),
+           coalesce(p.target_audience, ''),
+           coalesce((SELECT group_concat(t.name, ' ') FROM product_tag pt
+                     JOIN tags t ON t.id = pt.tag_id WHERE pt.product_id = p.id), '')
+    FROM products p WHERE {where}"""
+
+
+def _sqlite_refresh(where: str) -> str:
+    """生成刷新满足条件的产品索引行的SQL（先删除再写入），用于触发器"""
+    return f"""DELETE FROM {FTS_TABLE} WHERE rowid IN (SELECT p.id FROM products p WHERE {where});
+    {_sqlite_insert(where)};"""
+
+
+SQLITE_SEARCH_DDL: List[str] = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{', '.join(FTS_COLUMNS)}, tokenize='trigram')",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+    {_sqlite_refresh("p.id = NEW.id")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_au
+    AFTER UPDATE OF name, description, problem_solved, target_audience ON products BEGIN
+    {_sqlite_refresh("p.id = NEW.id")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+    DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS product_tag_fts_ai AFTER INSERT ON product_tag BEGIN
+    {_sqlite_refresh("p.id = NEW.product_id")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS product_tag_fts_ad AFTER DELETE ON product_tag BEGIN
+    {_sqlite_refresh("p.id = OLD.product_id")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tags_fts_au AFTER UPDATE OF name ON tags BEGIN
+    {_sqlite_refresh("p.id IN (SELECT product_id FROM product_tag WHERE tag_id = NEW.id)")}
+    END""",
+]
+
+# 为已有产品回填索引
+SQLITE_SEARCH_BACKFILL = _sqlite_insert("1 = 1")
+
+SQLITE_SEARCH_DROP: List[str] = [
+    "DROP TRIGGER IF EXISTS tags_fts_au",
+    "DROP TRIGGER IF EXISTS product_tag_fts_ad",
+    "DROP TRIGGER IF EXISTS product_tag_fts_ai",
+    "DROP TRIGGER IF EXISTS products_fts_ad",
+    "DROP TRIGGER IF EXISTS products_fts_au",
+    "DROP TRIGGER IF EXISTS products_fts_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+# 名称、描述、解决的问题、目标受众拼接为一列，用 pg_trgm 索引支持 ILIKE 子串匹配
+POSTGRESQL_SEARCH_DDL: List[str] = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """ALTER TABLE products ADD COLUMN IF NOT EXISTS search_text text GENERATED ALWAYS AS (
+        coalesce(name, '') || ' ' || coalesce(description, '') || ' ' ||
+        coalesce(problem_solved, '') || ' ' || coalesce(target_audience, '')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_products_search_text_trgm ON products USING gin (search_text gin_trgm_ops)",
+]
+
+# 同时删除早期版本的 tsvector 生成列及其索引
+POSTGRESQL_SEARCH_DROP: List[str] = [
+    "DROP INDEX IF EXISTS ix_products_search_text_trgm",
+    "ALTER TABLE products DROP COLUMN IF EXISTS search_text",
+    "DROP INDEX IF EXISTS ix_products_search_vector",
+    "ALTER TABLE products DROP COLUMN IF EXISTS search_vector",
+]
+
+
+# product_tag 依赖 products 和 tags，三张表都创建完成后再创建索引对象
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(product_tag_association, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in POSTGRESQL_SEARCH_DDL:
+    event.listen(product_tag_association, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
@@ -1,7 +1,7 @@
 """
 数据源模型
 """
-from sqlalchemy import Column, String, Boolean
+from sqlalchemy import Column, String, Boolean, Text
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -15,6 +15,7 @@ class Source(Base, BaseModel):
     name = Column(String(100), nullable=False, index=True)
     url = Column(String(255), nullable=False)
     active = Column(Boolean, default=True)
+    cursor = Column(Text, nullable=True)  # 增量采集的游标，由对应爬虫插件定义格式
     
     # 关联关系
     posts = relationship("Post", back_populates="source")
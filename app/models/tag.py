@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, JSON
+from sqlalchemy import Column, String, Integer, Float, ForeignKey, JSON, Index, UniqueConstraint, DDL, event
 from sqlalchemy.orm import relationship, declared_attr
 
 from ..core.database import Base
@@ -23,11 +23,22 @@ class TagCategory(Base, BaseModel):
 class Tag(Base, BaseModel):
     """标签模型"""
     __tablename__ = "tags"
+    __table_args__ = (
+        # PostgreSQL 上使用 pg_trgm 的 GIN 索引支持相似标签搜索（% 运算符）
+        Index(
+            "ix_tags_normalized_name_trgm",
+            "normalized_name",
+            postgresql_using="gin",
+            postgresql_ops={"normalized_name": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
     
     name = Column(String, index=True, nullable=False)
     normalized_name = Column(String, unique=True, index=True, nullable=False)
     description = Column(String, nullable=True)
     aliases = Column(JSON, nullable=True, default=list)
+    # 关联产品数量（由打标签和合并操作增量维护，定时任务负责校准）
+    product_count = Column(Integer, nullable=False, default=0, server_default="0", index=True)
     
     # 外键
     category_id = Column(Integer, ForeignKey("tag_categories.id"), nullable=True)
@@ -45,4 +56,46 @@ class Tag(Base, BaseModel):
         )
     
     def __repr__(self):
-        return f"<Tag {self.name}>" 
\ No newline at end of file
+        return f"<Tag {self.name}>" 
+
+
+class TagAlias(Base, BaseModel):
+    """标签别名模型，将标准化后的别名映射到标签，用于通过索引解析已合并标签的名称"""
+    __tablename__ = "tag_aliases"
+    
+    alias_normalized = Column(String, unique=True, index=True, nullable=False)
+    alias = Column(String, nullable=False)
+    tag_id = Column(Integer, ForeignKey("tags.id"), nullable=False, index=True)
+    
+    # 关系
+    tag = relationship("Tag")
+    
+    def __repr__(self):
+        return f"<TagAlias {self.alias} -> {self.tag_id}>"
+
+
+class TagRelation(Base, BaseModel):
+    """相关标签模型，存储由共现矩阵离线计算出的每个标签的 top-k 相关标签"""
+    __tablename__ = "tag_relations"
+    __table_args__ = (
+        UniqueConstraint("tag_id", "related_tag_id", name="uq_tag_relations_pair"),
+        Index("ix_tag_relations_tag_score", "tag_id", "score"),
+    )
+    
+    tag_id = Column(Integer, ForeignKey("tags.id"), nullable=False)
+    related_tag_id = Column(Integer, ForeignKey("tags.id"), nullable=False)
+    score = Column(Float, nullable=False)
+    co_count = Column(Integer, nullable=False)
+    
+    # 关系
+    related_tag = relationship("Tag", foreign_keys=[related_tag_id])
+    
+    def __repr__(self):
+        return f"<TagRelation {self.tag_id} -> {self.related_tag_id} ({self.score:.3f})>"
+
+# 创建标签表前确保 PostgreSQL 已启用 pg_trgm 扩展
+event.listen(
+    Tag.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
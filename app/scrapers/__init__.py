@@ -0,0 +1,5 @@
+"""
+爬虫插件包，导入各爬虫模块以完成注册
+"""
+from app.scrapers.registry import SCRAPERS, get_scraper, register_scraper
+from app.scrapers import hackernews  # noqa: F401
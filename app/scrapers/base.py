@@ -0,0 +1,141 @@
+"""
+爬虫插件基类
+
+每个数据源实现一个 BaseScraper 子类，用 @register_scraper 注册到与 Source.name 对应的名称下，
+由 CollectionService 为所有启用的数据源并发运行。
+"""
+import asyncio
+import random
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.sources import Source
+from app.scrapers.throttle import get_throttle, parse_retry_after
+
+# 重试的基础退避时间（秒），每次重试翻倍并加随机抖动
+RETRY_BACKOFF = 0.5
+
+
+class RateLimiter:
+    """按固定速率放行请求（每秒最多 rate 个），rate 为0表示不限速"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """等待到可以发出下一个请求"""
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class BaseScraper:
+    """
+    爬虫插件基类
+
+    子类需设置 SOURCE_NAME、SOURCE_URL，并实现 iter_posts()，逐个产出与 Post 字段一致的帖子字典
+    （original_id、title、url、content、author、published_at、points、comments_count、source_id），
+    统一的规范化和去重由采集编排负责。
+
+    增量采集的数据源可读取 self.cursor（上次成功采集后保存的游标），并把新的游标写入 self.next_cursor，
+    帖子保存成功后才会持久化到 Source.cursor。
+    """
+
+    # 数据源名称（与 Source.name 一致）和主页
+    SOURCE_NAME: str = ""
+    SOURCE_URL: str = ""
+
+    # 每秒最多请求数，0表示不限速
+    RATE_LIMIT: float = 0
+
+    def __init__(self, db: Session, source: Optional[Source] = None):
+        """
+        初始化爬虫
+
+        Args:
+            db: 数据库会话
+            source: 对应的数据源，None时按 SOURCE_NAME 查找或创建
+        """
+        self.db = db
+        self.source = source or self._get_or_create_source()
+        self.cursor: Optional[str] = self.source.cursor
+        self.next_cursor: Optional[str] = None
+        self.rate_limiter = RateLimiter(self.RATE_LIMIT)
+        self.client = httpx.AsyncClient(
+            timeout=settings.REQUEST_TIMEOUT,
+            headers={"User-Agent": settings.USER_AGENT}
+        )
+
+    def _get_or_create_source(self) -> Source:
+        """获取或创建数据源"""
+        source = self.db.query(Source).filter(Source.name == self.SOURCE_NAME).first()
+        if not source:
+            source = Source(
+                name=self.SOURCE_NAME,
+                url=self.SOURCE_URL,
+                active=True
+            )
+            self.db.add(source)
+            self.db.commit()
+            self.db.refresh(source)
+        return source
+
+    async def fetch_json(self, url: str) -> Any:
+        """
+        发出GET请求并解析JSON
+
+        请求受数据源的速率限制和主机的自适应并发控制约束；超时、连接错误、429 和 5xx 最多重试
+        SCRAPER_MAX_RETRIES 次（有 Retry-After 时按其等待），其他错误直接抛出。
+        主机熔断且短时间内无法恢复时抛出 CircuitOpenError。
+        """
+        throttle = get_throttle(urlsplit(url).netloc)
+        for attempt in range(settings.SCRAPER_MAX_RETRIES + 1):
+            await self.rate_limiter.acquire()
+            await throttle.acquire()
+            retry_after = None
+            try:
+                response = await self.client.get(url)
+            except httpx.TransportError as e:
+                throttle.release(success=False)
+                error: Exception = e
+            except BaseException:
+                # 取消等非网络错误不计入主机的健康状况
+                throttle.release(success=None)
+                raise
+            else:
+                if response.status_code == 429 or response.status_code >= 500:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    throttle.release(success=False, retry_after=retry_after)
+                    error = httpx.HTTPStatusError(
+                        f"{response.status_code} for {url}", request=response.request, response=response
+                    )
+                else:
+                    throttle.release(success=True)
+                    response.raise_for_status()
+                    return response.json()
+
+            if attempt < settings.SCRAPER_MAX_RETRIES and retry_after is None:
+                # Retry-After 由限流器统一等待，否则指数退避
+                await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt * (1 + random.random()))
+        raise error
+
+    async def iter_posts(self) -> AsyncIterator[Dict[str, Any]]:
+        """逐个产出帖子数据"""
+        raise NotImplementedError
+        yield  # pragma: no cover
+
+    async def close(self):
+        """关闭HTTP客户端"""
+        await self.client.aclose()
@@ -1,95 +1,188 @@
 """
 HackerNews API 客户端
 """
-import httpx
 import asyncio
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 
 from app.core.config import settings
-from app.models.sources import Source
+from app.scrapers.base import BaseScraper
+from app.scrapers.registry import register_scraper
+from app.scrapers.item_cache import get_item_cache
+from app.scrapers.throttle import CircuitOpenError
 from app.utils.logger import logger
 
-class HackerNewsClient:
+# 产品发布类帖子的标题前缀
+LAUNCH_TITLE_PREFIXES = ("Show HN", "Launch HN")
+
+@register_scraper
+class HackerNewsClient(BaseScraper):
     """HackerNews API 客户端，用于获取HN上的创业产品信息"""
     
+    SOURCE_NAME = "HackerNews"
+    SOURCE_URL = "https://news.ycombinator.com/"
+    
+    # 每秒最多请求数
+    RATE_LIMIT = 30
+    
     # HackerNews API基础URL
     BASE_URL = "https://hacker-news.firebaseio.com/v0"
     
-    # 获取的最大帖子数量
+    # 每个帖子列表获取的最大帖子数量
     MAX_POSTS = 100
     
     # 最小点赞数
     MIN_POINTS = 3
     
-    def __init__(self, db: Session):
-        """初始化客户端"""
-        self.db = db
-        self.source = self._get_or_create_source()
-        self.client = httpx.AsyncClient(
-            timeout=settings.REQUEST_TIMEOUT,
-            headers={"User-Agent": settings.USER_AGENT}
-        )
+    # 帖子列表名称到API路径的映射
+    FEED_ENDPOINTS = {
+        "show": "showstories",
+        "ask": "askstories",
+        "new": "newstories",
+        "top": "topstories",
+        "best": "beststories",
+    }
+    
+    # 各列表的标题过滤条件：Show HN 列表全部保留，其他列表只保留标题为产品发布的帖子
+    FEED_TITLE_PREFIXES: Dict[str, Tuple[str, ...]] = {
+        "show": (),
+        "ask": ("Launch HN",),
+        "new": LAUNCH_TITLE_PREFIXES,
+        "top": LAUNCH_TITLE_PREFIXES,
+        "best": LAUNCH_TITLE_PREFIXES,
+    }
     
-    def _get_or_create_source(self) -> Source:
-        """获取或创建HackerNews数据源"""
-        source = self.db.query(Source).filter(Source.name == "HackerNews").first()
-        if not source:
-            source = Source(
-                name="HackerNews",
-                url="https://news.ycombinator.com/",
-                active=True
-            )
-            self.db.add(source)
-            self.db.commit()
-            self.db.refresh(source)
-        return source
-    
-    async def close(self):
-        """关闭HTTP客户端"""
-        await self.client.aclose()
-    
-    async def get_show_stories(self) -> List[int]:
-        """获取Show HN类型帖子的ID列表"""
+    @classmethod
+    def configured_feeds(cls) -> List[str]:
+        """解析 HN_FEEDS 配置，忽略未知的列表名称"""
+        feeds = []
+        for feed in settings.HN_FEEDS.split(","):
+            feed = feed.strip().lower()
+            if not feed or feed in feeds:
+                continue
+            if feed not in cls.FEED_ENDPOINTS:
+                logger.warning(f"未知的HackerNews帖子列表: {feed}，已忽略")
+                continue
+            feeds.append(feed)
+        return feeds
+    
+    async def get_feed_stories(self, feed: str) -> List[int]:
+        """获取指定帖子列表的ID列表"""
         try:
-            response = await self.client.get(f"{self.BASE_URL}/showstories.json")
-            response.raise_for_status()
-            story_ids = response.json()
+            story_ids = await self.fetch_json(f"{self.BASE_URL}/{self.FEED_ENDPOINTS[feed]}.json")
             return story_ids[:self.MAX_POSTS]  # 只获取最新的N个帖子
+        except CircuitOpenError:
+            raise
         except Exception as e:
-            logger.error(f"获取Show HN帖子列表失败: {e}")
+            logger.error(f"获取HackerNews {feed} 帖子列表失败: {e}")
             return []
     
-    async def get_story_details(self, story_id: int) -> Optional[Dict[str, Any]]:
-        """获取帖子详情"""
+    async def get_story_ids(self, feeds: List[str]) -> Dict[int, List[str]]:
+        """
+        并发获取多个帖子列表并合并，同一帖子只保留一次
+        
+        Returns:
+            帖子ID到所在列表的映射（按列表顺序和列表内顺序排列）
+        """
+        id_lists = await asyncio.gather(*(self.get_feed_stories(feed) for feed in feeds))
+        story_feeds: Dict[int, List[str]] = {}
+        for feed, story_ids in zip(feeds, id_lists):
+            for story_id in story_ids:
+                story_feeds.setdefault(story_id, []).append(feed)
+        return story_feeds
+    
+    def accepts(self, story: Dict[str, Any], feeds: List[str]) -> bool:
+        """帖子满足所在任一列表的过滤条件时保留"""
+        if story.get('type') != 'story' or story.get('deleted') or story.get('dead'):
+            return False
+        if story.get('score', 0) < self.MIN_POINTS:
+            return False
+        title = story.get('title', '')
+        for feed in feeds:
+            prefixes = self.FEED_TITLE_PREFIXES[feed]
+            if not prefixes or title.startswith(prefixes):
+                return True
+        return False
+    
+    async def get_story_details(self, story_id: int, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        获取帖子详情，优先读取本地缓存，缓存过期或未命中时请求网络并写回缓存
+        
+        Args:
+            story_id: 帖子ID
+            use_cache: 为False时跳过缓存读取、总是请求网络（结果仍写回缓存）
+        """
+        cache = get_item_cache()
+        if cache and use_cache:
+            try:
+                cached = cache.get(story_id, allow_stale=settings.HN_ITEM_CACHE_OFFLINE)
+            except Exception as e:
+                logger.warning(f"读取帖子 {story_id} 缓存失败: {e}")
+                cached = None
+            if cached is not None or settings.HN_ITEM_CACHE_OFFLINE:
+                return cached
         try:
-            response = await self.client.get(f"{self.BASE_URL}/item/{story_id}.json")
-            response.raise_for_status()
-            return response.json()
+            item = await self.fetch_json(f"{self.BASE_URL}/item/{story_id}.json")
+        except CircuitOpenError:
+            # 主机熔断时放弃整个批次，而不是逐个请求失败
+            raise
         except Exception as e:
             logger.error(f"获取帖子 {story_id} 详情失败: {e}")
             return None
+        
+        if cache and isinstance(item, dict):
+            try:
+                cache.set(story_id, item)
+            except Exception as e:
+                logger.warning(f"写入帖子 {story_id} 缓存失败: {e}")
+        return item
+    
+    async def get_items(
+        self, item_ids: List[int], concurrency: int, use_cache: bool = True
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        并发获取多个帖子详情，同时进行的请求不超过 concurrency 个，结果与 item_ids 顺序一致
+        
+        use_cache 为False时跳过缓存读取，见 get_story_details
+        """
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+        async def fetch(item_id: int) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self.get_story_details(item_id, use_cache=use_cache)
+
+        tasks = [asyncio.ensure_future(fetch(item_id)) for item_id in item_ids]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            # 主机熔断等情况下放弃整个批次，取消尚未完成的请求
+            for task in tasks:
+                task.cancel()
+            raise
     
-    async def get_show_hn_posts(self) -> List[Dict[str, Any]]:
-        """获取'Show HN'类型的帖子"""
-        story_ids = await self.get_show_stories()
-        show_hn_posts = []
+    async def get_launch_posts(self) -> List[Dict[str, Any]]:
+        """获取所配置帖子列表中的产品发布类帖子，出现在多个列表中的帖子只请求一次"""
+        feeds = self.configured_feeds()
+        story_feeds = await self.get_story_ids(feeds)
         
-        # 同时获取多个帖子详情
-        tasks = [self.get_story_details(story_id) for story_id in story_ids]
-        stories = await asyncio.gather(*tasks)
+        # 去重后的ID统一并发获取详情
+        story_ids = list(story_feeds)
+        stories = await self.get_items(story_ids, settings.HN_FETCH_CONCURRENCY)
         
-        for story in stories:
+        launch_posts = []
+        failed_count = 0
+        for story_id, story in zip(story_ids, stories):
             if not story or not isinstance(story, dict):
+                failed_count += 1
                 continue
-                
-            # 只检查是否符合最低点赞数要求
-            if 'score' in story and story['score'] >= self.MIN_POINTS:
-                show_hn_posts.append(story)
+            if self.accepts(story, story_feeds[story_id]):
+                launch_posts.append(story)
         
-        logger.info(f"获取到 {len(show_hn_posts)} 个符合条件的'Show HN'帖子")
-        return show_hn_posts
+        logger.info(
+            f"从 {', '.join(feeds)} 列表获取 {len(story_ids)} 个不重复帖子，"
+            f"其中 {len(launch_posts)} 个符合条件，{failed_count} 个获取失败"
+        )
+        return launch_posts
     
     def format_post_data(self, post: Dict[str, Any]) -> Dict[str, Any]:
         """格式化帖子数据，用于存储到数据库"""
@@ -105,8 +198,13 @@ class HackerNewsClient:
             'source_id': self.source.id
         }
     
-    async def collect_show_hn_posts(self) -> List[Dict[str, Any]]:
-        """收集Show HN帖子数据"""
-        posts = await self.get_show_hn_posts()
+    async def collect_launch_posts(self) -> List[Dict[str, Any]]:
+        """收集产品发布类帖子数据"""
+        posts = await self.get_launch_posts()
         formatted_posts = [self.format_post_data(post) for post in posts]
-        return formatted_posts 
\ No newline at end of file
+        return formatted_posts
+    
+    async def iter_posts(self) -> AsyncIterator[Dict[str, Any]]:
+        """逐个产出产品发布类帖子数据（插件接口）"""
+        for post in await self.collect_launch_posts():
+            yield post
@@ -0,0 +1,165 @@
+"""
+HackerNews 帖子原始数据的本地缓存
+
+以帖子ID为键，在本地SQLite文件中保存 API 返回的原始JSON（zlib压缩）和获取时间，
+采集和回填时先读缓存，只在缓存过期时请求网络；分数刷新总是请求网络并把最新数据写回缓存：
+
+- 新鲜度随帖子年龄变化：有效期为帖子年龄的 1/12（1分钟到6小时），超过14天的帖子不再变化，缓存永久有效；
+- 文件超过 HN_ITEM_CACHE_MAX_MB 时删除最早获取的条目，直到降到上限的90%；
+- HN_ITEM_CACHE_OFFLINE 为 True 时只读缓存、不请求网络（用于重新分析和调试）。
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.utils.logger import logger
+
+# 有效期为帖子年龄的比例及上下限（秒）
+FRESHNESS_AGE_RATIO = 1 / 12
+MIN_TTL = 60
+MAX_TTL = 6 * 3600
+
+# 超过该年龄（秒）的帖子视为不再变化
+FROZEN_AGE = 14 * 24 * 3600
+
+# 每写入多少条检查一次缓存大小
+EVICTION_CHECK_INTERVAL = 256
+
+
+def freshness_ttl(item_time: Optional[float], now: float) -> Optional[float]:
+    """根据帖子发布时间计算缓存有效期（秒），None表示永久有效"""
+    age = now - item_time if item_time else 0.0
+    if age > FROZEN_AGE:
+        return None
+    return min(max(age * FRESHNESS_AGE_RATIO, MIN_TTL), MAX_TTL)
+
+
+class HNItemCache:
+    """基于SQLite文件的HN帖子缓存，多个线程和进程可共享"""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.metrics = {"hits": 0, "stale": 0, "misses": 0, "writes": 0, "evicted": 0}
+        self._writes_since_check = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS items ("
+                "id INTEGER PRIMARY KEY, payload BLOB NOT NULL, item_time REAL, "
+                "fetched_at REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_items_fetched_at ON items (fetched_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """每个线程使用独立的连接"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.metrics[name] += 1
+
+    def get(self, item_id: int, allow_stale: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存的帖子数据
+
+        Args:
+            item_id: 帖子ID
+            allow_stale: 是否返回已过期的条目
+
+        Returns:
+            帖子数据，未缓存或已过期时返回None
+        """
+        row = self._connect().execute(
+            "SELECT payload, item_time, fetched_at FROM items WHERE id = ?", (item_id,)
+        ).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+        now = time.time()
+        ttl = freshness_ttl(row[1], now)
+        if not allow_stale and ttl is not None and now - row[2] > ttl:
+            self._count("stale")
+            return None
+        self._count("hits")
+        return json.loads(zlib.decompress(row[0]))
+
+    def set(self, item_id: int, item: Dict[str, Any]) -> None:
+        """写入帖子数据，定期按大小淘汰最早获取的条目"""
+        payload = zlib.compress(json.dumps(item, separators=(",", ":")).encode("utf-8"))
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO items (id, payload, item_time, fetched_at, size) VALUES (?, ?, ?, ?, ?)",
+                (item_id, payload, item.get("time"), time.time(), len(payload))
+            )
+        with self._lock:
+            self.metrics["writes"] += 1
+            self._writes_since_check += 1
+            check = self._writes_since_check >= EVICTION_CHECK_INTERVAL
+            if check:
+                self._writes_since_check = 0
+        if check:
+            self.evict()
+
+    def evict(self) -> int:
+        """缓存超过大小上限时删除最早获取的条目，直到降到上限的90%，返回删除的条目数"""
+        conn = self._connect()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM items").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        excess = total - int(self.max_bytes * 0.9)
+        with conn:
+            # 按获取时间累计大小，删除累计值覆盖超出部分的最早条目
+            cutoff = conn.execute(
+                "SELECT fetched_at FROM ("
+                "SELECT fetched_at, SUM(size) OVER (ORDER BY fetched_at, id) AS running FROM items"
+                ") WHERE running >= ? ORDER BY fetched_at LIMIT 1",
+                (excess,)
+            ).fetchone()
+            deleted = conn.execute("DELETE FROM items WHERE fetched_at <= ?", (cutoff[0],)).rowcount
+        with self._lock:
+            self.metrics["evicted"] += deleted
+        logger.info(f"HN帖子缓存超过 {self.max_bytes} 字节，已淘汰 {deleted} 个最早获取的条目")
+        return deleted
+
+    def snapshot(self) -> Dict[str, Any]:
+        """返回条目数、大小和累计命中指标"""
+        count, size = self._connect().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM items").fetchone()
+        with self._lock:
+            return {**self.metrics, "entries": count, "bytes": size}
+
+
+_item_cache: Optional[HNItemCache] = None
+_item_cache_failed = False
+_item_cache_lock = threading.Lock()
+
+
+def get_item_cache() -> Optional[HNItemCache]:
+    """获取全局HN帖子缓存（首次调用时创建），HN_ITEM_CACHE 为 False 或初始化失败时返回None"""
+    global _item_cache, _item_cache_failed
+    if not settings.HN_ITEM_CACHE:
+        return None
+    with _item_cache_lock:
+        if _item_cache is None and not _item_cache_failed:
+            try:
+                _item_cache = HNItemCache(settings.HN_ITEM_CACHE_PATH, settings.HN_ITEM_CACHE_MAX_MB * 1024 * 1024)
+            except Exception as e:
+                _item_cache_failed = True
+                logger.error(f"无法初始化HN帖子缓存，将直接请求网络: {e}")
+        return _item_cache
@@ -0,0 +1,20 @@
+"""
+爬虫插件注册表 - 按数据源名称（不区分大小写）查找爬虫类
+"""
+from typing import Dict, Optional, Type
+
+from app.scrapers.base import BaseScraper
+
+# 数据源名称（小写）到爬虫类的映射
+SCRAPERS: Dict[str, Type[BaseScraper]] = {}
+
+
+def register_scraper(cls: Type[BaseScraper]) -> Type[BaseScraper]:
+    """注册爬虫类（类装饰器），名称取 SOURCE_NAME"""
+    SCRAPERS[cls.SOURCE_NAME.lower()] = cls
+    return cls
+
+
+def get_scraper(source_name: str) -> Optional[Type[BaseScraper]]:
+    """查找数据源对应的爬虫类，未注册时返回None"""
+    return SCRAPERS.get(source_name.lower())
@@ -0,0 +1,190 @@
+"""
+按主机的自适应限流和熔断
+
+- 并发上限按 AIMD 调整：请求成功时加性增长（每轮约 +1），超时、连接错误、429 和 5xx 时减半；
+- 429/503 响应的 Retry-After 会暂停该主机的所有请求直到指定时间；
+- 连续失败 SCRAPER_BREAKER_THRESHOLD 次后熔断，暂停 SCRAPER_BREAKER_COOLDOWN 秒（连续熔断时翻倍），
+  之后只放行一个探测请求，探测成功即恢复熔断前的并发上限，失败则继续熔断；
+- 需要等待超过 SCRAPER_MAX_WAIT 秒时抛出 CircuitOpenError，由调用方放弃本次采集而不是持续请求或长时间挂起。
+
+状态按主机保存在进程内，用线程锁保护且不绑定事件循环，调度器中同时运行的采集和刷新任务共享同一主机的限额。
+"""
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.utils.logger import logger
+
+# 熔断器状态
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+# 等待并发额度时的轮询间隔（秒）
+POLL_INTERVAL = 0.05
+
+# 连续熔断时暂停时长的上限（秒）
+MAX_COOLDOWN = 600
+
+
+class CircuitOpenError(Exception):
+    """主机已熔断且恢复时间超出可等待的范围"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 头（秒数或HTTP日期），返回需要等待的秒数"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class HostThrottle:
+    """单个主机的 AIMD 并发控制和熔断器"""
+
+    def __init__(self, host: str, max_concurrency: int):
+        self.host = host
+        self.max_concurrency = max(max_concurrency, 1)
+        self.limit = float(self.max_concurrency)
+        self.inflight = 0
+        self.state = BREAKER_CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0  # 连续熔断次数，探测成功后清零
+        self.healthy_limit = self.limit  # 开始连续失败前的并发上限，熔断恢复时还原
+        self.blocked_until = 0.0  # 熔断或 Retry-After 结束的时间（time.monotonic）
+        self.metrics: Dict[str, float] = {
+            "requests": 0, "successes": 0, "failures": 0, "throttled": 0,
+            "breaker_opens": 0, "rejected": 0, "wait_seconds": 0.0,
+        }
+        self._lock = threading.Lock()
+
+    def _try_start(self, now: float) -> Optional[float]:
+        """尝试占用一个并发额度，成功返回None，否则返回建议等待的秒数（调用方持有锁）"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.state == BREAKER_OPEN:
+            # 暂停结束，放行一个探测请求
+            self.state = BREAKER_HALF_OPEN
+            self.inflight += 1
+            return None
+        if self.state == BREAKER_HALF_OPEN or self.inflight >= int(self.limit):
+            return POLL_INTERVAL
+        self.inflight += 1
+        return None
+
+    async def acquire(self) -> None:
+        """等待并发额度；熔断恢复时间超出 SCRAPER_MAX_WAIT 时抛出 CircuitOpenError"""
+        started = time.monotonic()
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                wait = self._try_start(now)
+                if wait is None:
+                    self.metrics["requests"] += 1
+                    self.metrics["wait_seconds"] += now - started
+                    return
+                if now - started + wait > settings.SCRAPER_MAX_WAIT:
+                    self.metrics["rejected"] += 1
+                    raise CircuitOpenError(
+                        f"{self.host} 已暂停请求（已等待 {now - started:.0f} 秒，还需 {wait:.0f} 秒）"
+                    )
+            await asyncio.sleep(min(wait, 1.0))
+
+    def release(self, success: Optional[bool], retry_after: Optional[float] = None) -> None:
+        """
+        归还并发额度并记录结果
+
+        Args:
+            success: 主机是否正常响应（非超时、非429、非5xx），None表示请求被取消、不计入结果
+            retry_after: 响应要求等待的秒数
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.inflight -= 1
+            if success is None:
+                # 被取消的探测请求不改变熔断状态，由下一个请求重新探测
+                if self.state == BREAKER_HALF_OPEN:
+                    self.state = BREAKER_OPEN
+                return
+            if retry_after is not None:
+                self.metrics["throttled"] += 1
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+
+            if success:
+                self.metrics["successes"] += 1
+                self.consecutive_failures = 0
+                if self.state == BREAKER_HALF_OPEN:
+                    self.state = BREAKER_CLOSED
+                    self.trips = 0
+                    self.limit = self.healthy_limit
+                    logger.info(f"{self.host} 熔断恢复，并发上限 {int(self.limit)}")
+                else:
+                    self.limit = min(self.limit + 1.0 / self.limit, float(self.max_concurrency))
+                return
+
+            self.metrics["failures"] += 1
+            if self.state == BREAKER_OPEN:
+                # 熔断前已发出的请求失败，不重复熔断
+                return
+            if self.consecutive_failures == 0 and self.state == BREAKER_CLOSED:
+                self.healthy_limit = self.limit
+            self.consecutive_failures += 1
+            if self.state == BREAKER_HALF_OPEN or self.consecutive_failures >= settings.SCRAPER_BREAKER_THRESHOLD:
+                self._trip(now)
+            else:
+                self.limit = max(self.limit / 2, 1.0)
+
+    def _trip(self, now: float) -> None:
+        """打开熔断器（调用方持有锁）"""
+        cooldown = min(settings.SCRAPER_BREAKER_COOLDOWN * 2 ** self.trips, MAX_COOLDOWN)
+        self.state = BREAKER_OPEN
+        self.trips += 1
+        self.consecutive_failures = 0
+        self.limit = 1.0
+        self.blocked_until = max(self.blocked_until, now + cooldown)
+        self.metrics["breaker_opens"] += 1
+        logger.warning(f"{self.host} 连续请求失败，熔断 {cooldown} 秒")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """返回当前状态和累计指标"""
+        with self._lock:
+            return {
+                **self.metrics,
+                "wait_seconds": round(self.metrics["wait_seconds"], 3),
+                "state": self.state,
+                "limit": round(self.limit, 2),
+                "inflight": self.inflight,
+                "paused_for": round(max(self.blocked_until - time.monotonic(), 0.0), 1),
+            }
+
+
+_throttles: Dict[str, HostThrottle] = {}
+_throttles_lock = threading.Lock()
+
+
+def get_throttle(host: str) -> HostThrottle:
+    """获取主机对应的限流器（进程内共享）"""
+    with _throttles_lock:
+        throttle = _throttles.get(host)
+        if throttle is None:
+            throttle = _throttles[host] = HostThrottle(host, settings.SCRAPER_MAX_CONCURRENCY)
+        return throttle
+
+
+def throttle_metrics() -> Dict[str, Dict[str, Any]]:
+    """所有主机的限流和熔断指标"""
+    with _throttles_lock:
+        throttles = list(_throttles.values())
+    return {throttle.host: throttle.snapshot() for throttle in throttles}
@@ -0,0 +1,191 @@
+"""
+采集编排服务 - 在同一个事件循环中并发运行所有启用数据源的爬虫插件，并统一去重入库
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.cache import invalidate_product_caches
+from app.models.posts import Post
+from app.models.sources import Source
+from app.scrapers import SCRAPERS, get_scraper
+from app.scrapers.base import BaseScraper
+from app.scrapers.throttle import throttle_metrics
+from app.services.content_service import ContentService
+from app.services.product_card_service import ProductCardService
+from app.services.score_history_service import ScoreHistoryService
+from app.utils.logger import logger
+
+
+class CollectionService:
+    """采集编排服务"""
+
+    def __init__(self, db: Session):
+        """初始化服务"""
+        self.db = db
+
+    def _ensure_sources(self) -> None:
+        """为已注册但数据库中还没有记录的爬虫创建数据源"""
+        existing = {name.lower() for (name,) in self.db.query(Source.name).all()}
+        for name, scraper_cls in SCRAPERS.items():
+            if name not in existing:
+                self.db.add(Source(name=scraper_cls.SOURCE_NAME, url=scraper_cls.SOURCE_URL, active=True))
+                logger.info(f"已创建数据源: {scraper_cls.SOURCE_NAME}")
+        self.db.commit()
+
+    @staticmethod
+    async def _fetch(scraper: BaseScraper) -> Tuple[BaseScraper, Optional[List[Dict[str, Any]]], Optional[Exception]]:
+        """运行单个爬虫并收集全部帖子，失败时返回异常而不影响其他数据源"""
+        try:
+            return scraper, [post async for post in scraper.iter_posts()], None
+        except Exception as e:
+            return scraper, None, e
+        finally:
+            await scraper.close()
+
+    async def collect(self, source_names: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        并发运行所有启用数据源的爬虫，每个数据源采集完成后立即入库
+
+        网络请求在各爬虫之间并发进行；入库在同一会话中依次执行，单个数据源失败不影响其他数据源。
+
+        Args:
+            source_names: 只采集指定的数据源，None表示全部启用的数据源
+
+        Returns:
+            数据源名称到新保存帖子数的映射
+        """
+        self._ensure_sources()
+        query = self.db.query(Source).filter(Source.active.is_(True))
+        if source_names:
+            query = query.filter(func.lower(Source.name).in_([name.lower() for name in source_names]))
+
+        scrapers = []
+        for source in query.order_by(Source.id).all():
+            scraper_cls = get_scraper(source.name)
+            if not scraper_cls:
+                logger.warning(f"数据源 {source.name} 没有注册爬虫插件，跳过")
+                continue
+            scrapers.append(scraper_cls(self.db, source))
+
+        results: Dict[str, int] = {}
+        for task in asyncio.as_completed([self._fetch(scraper) for scraper in scrapers]):
+            scraper, posts_data, error = await task
+            if error is not None:
+                logger.error(f"采集 {scraper.source.name} 数据时出错: {error}")
+                results[scraper.source.name] = 0
+                continue
+            results[scraper.source.name] = await self.save_posts(scraper.source, posts_data, scraper.next_cursor)
+
+        logger.info(f"数据采集完成: {results}")
+        for host, metrics in throttle_metrics().items():
+            logger.info(f"{host} 请求指标: {metrics}")
+        return results
+
+    async def save_posts(self, source: Source, posts_data: List[Dict[str, Any]], cursor: Optional[str] = None) -> int:
+        """
+        规范化、去重并保存一个数据源的帖子；已存在的帖子只更新分数和评论数
+
+        Args:
+            source: 数据源
+            posts_data: 爬虫产出的帖子数据
+            cursor: 新的采集游标，与帖子在同一事务中保存，None表示不变
+
+        Returns:
+            新保存的帖子数量
+        """
+        try:
+            saved_count = 0
+            duplicate_count = 0
+            rescored_posts = []
+            new_posts = []
+
+            for post_data in posts_data:
+                # 规范化帖子数据
+                normalized_data = ContentService.normalize_post_data(source.name, post_data)
+                normalized_data['source_id'] = source.id
+
+                # 检查直接匹配的帖子是否已存在（原始ID匹配）
+                existing_post = self.db.query(Post).filter(
+                    Post.source_id == normalized_data['source_id'],
+                    Post.original_id == normalized_data['original_id']
+                ).first()
+
+                if existing_post:
+                    # 已存在的帖子只更新分数和评论数
+                    points = normalized_data.get('points', existing_post.points)
+                    comments_count = normalized_data.get('comments_count', existing_post.comments_count)
+                    if (points, comments_count) != (existing_post.points, existing_post.comments_count):
+                        existing_post.points = points
+                        existing_post.comments_count = comments_count
+                        existing_post.score_checked_at = datetime.utcnow()
+                        existing_post.score_stable_count = 0
+                        rescored_posts.append(existing_post)
+                    logger.debug(f"跳过已存在的帖子: {normalized_data['title']} (ID: {normalized_data['original_id']})")
+                    continue
+
+                # 检查URL是否重复
+                if normalized_data.get('url'):
+                    is_duplicate_url = await ContentService.is_duplicate_url(self.db, normalized_data['url'])
+                    if is_duplicate_url:
+                        logger.debug(f"跳过URL重复的帖子: {normalized_data['title']} (URL: {normalized_data['url']})")
+                        duplicate_count += 1
+                        continue
+
+                # 检查内容是否重复
+                duplicate_post = await ContentService.is_duplicate_content(
+                    self.db,
+                    normalized_data['title'],
+                    normalized_data.get('content', '')
+                )
+
+                if duplicate_post:
+                    logger.debug(f"跳过内容相似的帖子: {normalized_data['title']} (与ID: {duplicate_post.id} 相似)")
+                    duplicate_count += 1
+                    continue
+
+                # 创建新帖子
+                new_post = Post(**normalized_data)
+                self.db.add(new_post)
+                new_posts.append(new_post)
+                saved_count += 1
+
+            # 提交所有更改
+            rescored_post_ids = [post.id for post in rescored_posts]
+            if new_posts or rescored_posts:
+                self.db.flush()
+                # 新帖子记录首个分数样本，已有帖子记录变化后的分数
+                ScoreHistoryService.record_samples(
+                    self.db,
+                    [(post.id, post.points, post.comments_count) for post in new_posts + rescored_posts],
+                    datetime.utcnow()
+                )
+            if rescored_post_ids:
+                ProductCardService.refresh_scores(self.db, rescored_post_ids)
+            if cursor is not None:
+                source.cursor = cursor
+            self.db.commit()
+            if saved_count > 0 or rescored_post_ids:
+                invalidate_product_caches()
+                logger.info(
+                    f"已保存 {saved_count} 条新{source.name}帖子，更新 {len(rescored_post_ids)} 条帖子的分数，"
+                    f"跳过 {duplicate_count} 条重复帖子"
+                )
+            else:
+                logger.info(f"没有新的{source.name}帖子需要保存，跳过 {duplicate_count} 条重复帖子")
+
+            return saved_count
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"保存{source.name}帖子时出错: {e}")
+            return 0
+
+    @classmethod
+    async def run_collection(cls, db: Session) -> int:
+        """运行所有数据源的采集，可作为定时任务调用"""
+        results = await cls(db).collect()
+        return sum(results.values())
@@ -140,7 +140,8 @@ class ContentService:
     @staticmethod
     def normalize_post_data(source_name: str, post_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        根据来源规范化帖子数据
+        规范化爬虫插件产出的帖子数据
+        来源特定的字段转换由各爬虫插件在 iter_posts 中完成，这里只做所有来源通用的处理
         
         Args:
             source_name: 来源名称，如"HackerNews"、"IndieHackers"
@@ -151,23 +152,16 @@ class ContentService:
         """
         normalized_data = post_data.copy()
         
-        # 根据不同来源进行不同的处理
-        if source_name.lower() == "hackernews":
-            # HackerNews特定的数据规范化逻辑
-            if 'points' in normalized_data and normalized_data['points'] is None:
-                normalized_data['points'] = 0
-                
-            if 'comments_count' in normalized_data and normalized_data['comments_count'] is None:
-                normalized_data['comments_count'] = 0
-                
-            # 确保URL格式正确
-            if 'url' in normalized_data and normalized_data['url']:
-                normalized_data['url'] = ContentService.normalize_url(normalized_data['url'])
-                
-        elif source_name.lower() == "indiehackers":
-            # Indie Hackers特定的数据规范化逻辑
-            # 将会在实现Indie Hackers爬虫后添加
-            pass
+        # 缺失的分数和评论数按0处理
+        if 'points' in normalized_data and normalized_data['points'] is None:
+            normalized_data['points'] = 0
+            
+        if 'comments_count' in normalized_data and normalized_data['comments_count'] is None:
+            normalized_data['comments_count'] = 0
+            
+        # 确保URL格式正确
+        if 'url' in normalized_data and normalized_data['url']:
+            normalized_data['url'] = ContentService.normalize_url(normalized_data['url'])
         
         # 通用处理：去除标题和内容中的多余空白
         if 'title' in normalized_data and normalized_data['title']:
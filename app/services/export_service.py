@@ -0,0 +1,187 @@
+"""
+数据导出服务模块 - 以NDJSON或CSV格式流式导出产品和帖子
+
+导出按主键顺序逐批读取（yield_per，PostgreSQL上使用服务端游标），每批编码后立即输出，
+服务端内存占用与导出总量无关，完整导出只需一次请求，也不需要计算总数。
+
+增量导出：传入 updated_since 时只导出在该时间之后更新过的记录。时间按秒取整，
+边界上的记录可能被重复导出，消费方应按 id 覆盖写入，并以已导出记录中最大的 updated_at 作为下一次的起点。
+"""
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import String, or_, select, type_coerce
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.posts import Post
+from app.models.product_card import ProductCard
+from app.models.products import Product
+from app.models.sources import Source
+from app.utils.logger import logger
+
+# 导出格式
+EXPORT_FORMAT_NDJSON = "ndjson"
+EXPORT_FORMAT_CSV = "csv"
+
+EXPORT_MEDIA_TYPES = {
+    EXPORT_FORMAT_NDJSON: "application/x-ndjson",
+    EXPORT_FORMAT_CSV: "text/csv; charset=utf-8",
+}
+
+# 每批读取和输出的记录数
+EXPORT_BATCH_SIZE = 1000
+
+# CSV中列表字段（如标签）的分隔符
+CSV_LIST_SEPARATOR = "|"
+
+PRODUCT_EXPORT_FIELDS = [
+    "id", "post_id", "name", "description", "problem_solved", "target_audience",
+    "competitive_advantage", "potential_competitors", "business_model", "concept_image_url",
+    "tags", "source", "points", "comments_count", "created_at", "updated_at",
+]
+
+POST_EXPORT_FIELDS = [
+    "id", "source", "original_id", "title", "url", "author", "published_at",
+    "points", "comments_count", "collected_at", "processed", "created_at", "updated_at",
+]
+
+
+class ExportService:
+    """数据导出服务"""
+
+    def __init__(self, db: Session):
+        """
+        初始化导出服务
+
+        Args:
+            db: 同步数据库会话（导出在线程池中逐批执行）
+        """
+        self.db = db
+
+    def _bind_since(self, value: datetime) -> Any:
+        """
+        绑定 updated_since 比较值（带时区的值转换为UTC，按秒取整）
+        SQLite 上 updated_at 由 CURRENT_TIMESTAMP 写入，不带微秒，需按相同的文本格式绑定
+        """
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        value = value.replace(microsecond=0)
+        if self.db.get_bind().dialect.name == "sqlite":
+            return type_coerce(value.strftime("%Y-%m-%d %H:%M:%S"), String)
+        return value
+
+    def iter_products(self, updated_since: Optional[datetime] = None) -> Iterator[List[Dict[str, Any]]]:
+        """按ID顺序逐批读取产品（标签、来源和分数取自产品卡片，不逐个加载关联）"""
+        stmt = (
+            select(
+                Product.id, Product.post_id, Product.name, Product.description, Product.problem_solved,
+                Product.target_audience, Product.competitive_advantage, Product.potential_competitors,
+                Product.business_model, Product.concept_image_url,
+                ProductCard.tags, ProductCard.source_name.label("source"),
+                ProductCard.points, ProductCard.comments_count,
+                Product.created_at, Product.updated_at
+            )
+            .outerjoin(ProductCard, ProductCard.id == Product.id)
+            .order_by(Product.id)
+        )
+        if updated_since:
+            since = self._bind_since(updated_since)
+            # 重新打标签和重新评分只更新卡片，因此同时检查卡片的更新时间
+            stmt = stmt.where(or_(Product.updated_at >= since, ProductCard.updated_at >= since))
+
+        for rows in self._partitions(stmt):
+            yield [
+                {**row._asdict(), "tags": [tag["name"] for tag in row.tags or []]}
+                for row in rows
+            ]
+
+    def iter_posts(self, updated_since: Optional[datetime] = None) -> Iterator[List[Dict[str, Any]]]:
+        """按ID顺序逐批读取帖子（不包含正文）"""
+        stmt = (
+            select(
+                Post.id, Source.name.label("source"), Post.original_id, Post.title, Post.url, Post.author,
+                Post.published_at, Post.points, Post.comments_count, Post.collected_at, Post.processed,
+                Post.created_at, Post.updated_at
+            )
+            .outerjoin(Source, Source.id == Post.source_id)
+            .order_by(Post.id)
+        )
+        if updated_since:
+            stmt = stmt.where(Post.updated_at >= self._bind_since(updated_since))
+
+        for rows in self._partitions(stmt):
+            yield [row._asdict() for row in rows]
+
+    def _partitions(self, stmt) -> Iterator[list]:
+        """以 yield_per 流式执行查询，每次返回一批行"""
+        result = self.db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        try:
+            yield from result.partitions()
+        finally:
+            result.close()
+
+    @staticmethod
+    def _json_value(value: Any) -> Any:
+        return value.isoformat() if isinstance(value, datetime) else value
+
+    @staticmethod
+    def encode_ndjson(records: List[Dict[str, Any]]) -> str:
+        """将一批记录编码为NDJSON（每行一个JSON对象）"""
+        return "".join(
+            json.dumps({k: ExportService._json_value(v) for k, v in record.items()}, ensure_ascii=False) + "\n"
+            for record in records
+        )
+
+    @staticmethod
+    def encode_csv(records: List[Dict[str, Any]], fields: List[str], header: bool = False) -> str:
+        """将一批记录编码为CSV，列表字段以 CSV_LIST_SEPARATOR 连接"""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+        if header:
+            writer.writeheader()
+        for record in records:
+            writer.writerow({
+                k: CSV_LIST_SEPARATOR.join(v) if isinstance(v, list) else ExportService._json_value(v)
+                for k, v in record.items()
+            })
+        return buffer.getvalue()
+
+    @staticmethod
+    def stream(entity: str, export_format: str, updated_since: Optional[datetime] = None) -> Iterator[str]:
+        """
+        流式导出生成器，供 StreamingResponse 使用
+
+        导出可能持续到请求依赖注入的会话关闭之后，因此生成器自行创建并关闭数据库会话。
+
+        Args:
+            entity: 导出对象，products 或 posts
+            export_format: ndjson 或 csv
+            updated_since: 只导出在该时间之后更新的记录
+        """
+        db = SessionLocal()
+        exported = 0
+        try:
+            service = ExportService(db)
+            if entity == "products":
+                fields, batches = PRODUCT_EXPORT_FIELDS, service.iter_products(updated_since)
+            else:
+                fields, batches = POST_EXPORT_FIELDS, service.iter_posts(updated_since)
+
+            if export_format == EXPORT_FORMAT_CSV:
+                yield ExportService.encode_csv([], fields, header=True)
+            for records in batches:
+                exported += len(records)
+                if export_format == EXPORT_FORMAT_CSV:
+                    yield ExportService.encode_csv(records, fields)
+                else:
+                    yield ExportService.encode_ndjson(records)
+            logger.info(f"导出完成: {entity} ({export_format})，共 {exported} 条记录")
+        except Exception as e:
+            logger.error(f"导出 {entity} 时出错（已输出 {exported} 条记录）: {e}")
+            raise
+        finally:
+            db.close()
@@ -2,15 +2,28 @@
 HackerNews数据服务
 """
 import asyncio
-from datetime import datetime
-from typing import List, Dict, Any
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models.posts import Post
+from app.models.products import Product
 from app.scrapers.hackernews import HackerNewsClient
-from app.services.content_service import ContentService
+from app.services.collection_service import CollectionService
+from app.services.product_card_service import ProductCardService
+from app.services.product_service import ProductService
+from app.services.score_history_service import ScoreHistoryService
+from app.core.cache import invalidate_product_caches
 from app.utils.logger import logger
 
+# 单个帖子分数刷新间隔的上下限（小时），间隔取帖子年龄的1/4
+RESCORE_MIN_INTERVAL_HOURS = 0.25
+RESCORE_MAX_INTERVAL_HOURS = 12
+# 每批更新的帖子数量
+RESCORE_UPDATE_BATCH_SIZE = 500
+
 class HackerNewsService:
     """HackerNews数据服务类，负责从HackerNews获取并存储数据"""
     
@@ -20,72 +33,146 @@ class HackerNewsService:
         self.client = HackerNewsClient(db)
     
     async def collect_posts(self) -> int:
-        """收集并存储Show HN帖子"""
+        """收集并存储产品发布类帖子（Show HN、Launch HN）"""
         try:
             # 获取帖子数据
-            posts_data = await self.client.collect_show_hn_posts()
-            saved_count = 0
-            duplicate_count = 0
-            
-            for post_data in posts_data:
-                # 规范化帖子数据
-                normalized_data = ContentService.normalize_post_data("HackerNews", post_data)
-                
-                # 检查直接匹配的帖子是否已存在（原始ID匹配）
-                existing_post = self.db.query(Post).filter(
-                    Post.source_id == normalized_data['source_id'],
-                    Post.original_id == normalized_data['original_id']
-                ).first()
-                
-                if existing_post:
-                    logger.debug(f"跳过已存在的帖子: {normalized_data['title']} (ID: {normalized_data['original_id']})")
-                    continue
-                
-                # 检查URL是否重复
-                if normalized_data['url']:
-                    is_duplicate_url = await ContentService.is_duplicate_url(self.db, normalized_data['url'])
-                    if is_duplicate_url:
-                        logger.debug(f"跳过URL重复的帖子: {normalized_data['title']} (URL: {normalized_data['url']})")
-                        duplicate_count += 1
-                        continue
-                
-                # 检查内容是否重复
-                duplicate_post = await ContentService.is_duplicate_content(
-                    self.db, 
-                    normalized_data['title'], 
-                    normalized_data.get('content', '')
+            posts_data = await self.client.collect_launch_posts()
+            return await CollectionService(self.db).save_posts(self.client.source, posts_data)
+        
+        finally:
+            # 关闭HTTP客户端
+            await self.client.close()
+    
+    @staticmethod
+    def rescore_interval(age_hours: float, stable_count: int) -> timedelta:
+        """
+        计算帖子的分数刷新间隔：新帖子分数变化快，间隔取帖子年龄的1/4（15分钟到12小时），
+        每连续一次刷新未变化间隔再翻倍，最长12小时；连续未变化达到 HN_RESCORE_STABLE_LIMIT 次后
+        直接按12小时刷新，帖子不会因早期没有变化而停止刷新
+        """
+        if stable_count >= settings.HN_RESCORE_STABLE_LIMIT:
+            return timedelta(hours=RESCORE_MAX_INTERVAL_HOURS)
+        hours = min(max(age_hours / 4, RESCORE_MIN_INTERVAL_HOURS), RESCORE_MAX_INTERVAL_HOURS)
+        return timedelta(hours=min(hours * 2 ** stable_count, RESCORE_MAX_INTERVAL_HOURS))
+    
+    async def rescore_recent_posts(self, now: Optional[datetime] = None) -> int:
+        """
+        重新获取近期采集的帖子的分数和评论数
+        
+        只处理 HN_RESCORE_WINDOW_DAYS 内采集的帖子（连续未变化的帖子按最长间隔继续刷新，直到离开窗口），
+        按逾期时长选出最多 HN_RESCORE_MAX_ITEMS 个到期帖子，以 HN_RESCORE_CONCURRENCY 的并发请求，
+        结果按主键批量更新，分数有变化的帖子同步到产品卡片；其中有已生成产品的帖子时重新生成首页精选快照
+        
+        刷新总是请求网络（跳过本地帖子缓存并写回最新数据）：缓存有效期按帖子发布时间计算，
+        与按采集时间计算的刷新间隔无关，读缓存会把同一份旧数据当作"分数未变化"计入连续未变化次数。
+        HN_ITEM_CACHE_OFFLINE 为 True 时不刷新。
+        
+        Returns:
+            分数有变化的帖子数量
+        """
+        try:
+            if settings.HN_ITEM_CACHE_OFFLINE:
+                logger.info("HN帖子缓存处于离线模式，跳过分数刷新")
+                return 0
+            now = now or datetime.utcnow()
+            cutoff = now - timedelta(days=settings.HN_RESCORE_WINDOW_DAYS)
+            rows = self.db.execute(
+                select(
+                    Post.id, Post.original_id, Post.points, Post.comments_count,
+                    Post.collected_at, Post.score_checked_at, Post.score_stable_count
+                ).where(
+                    Post.source_id == self.client.source.id,
+                    Post.collected_at >= cutoff
                 )
-                
-                if duplicate_post:
-                    logger.debug(f"跳过内容相似的帖子: {normalized_data['title']} (与ID: {duplicate_post.id} 相似)")
-                    duplicate_count += 1
+            ).all()
+            
+            # 选出到期的帖子，最早到期的优先（collected_at 和 score_checked_at 均为UTC时间）
+            due = []
+            for row in rows:
+                age_hours = (now - row.collected_at).total_seconds() / 3600
+                due_at = (row.score_checked_at or row.collected_at) + self.rescore_interval(age_hours, row.score_stable_count)
+                if due_at <= now:
+                    due.append((due_at, row))
+            due.sort(key=lambda item: item[0])
+            due_rows = [row for _, row in due[:settings.HN_RESCORE_MAX_ITEMS]]
+            
+            if not due_rows:
+                logger.info(f"没有需要刷新分数的HackerNews帖子（窗口内 {len(rows)} 条）")
+                return 0
+            
+            items = await self.client.get_items(
+                [int(row.original_id) for row in due_rows], settings.HN_RESCORE_CONCURRENCY, use_cache=False
+            )
+            
+            params = []
+            changed_post_ids = []
+            for row, item in zip(due_rows, items):
+                # 请求失败的帖子不更新，下次运行时重试
+                if not item or not isinstance(item, dict):
                     continue
-                
-                # 创建新帖子
-                new_post = Post(**normalized_data)
-                self.db.add(new_post)
-                saved_count += 1
+                points = item.get('score', row.points)
+                comments_count = item.get('descendants', row.comments_count)
+                if (points, comments_count) != (row.points, row.comments_count):
+                    changed_post_ids.append(row.id)
+                    stable_count = 0
+                else:
+                    stable_count = row.score_stable_count + 1
+                params.append({
+                    "id": row.id,
+                    "points": points,
+                    "comments_count": comments_count,
+                    "score_checked_at": now,
+                    "score_stable_count": stable_count
+                })
             
-            # 提交所有更改
-            if saved_count > 0:
-                self.db.commit()
-                logger.info(f"已保存 {saved_count} 条新HackerNews帖子，跳过 {duplicate_count} 条重复帖子")
-            else:
-                logger.info(f"没有新的HackerNews帖子需要保存，跳过 {duplicate_count} 条重复帖子")
+            for start in range(0, len(params), RESCORE_UPDATE_BATCH_SIZE):
+                self.db.execute(update(Post), params[start:start + RESCORE_UPDATE_BATCH_SIZE])
+            if changed_post_ids:
+                changed = set(changed_post_ids)
+                ScoreHistoryService.record_samples(
+                    self.db,
+                    [(item["id"], item["points"], item["comments_count"]) for item in params if item["id"] in changed],
+                    now
+                )
+                ProductCardService.refresh_scores(self.db, changed_post_ids)
+            self.db.commit()
+            if changed_post_ids:
+                invalidate_product_caches()
+                await self._refresh_featured_snapshot(changed_post_ids)
             
-            return saved_count
+            logger.info(
+                f"已刷新 {len(params)}/{len(due_rows)} 条HackerNews帖子的分数，"
+                f"其中 {len(changed_post_ids)} 条有变化"
+            )
+            return len(changed_post_ids)
         
         except Exception as e:
             self.db.rollback()
-            logger.error(f"保存HackerNews帖子时出错: {e}")
+            logger.error(f"刷新HackerNews帖子分数时出错: {e}")
             return 0
         
         finally:
             # 关闭HTTP客户端
             await self.client.close()
     
+    async def _refresh_featured_snapshot(self, post_ids: List[int]) -> None:
+        """分数变化的帖子中有已生成产品的帖子时，按最新分数重新生成精选快照（失败不影响分数刷新）"""
+        if not self.db.execute(select(Product.id).where(Product.post_id.in_(post_ids)).limit(1)).first():
+            return
+        try:
+            await ProductService(self.db).refresh_featured_snapshot()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"刷新分数后更新精选产品快照失败: {e}")
+    
     @classmethod
     async def run_collection(cls, db: Session) -> int:
         """运行数据收集，可作为定时任务调用"""
         service = cls(db)
-        return await service.collect_posts() 
\ No newline at end of file
+        return await service.collect_posts()
+    
+    @classmethod
+    async def run_rescore(cls, db: Session) -> int:
+        """运行分数刷新，可作为定时任务调用"""
+        service = cls(db)
+        return await service.rescore_recent_posts() 
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+产品卡片服务模块 - 负责维护列表页使用的 product_cards 读模型
+
+卡片数据来自 products、posts、sources、product_tag、tags 五张表，写入方在修改这些数据的同一事务中调用：
+- refresh_products: 产品创建、重新打标签、生成概念图、标签合并后按产品ID重建卡片；
+- refresh_scores: 帖子重新评分后只更新分数相关字段（集合操作）；
+- rebuild_all: 全量重建，用于迁移后的补数和定时校正。
+
+所有方法都只执行更改，除 rebuild_all 外不提交事务。
+"""
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import invalidate_product_caches
+from app.models.associations import product_tag_association
+from app.models.posts import Post
+from app.models.product_card import ProductCard
+from app.models.products import Product
+from app.models.sources import Source
+from app.models.tag import Tag
+from app.services.trending_service import TrendingService
+from app.utils.logger import logger
+
+# 每批处理的产品数量（限制 IN 列表长度）
+CARD_BATCH_SIZE = 500
+
+
+def _chunks(ids: List[int], size: int = CARD_BATCH_SIZE) -> Iterable[List[int]]:
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+class ProductCardService:
+    """产品卡片读模型服务"""
+
+    @staticmethod
+    def build_cards(db: Session, product_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        从源表读取并组装产品卡片（两次查询：产品+帖子+来源、标签）
+        使用Core查询而不是ORM对象，避免会话中已加载的过期关联影响结果
+        """
+        rows = db.execute(
+            select(
+                Product.id, Product.name, Product.description, Product.problem_solved,
+                Product.target_audience, Product.concept_image_url, Product.created_at,
+                Post.points, Post.comments_count, Post.published_at, Post.collected_at,
+                Source.id.label("source_id"), Source.name.label("source_name")
+            )
+            .join(Post, Post.id == Product.post_id)
+            .outerjoin(Source, Source.id == Post.source_id)
+            .where(Product.id.in_(product_ids))
+        ).all()
+
+        tags_by_product: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        for product_id, tag_id, tag_name in db.execute(
+            select(product_tag_association.c.product_id, Tag.id, Tag.name)
+            .join(Tag, Tag.id == product_tag_association.c.tag_id)
+            .where(product_tag_association.c.product_id.in_(product_ids))
+            .order_by(product_tag_association.c.product_id, Tag.id)
+        ):
+            tags_by_product[product_id].append({"id": tag_id, "name": tag_name})
+
+        popularity = [(row.points or 0) + (row.comments_count or 0) for row in rows]
+        trending_scores = TrendingService.score_posts(
+            popularity, [row.published_at for row in rows], [row.collected_at for row in rows]
+        )
+
+        cards = []
+        for row, score in zip(rows, trending_scores):
+            points = row.points or 0
+            comments_count = row.comments_count or 0
+            cards.append({
+                "id": row.id,
+                "name": row.name,
+                "description": row.description,
+                "problem_solved": row.problem_solved,
+                "target_audience": row.target_audience,
+                "concept_image_url": row.concept_image_url,
+                "tags": tags_by_product.get(row.id, []),
+                "source_id": row.source_id,
+                "source_name": row.source_name,
+                "points": points,
+                "comments_count": comments_count,
+                "popularity": points + comments_count,
+                "trending_score": float(score),
+                "created_at": row.created_at
+            })
+        return cards
+
+    @staticmethod
+    def refresh_products(db: Session, product_ids: Iterable[int]) -> int:
+        """
+        按产品ID重建卡片（先删除再写入），已删除的产品只删除卡片
+
+        Returns:
+            写入的卡片数量
+        """
+        ids = sorted({product_id for product_id in product_ids if product_id is not None})
+        written = 0
+        for chunk in _chunks(ids):
+            cards = ProductCardService.build_cards(db, chunk)
+            db.execute(delete(ProductCard).where(ProductCard.id.in_(chunk)))
+            if cards:
+                db.execute(insert(ProductCard), cards)
+            written += len(cards)
+        return written
+
+    @staticmethod
+    def refresh_scores(db: Session, post_ids: Iterable[int]) -> int:
+        """
+        帖子重新评分后，用关联子查询更新对应卡片的分数字段
+
+        Returns:
+            更新的卡片数量
+        """
+        ids = sorted(set(post_ids))
+
+        def post_value(expression):
+            return (
+                select(expression)
+                .join(Product, Product.post_id == Post.id)
+                .where(Product.id == ProductCard.id)
+                .scalar_subquery()
+            )
+
+        points = func.coalesce(Post.points, 0)
+        comments_count = func.coalesce(Post.comments_count, 0)
+
+        updated = 0
+        for chunk in _chunks(ids):
+            result = db.execute(
+                update(ProductCard)
+                .where(ProductCard.id.in_(select(Product.id).where(Product.post_id.in_(chunk))))
+                .values(
+                    points=post_value(points),
+                    comments_count=post_value(comments_count),
+                    popularity=post_value(points + comments_count)
+                )
+                .execution_options(synchronize_session=False)
+            )
+            updated += result.rowcount
+        return updated
+
+    @staticmethod
+    def rebuild_all(db: Session) -> int:
+        """
+        全量重建产品卡片并提交
+
+        Returns:
+            卡片数量
+        """
+        product_ids = db.execute(select(Product.id).order_by(Product.id)).scalars().all()
+        try:
+            db.execute(delete(ProductCard).where(ProductCard.id.notin_(select(Product.id))))
+            written = ProductCardService.refresh_products(db, product_ids)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        invalidate_product_caches()
+        logger.info(f"产品卡片已全量重建: {written} 张")
+        return written
@@ -1,26 +1,107 @@
 """
 产品服务模块 - 负责处理产品信息和标签
 """
-from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
+from typing import List, Dict, Any, Iterable, Optional, Tuple, Union
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload, joinedload, defer
+from dataclasses import dataclass
 from datetime import datetime
-from sqlalchemy import desc, asc
+from sqlalchemy import desc, asc, false, true, func, literal, select, text, tuple_, union_all, Select
+import base64
+import json
 import math
 
 from app.models.posts import Post
 from app.models.products import Product
 from app.models.tag import Tag
 from app.models.sources import Source
+from app.models.associations import product_tag_association
+from app.models.featured import FeaturedSnapshot
+from app.models.product_card import ProductCard
+from app.services.tag_service import TagService
+from app.services.product_card_service import ProductCardService
 from app.services.ai_service import AIService, AIAnalysisResult
 from app.services.ai_service_langchain import LangChainAIService
 from app.utils.logger import logger
-from app.core.database import SessionLocal, get_db
+from app.core.database import SessionLocal, get_db, execute
 from app.core.config import settings
+from app.core.cache import count_cache, invalidate_product_caches
+
+# 多标签过滤方式：all 要求产品包含全部标签，any 只需包含任一标签
+TAG_MODE_ALL = "all"
+TAG_MODE_ANY = "any"
+
+# 标签分面返回的最大数量
+FACET_TAG_LIMIT = 30
+
+# 首页展示的精选产品数量及精选快照的主键
+FEATURED_LIMIT = 3
+FEATURED_SNAPSHOT_ID = 1
+
+
+@dataclass(frozen=True)
+class ProductFilters:
+    """产品列表的过滤条件（可哈希，可直接作为缓存键）"""
+    tag_names: Tuple[str, ...] = ()
+    tag_mode: str = TAG_MODE_ALL
+    source_names: Tuple[str, ...] = ()
+    date_from: Optional[datetime] = None  # 创建时间下限（包含）
+    date_to: Optional[datetime] = None  # 创建时间上限（不包含）
+
+    @classmethod
+    def build(
+        cls,
+        tag_names: Optional[Iterable[str]] = None,
+        source_names: Optional[Iterable[str]] = None,
+        tag_mode: str = TAG_MODE_ALL,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ) -> "ProductFilters":
+        """去除空值和重复值并排序，使等价的过滤条件得到相同的缓存键"""
+        def clean(values: Optional[Iterable[str]]) -> Tuple[str, ...]:
+            return tuple(sorted({v.strip() for v in values or [] if v and v.strip()}))
+
+        if tag_mode not in (TAG_MODE_ALL, TAG_MODE_ANY):
+            raise ValueError(f"Unsupported tag mode: {tag_mode}")
+        return cls(clean(tag_names), tag_mode, clean(source_names), date_from, date_to)
+
+def listing_load_options() -> tuple:
+    """
+    从源表加载产品列表（首页精选）时使用的加载策略
+    - 标签通过 selectinload 一次性加载
+    - 帖子和来源通过 joinedload 随产品一起查询
+    - 列表不展示的大文本字段延迟加载
+    """
+    return (
+        selectinload(Product.tags),
+        joinedload(Product.post).options(
+            defer(Post.content),
+            joinedload(Post.source)
+        ),
+        defer(Product.competitive_advantage),
+        defer(Product.potential_competitors),
+        defer(Product.business_model),
+    )
+
+def detail_load_options() -> tuple:
+    """产品详情使用的加载策略：产品字段全部加载，帖子正文延迟加载"""
+    return (
+        selectinload(Product.tags),
+        joinedload(Product.post).options(
+            defer(Post.content),
+            joinedload(Post.source)
+        ),
+    )
 
 class ProductService:
-    """产品服务类，负责处理产品信息和标签"""
+    """
+    产品服务类，负责处理产品信息和标签
     
-    def __init__(self, db: Session):
+    读取方法（列表、游标分页、分面、详情、精选）同时支持同步 Session 和 AsyncSession，
+    使用 AsyncSession 时查询不阻塞事件循环；处理帖子、生成图片等写入方法只支持同步 Session。
+    """
+    
+    def __init__(self, db: Union[Session, AsyncSession]):
         """初始化服务"""
         self.db = db
         self.ai_service = AIService()
@@ -33,7 +114,8 @@ class ProductService:
         per_page: int = 12,
         tag_name: Optional[str] = None,
         source_name: Optional[str] = None,
-        sort_by_value: str = "latest"
+        sort_by_value: str = "latest",
+        filters: Optional[ProductFilters] = None
     ) -> Dict[str, Any]:
         """
         获取产品列表并应用分页、过滤和排序
@@ -44,58 +126,362 @@ class ProductService:
             tag_name: 按标签名称过滤
             source_name: 按来源名称过滤
             sort_by_value: 排序方式
+            filters: 多值过滤条件，提供时忽略 tag_name 和 source_name
             
         Returns:
             包含产品列表和分页信息的字典
         """
-        query = self.db.query(Product)
-
-        # 应用过滤条件
-        if tag_name:
-            query = query.join(Product.tags).filter(Tag.name == tag_name)
-        
-        if source_name:
-            query = query.join(Product.post).join(Post.source).filter(Source.name == source_name)
-
-        # 应用排序
-        if sort_by_value == "popular":
-            query = query.join(Product.post).order_by(desc(Post.points + Post.comments_count))
-        elif sort_by_value == "name":
-            query = query.order_by(asc(Product.name))
-        else:  # "latest" 或默认
-            query = query.order_by(desc(Product.created_at))
+        filters = filters or ProductFilters.build([tag_name], [source_name])
+        stmt = await self._build_listing_statement(filters, sort_by_value)
 
         # 计算总数和页数
-        total = query.count()
+        total, total_is_approximate = await self._count_listing(stmt, ("products", filters))
         pages = math.ceil(total / per_page)
         offset = (page - 1) * per_page
-        products_result = query.offset(offset).limit(per_page).all()
+        products_result = (await execute(self.db, stmt.offset(offset).limit(per_page))).scalars().all()
         
         # 为API准备格式化的数据
-        products_api_format = [
-            {
-                "id": p.id,
-                "name": p.name,
-                "description": p.description,
-                "problem_solved": p.problem_solved,
-                "target_audience": p.target_audience,
-                "tags": [t.name for t in p.tags],
-                "source": p.post.source.name if p.post and p.post.source else None,
-                "created_at": p.created_at.isoformat() if p.created_at else None,
-                "points": p.post.points if p.post else 0
-            }
-            for p in products_result
-        ]
+        products_api_format = [self.format_card_for_api(card) for card in products_result]
 
         return {
-            "products": products_result,  # 用于模板渲染
+            "products": products_result,  # 产品卡片，用于模板渲染
             "products_api_format": products_api_format,  # 用于API响应
             "total": total,
+            "total_is_approximate": total_is_approximate,
             "pages": pages,
             "page": page,
             "sort_by": sort_by_value
         }
     
+    async def _count_listing(self, stmt: Select, cache_key: Tuple) -> Tuple[int, bool]:
+        """
+        统计产品列表总数，结果按过滤条件缓存（数据变更时由 invalidate_product_caches 清除）
+        启用 APPROXIMATE_COUNTS 时，PostgreSQL 上优先使用查询计划的估算行数
+        
+        Returns:
+            (总数, 是否为估算值)
+        """
+        cached = count_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+        result = None
+        if settings.APPROXIMATE_COUNTS and self.db.get_bind().dialect.name == "postgresql":
+            estimate = await self._estimate_rows(stmt.order_by(None))
+            if estimate is not None and estimate >= settings.APPROXIMATE_COUNT_MIN_ROWS:
+                result = (estimate, True)
+        if result is None:
+            result = ((await execute(self.db, count_stmt)).scalar(), False)
+
+        count_cache.set(cache_key, result)
+        return result
+
+    async def _estimate_rows(self, stmt: Select) -> Optional[int]:
+        """使用 PostgreSQL 的 EXPLAIN 获取查询的估算行数，失败时返回None"""
+        try:
+            compiled = stmt.compile(
+                dialect=self.db.get_bind().dialect,
+                compile_kwargs={"literal_binds": True}
+            )
+            plan = (await execute(self.db, text(f"EXPLAIN (FORMAT JSON) {compiled}"))).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            logger.warning(f"获取估算行数失败，改用精确计数: {e}")
+            return None
+    
+    async def _resolve_tag(self, name: str) -> Optional[Tag]:
+        """解析标签名称（包括别名），异步会话时通过 run_sync 复用 TagService 的解析逻辑"""
+        if isinstance(self.db, AsyncSession):
+            return await self.db.run_sync(TagService.resolve_tag, name)
+        return TagService.resolve_tag(self.db, name)
+
+    async def _filter_conditions(
+        self,
+        filters: ProductFilters,
+        skip_tags: bool = False,
+        skip_sources: bool = False
+    ) -> List[Any]:
+        """
+        将过滤条件转换为 product_cards 表上的 WHERE 条件
+        来源和创建时间直接比较卡片字段；标签以子查询表达（不做连接），产品不会因匹配多个标签而重复
+        """
+        conditions = []
+
+        if filters.tag_names and not skip_tags:
+            # 通过别名表解析，已被合并的标签名称仍能过滤到主标签下的产品
+            tags = [await self._resolve_tag(name) for name in filters.tag_names]
+            tag_ids = {tag.id for tag in tags if tag}
+            if not tag_ids or (filters.tag_mode == TAG_MODE_ALL and None in tags):
+                conditions.append(false())
+            else:
+                tagged = select(product_tag_association.c.product_id).where(
+                    product_tag_association.c.tag_id.in_(tag_ids)
+                )
+                if filters.tag_mode == TAG_MODE_ALL and len(tag_ids) > 1:
+                    tagged = tagged.group_by(product_tag_association.c.product_id).having(
+                        func.count() == len(tag_ids)
+                    )
+                conditions.append(ProductCard.id.in_(tagged))
+
+        if filters.source_names and not skip_sources:
+            conditions.append(ProductCard.source_name.in_(filters.source_names))
+
+        # 卡片的时间字段都由 SQLAlchemy 写入（SQLite 上统一带微秒的文本格式），可以直接绑定 datetime 比较
+        if filters.date_from:
+            conditions.append(ProductCard.created_at >= filters.date_from)
+        if filters.date_to:
+            conditions.append(ProductCard.created_at < filters.date_to)
+
+        return conditions
+
+    async def _build_listing_statement(self, filters: ProductFilters, sort_by_value: str = "latest") -> Select:
+        """构建带过滤和排序条件的产品卡片查询（不含分页），只读取 product_cards 一张表"""
+        stmt = select(ProductCard).where(*await self._filter_conditions(filters))
+
+        # 应用排序（以ID作为第二排序键，保证分页顺序稳定，每种排序都有对应的 (排序键, id) 索引）
+        sort_key, ascending = self._sort_key(sort_by_value)
+        if ascending:
+            stmt = stmt.order_by(asc(sort_key), asc(ProductCard.id))
+        else:
+            stmt = stmt.order_by(desc(sort_key), desc(ProductCard.id))
+
+        return stmt
+
+    @staticmethod
+    def _sort_key(sort_by_value: str) -> Tuple[Any, bool]:
+        """返回排序方式对应的排序键表达式及是否升序"""
+        if sort_by_value == "popular":
+            return ProductCard.popularity, False
+        if sort_by_value == "name":
+            return ProductCard.name, True
+        if sort_by_value == "trending":
+            return ProductCard.trending_score, False
+        # "latest" 或默认
+        return ProductCard.created_at, False
+
+    @staticmethod
+    def _sort_key_value(card: ProductCard, sort_by_value: str) -> Any:
+        """取出产品卡片在指定排序方式下的排序键值"""
+        if sort_by_value == "popular":
+            return card.popularity
+        if sort_by_value == "name":
+            return card.name
+        if sort_by_value == "trending":
+            return card.trending_score
+        return card.created_at.isoformat()
+
+    @staticmethod
+    def encode_cursor(sort_by_value: str, key_value: Any, product_id: int) -> str:
+        """将排序键和产品ID编码为不透明的游标"""
+        payload = json.dumps({"s": sort_by_value, "k": key_value, "i": product_id}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str, sort_by_value: str) -> Tuple[Any, int]:
+        """
+        解析游标，返回 (排序键值, 产品ID)
+        游标无效或与排序方式不匹配时抛出 ValueError
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            key_value, product_id = payload["k"], int(payload["i"])
+            cursor_sort = payload["s"]
+            if sort_by_value == "latest":
+                key_value = datetime.fromisoformat(key_value)
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {e}")
+        if cursor_sort != sort_by_value:
+            raise ValueError("Cursor does not match sort order")
+        return key_value, product_id
+
+    async def get_products_with_cursor(
+        self,
+        per_page: int = 12,
+        cursor: Optional[str] = None,
+        tag_name: Optional[str] = None,
+        source_name: Optional[str] = None,
+        sort_by_value: str = "latest",
+        filters: Optional[ProductFilters] = None
+    ) -> Dict[str, Any]:
+        """
+        使用游标（keyset）分页获取产品列表
+        按 (排序键, 产品ID) 定位下一页，不需要 OFFSET 和总数查询，翻页深度不影响查询代价
+        
+        Args:
+            per_page: 每页数量
+            cursor: 上一页返回的游标，None或空字符串表示第一页
+            tag_name: 按标签名称过滤
+            source_name: 按来源名称过滤
+            sort_by_value: 排序方式
+            filters: 多值过滤条件，提供时忽略 tag_name 和 source_name
+            
+        Returns:
+            包含产品列表和下一页游标的字典
+        """
+        filters = filters or ProductFilters.build([tag_name], [source_name])
+        stmt = await self._build_listing_statement(filters, sort_by_value)
+
+        if cursor:
+            key_value, last_id = self.decode_cursor(cursor, sort_by_value)
+            sort_key, ascending = self._sort_key(sort_by_value)
+            if ascending:
+                stmt = stmt.where(tuple_(sort_key, ProductCard.id) > tuple_(key_value, last_id))
+            else:
+                stmt = stmt.where(tuple_(sort_key, ProductCard.id) < tuple_(key_value, last_id))
+
+        # 多取一条用于判断是否还有下一页
+        rows = (await execute(self.db, stmt.limit(per_page + 1))).scalars().all()
+        products_result = rows[:per_page]
+
+        next_cursor = None
+        if len(rows) > per_page:
+            last = products_result[-1]
+            next_cursor = self.encode_cursor(sort_by_value, self._sort_key_value(last, sort_by_value), last.id)
+
+        return {
+            "products": products_result,
+            "products_api_format": [self.format_card_for_api(card) for card in products_result],
+            "next_cursor": next_cursor,
+            "sort_by": sort_by_value
+        }
+
+    async def get_facets(self, filters: ProductFilters, tag_limit: int = FACET_TAG_LIMIT) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        在一次分组查询（UNION ALL）中统计标签和来源的分面数量，结果与列表总数共用缓存
+        
+        - 来源之间是"或"关系，来源分面在去掉来源过滤后的结果上统计，便于多选；
+        - 标签为 all 模式时在当前结果上统计（逐步收窄），any 模式时去掉标签过滤后统计。
+        
+        Returns:
+            {"tags": [...], "sources": [...]}，每项包含 id、name、count
+        """
+        cache_key = ("facets", filters, tag_limit)
+        cached = count_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        tag_base = select(ProductCard.id).where(
+            *await self._filter_conditions(filters, skip_tags=filters.tag_mode == TAG_MODE_ANY)
+        )
+        tag_count = func.count().label("count")
+        tag_facets = (
+            select(literal("tag").label("facet"), Tag.id.label("id"), Tag.name.label("name"), tag_count)
+            .select_from(product_tag_association)
+            .join(Tag, Tag.id == product_tag_association.c.tag_id)
+            .where(product_tag_association.c.product_id.in_(tag_base))
+            .group_by(Tag.id, Tag.name)
+            .order_by(tag_count.desc(), Tag.name)
+            .limit(tag_limit)
+            .subquery()
+        )
+        source_facets = (
+            select(literal("source").label("facet"), ProductCard.source_id, ProductCard.source_name, func.count())
+            .where(ProductCard.source_id.isnot(None), *await self._filter_conditions(filters, skip_sources=True))
+            .group_by(ProductCard.source_id, ProductCard.source_name)
+        )
+        rows = (await execute(self.db, union_all(select(tag_facets), source_facets))).all()
+
+        facets: Dict[str, List[Dict[str, Any]]] = {"tags": [], "sources": []}
+        for row in rows:
+            facets[row.facet + "s"].append({"id": row.id, "name": row.name, "count": row.count})
+        facets["sources"].sort(key=lambda item: (-item["count"], item["name"]))
+
+        count_cache.set(cache_key, facets)
+        return facets
+
+    @staticmethod
+    def format_product_for_api(product: Product) -> Dict[str, Any]:
+        """将产品格式化为列表API的返回格式"""
+        return {
+            "id": product.id,
+            "name": product.name,
+            "description": product.description,
+            "problem_solved": product.problem_solved,
+            "target_audience": product.target_audience,
+            "tags": [t.name for t in product.tags],
+            "source": product.post.source.name if product.post and product.post.source else None,
+            "created_at": product.created_at.isoformat() if product.created_at else None,
+            "points": product.post.points if product.post else 0
+        }
+
+    @staticmethod
+    def format_card_for_api(card: ProductCard) -> Dict[str, Any]:
+        """将产品卡片格式化为列表API的返回格式（与 format_product_for_api 一致）"""
+        return {
+            "id": card.id,
+            "name": card.name,
+            "description": card.description,
+            "problem_solved": card.problem_solved,
+            "target_audience": card.target_audience,
+            "tags": [tag["name"] for tag in card.tags],
+            "source": card.source_name,
+            "created_at": card.created_at.isoformat() if card.created_at else None,
+            "points": card.points
+        }
+
+    async def get_product_detail(self, product_id: int) -> Optional[Product]:
+        """
+        获取产品详情（一次性加载标签、帖子和来源）
+        
+        Args:
+            product_id: 产品ID
+            
+        Returns:
+            产品对象，不存在时返回None
+        """
+        return (await execute(
+            self.db, select(Product).where(Product.id == product_id).options(*detail_load_options())
+        )).scalars().first()
+
+    async def get_product_details(self, product_ids: List[int]) -> List[Product]:
+        """
+        批量获取产品详情，查询数量固定（产品+帖子+来源、标签），与产品数量无关
+        
+        Args:
+            product_ids: 产品ID列表
+            
+        Returns:
+            按请求顺序排列的产品列表，不存在的ID被忽略
+        """
+        if not product_ids:
+            return []
+        loaded = (await execute(
+            self.db, select(Product).where(Product.id.in_(product_ids)).options(*detail_load_options())
+        )).scalars().all()
+        by_id = {product.id: product for product in loaded}
+        return [by_id[product_id] for product_id in product_ids if product_id in by_id]
+
+    @staticmethod
+    def format_product_detail(product: Product) -> Dict[str, Any]:
+        """将产品格式化为详情API的返回格式"""
+        post = product.post
+        return {
+            "id": product.id,
+            "name": product.name,
+            "description": product.description,
+            "problem_solved": product.problem_solved,
+            "target_audience": product.target_audience,
+            "competitive_advantage": product.competitive_advantage,
+            "potential_competitors": product.potential_competitors,
+            "business_model": product.business_model,
+            "tags": [tag.name for tag in product.tags],
+            "post": {
+                "id": post.id,
+                "title": post.title,
+                "url": post.url,
+                "author": post.author,
+                "published_at": post.published_at.isoformat() if post.published_at else None,
+                "points": post.points,
+                "comments_count": post.comments_count,
+                "source": post.source.name if post.source else None
+            } if post else None,
+            "created_at": product.created_at.isoformat() if product.created_at else None
+        }
+    
     async def process_post(self, post_id: int) -> Optional[Product]:
         """
         处理帖子，提取产品信息并创建产品记录
@@ -139,9 +525,12 @@ class ProductService:
             if analysis_result.tags:
                 await self._process_tags(product, analysis_result.tags)
             
-            # 标记帖子为已处理
+            # 标记帖子为已处理，并在同一事务中同步产品卡片
             post.processed = True
+            self.db.flush()
+            ProductCardService.refresh_products(self.db, [product.id])
             self.db.commit()
+            invalidate_product_caches()
             
             logger.info(f"成功处理帖子 {post_id}，创建产品记录 {product.id}")
             return product
@@ -208,6 +597,7 @@ class ProductService:
         logger.info(f"Processing tags for product {product.id}. Received tags from AI: {tag_names}")
         
         # 清除现有标签关联
+        previous_tag_ids = {tag.id for tag in product.tags}
         product.tags = []
         
         # 处理每个标签
@@ -220,8 +610,16 @@ class ProductService:
             normalized_name = tag_name.strip().lower()
             logger.debug(f"Normalized tag name: '{normalized_name}'")
             
-            # 查找或创建标签 (基于规范化名称的唯一性)
-            tag = self.db.query(Tag).filter(Tag.normalized_name == normalized_name).first()
+            # 查找或创建标签 (基于规范化名称的唯一性，并通过别名表解析已被合并的标签)
+            tag = TagService.resolve_tag(self.db, tag_name)
+            if not tag and settings.TAG_CANONICALIZE_THRESHOLD > 0:
+                # 复用高度相似的已有标签，避免产生需要在下次自动合并时再合并的新标签
+                similar_tags = TagService.find_similar_tags(
+                    self.db, tag_name, threshold=settings.TAG_CANONICALIZE_THRESHOLD
+                )
+                if similar_tags:
+                    tag = similar_tags[0]
+                    logger.info(f"Tag '{normalized_name}' canonicalized to similar tag '{tag.name}' (ID: {tag.id})")
             if not tag:
                 logger.info(f"Tag '{normalized_name}' not found, creating new tag.")
                 # 确保原始名称也被存储，如果需要的话，或者只存储规范化名称并用于显示
@@ -238,6 +636,15 @@ class ProductService:
                 logger.debug(f"Tag '{normalized_name}' already associated with product {product.id}, skipping duplicate append.")
 
         logger.info(f"Final tag list for product {product.id} before commit: {[t.name for t in product.tags]}")
+        
+        # 增量更新标签的产品数量（先flush以获得新标签的ID）
+        self.db.flush()
+        current_tag_ids = {tag.id for tag in product.tags}
+        TagService.adjust_product_counts(
+            self.db,
+            added_tag_ids=list(current_tag_ids - previous_tag_ids),
+            removed_tag_ids=list(previous_tag_ids - current_tag_ids)
+        )
         # 事务将在调用此方法的地方（例如 process_post）的末尾统一提交，或者根据需要单独提交
         # self.db.commit() # Commit is usually handled by the calling method or at the end of the request.
 
@@ -299,30 +706,89 @@ class ProductService:
         today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
         
         # 查询今天创建或更新的产品，按点赞数排序
-        query = self.db.query(Product)\
+        stmt = select(Product)\
             .join(Product.post)\
-            .filter(Product.created_at >= today)\
+            .where(Product.created_at >= today)\
             .order_by(desc(Post.points + Post.comments_count))\
+            .options(*listing_load_options())\
             .limit(limit)
         
-        featured_products = query.all()
+        featured_products = list((await execute(self.db, stmt)).scalars().all())
         
         # 如果今天没有足够的新产品，则获取历史数据补充
         if len(featured_products) < limit:
             remaining = limit - len(featured_products)
             existing_ids = [p.id for p in featured_products]
             
-            backup_products = self.db.query(Product)\
+            backup_stmt = select(Product)\
                 .join(Product.post)\
-                .filter(Product.id.notin_(existing_ids) if existing_ids else True)\
+                .where(Product.id.notin_(existing_ids) if existing_ids else true())\
                 .order_by(desc(Post.points + Post.comments_count))\
-                .limit(remaining)\
-                .all()
+                .options(*listing_load_options())\
+                .limit(remaining)
                 
-            featured_products.extend(backup_products)
+            featured_products.extend((await execute(self.db, backup_stmt)).scalars().all())
         
         return featured_products
     
+    @staticmethod
+    def build_featured_card(product: Product) -> Dict[str, Any]:
+        """将产品转换为首页卡片数据（字段结构与模板中访问产品对象的方式一致）"""
+        source = product.post.source if product.post else None
+        return {
+            "id": product.id,
+            "name": product.name,
+            "description": product.description,
+            "concept_image_url": product.concept_image_url,
+            "created_at": product.created_at.isoformat() if product.created_at else None,
+            "tags": [{"id": tag.id, "name": tag.name} for tag in product.tags],
+            "post": {
+                "points": product.post.points,
+                "source": {"name": source.name} if source else None
+            } if product.post else None
+        }
+
+    async def refresh_featured_snapshot(self, limit: int = FEATURED_LIMIT) -> int:
+        """
+        重新计算精选产品并写入快照（仅支持同步会话）
+        
+        Returns:
+            快照中的产品数量
+        """
+        products = await self.get_featured_products(limit=limit)
+        cards = [self.build_featured_card(product) for product in products]
+
+        snapshot = self.db.get(FeaturedSnapshot, FEATURED_SNAPSHOT_ID)
+        if snapshot is None:
+            snapshot = FeaturedSnapshot(id=FEATURED_SNAPSHOT_ID)
+            self.db.add(snapshot)
+        snapshot.product_ids = [card["id"] for card in cards]
+        snapshot.cards = cards
+        self.db.commit()
+        invalidate_product_caches()
+
+        logger.info(f"精选产品快照已更新: {snapshot.product_ids}")
+        return len(cards)
+
+    async def get_featured_cards(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        按主键读取精选产品快照，返回可直接用于首页模板渲染的卡片数据
+        快照尚未生成时返回None
+        """
+        snapshot = (await execute(
+            self.db, select(FeaturedSnapshot).where(FeaturedSnapshot.id == FEATURED_SNAPSHOT_ID)
+        )).scalars().first()
+        if snapshot is None:
+            return None
+
+        cards = []
+        for card in snapshot.cards:
+            card = dict(card)
+            if card.get("created_at"):
+                card["created_at"] = datetime.fromisoformat(card["created_at"])
+            cards.append(card)
+        return cards
+
     async def generate_images_for_featured_products(self) -> int:
         """
         为精选产品生成概念图
@@ -349,7 +815,10 @@ class ProductService:
                 if image_url:
                     # 更新产品信息
                     product.concept_image_url = image_url
+                    self.db.flush()
+                    ProductCardService.refresh_products(self.db, [product.id])
                     self.db.commit()
+                    invalidate_product_caches()
                     success_count += 1
                     logger.info(f"为产品 '{product.name}' (ID:{product.id}) 生成了概念图")
             except Exception as e:
@@ -363,7 +832,10 @@ class ProductService:
                     
                     if image_url:
                         product.concept_image_url = image_url
+                        self.db.flush()
+                        ProductCardService.refresh_products(self.db, [product.id])
                         self.db.commit()
+                        invalidate_product_caches()
                         success_count += 1
                         logger.info(f"使用备用方法为产品 '{product.name}' (ID:{product.id}) 生成了概念图")
                 except Exception as inner_e:
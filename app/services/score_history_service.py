@@ -0,0 +1,196 @@
+"""
+帖子分数时间序列服务模块 - 记录分数样本、降采样，并计算每小时分数增速（velocity）
+
+样本只在分数或评论数变化时写入，序列按阶梯函数解读：任意时刻的值等于该时刻之前最近一个样本的值。
+早于 SCORE_HISTORY_DOWNSAMPLE_AFTER_HOURS 的样本每个帖子每小时只保留最后一个，
+早于 SCORE_HISTORY_RETENTION_DAYS 的样本删除，表的大小与活跃帖子数和保留期成正比。
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import delete, func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import execute
+from app.models.post_score_sample import PostScoreSample
+from app.models.posts import Post
+from app.models.products import Product
+from app.utils.logger import logger
+
+# 每批写入或删除的样本数量
+SAMPLE_BATCH_SIZE = 500
+
+
+def _chunks(values: Sequence, size: int = SAMPLE_BATCH_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class ScoreHistoryService:
+    """帖子分数时间序列服务，查询方法同时支持同步 Session 和 AsyncSession"""
+
+    def __init__(self, db: Union[Session, AsyncSession]):
+        """
+        初始化分数时间序列服务
+
+        Args:
+            db: 数据库会话（同步或异步）
+        """
+        self.db = db
+
+    @staticmethod
+    def record_samples(db: Session, samples: Iterable[Tuple[int, int, int]], ts: datetime) -> int:
+        """
+        追加分数样本（不提交），调用方只传入分数或评论数有变化的帖子
+
+        Args:
+            samples: (post_id, points, comments_count) 列表
+            ts: 采样时间（UTC）
+
+        Returns:
+            写入的样本数量
+        """
+        params = [
+            {"post_id": post_id, "ts": ts, "points": points or 0, "comments_count": comments_count or 0}
+            for post_id, points, comments_count in samples
+        ]
+        for chunk in _chunks(params):
+            db.execute(insert(PostScoreSample), chunk)
+        return len(params)
+
+    @staticmethod
+    def compact(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        删除超出保留期的样本，并将较早的样本降采样为每个帖子每小时最后一个，然后提交
+
+        Returns:
+            {"expired": 删除的过期样本数, "downsampled": 降采样删除的样本数}
+        """
+        now = now or datetime.utcnow()
+        retention_cutoff = now - timedelta(days=settings.SCORE_HISTORY_RETENTION_DAYS)
+        downsample_cutoff = now - timedelta(hours=settings.SCORE_HISTORY_DOWNSAMPLE_AFTER_HOURS)
+
+        try:
+            expired = db.execute(
+                delete(PostScoreSample).where(PostScoreSample.ts < retention_cutoff)
+            ).rowcount
+
+            rows = db.execute(
+                select(PostScoreSample.post_id, PostScoreSample.ts)
+                .where(PostScoreSample.ts < downsample_cutoff)
+                .order_by(PostScoreSample.post_id, PostScoreSample.ts)
+            ).all()
+            # 同一帖子同一小时内的样本只保留最后一个，即删除后面还有同桶样本的行
+            redundant = [
+                (row.post_id, row.ts)
+                for row, following in zip(rows, rows[1:])
+                if row.post_id == following.post_id
+                and row.ts.replace(minute=0, second=0, microsecond=0)
+                == following.ts.replace(minute=0, second=0, microsecond=0)
+            ]
+            for chunk in _chunks(redundant):
+                db.execute(
+                    delete(PostScoreSample)
+                    .where(tuple_(PostScoreSample.post_id, PostScoreSample.ts).in_(chunk))
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        logger.info(f"分数样本压缩完成：删除 {expired} 个过期样本，降采样删除 {len(redundant)} 个样本")
+        return {"expired": expired, "downsampled": len(redundant)}
+
+    async def get_velocity(
+        self,
+        hours: int = 24,
+        post_ids: Optional[List[int]] = None,
+        limit: Optional[int] = None,
+        now: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        计算帖子在最近 hours 小时内每小时的分数和评论数增长
+
+        起点取窗口开始时的值（窗口开始前最近的样本），窗口内才首次采样的帖子从首个样本算起。
+
+        Args:
+            hours: 时间窗口（小时）
+            post_ids: 指定帖子，None表示窗口内有样本的所有帖子
+            limit: 返回数量上限
+            now: 计算时刻（UTC），默认当前时间
+
+        Returns:
+            按 points_per_hour 降序排列的列表
+        """
+        now = now or datetime.utcnow()
+        start = now - timedelta(hours=hours)
+
+        if post_ids is not None:
+            id_filter = PostScoreSample.post_id.in_(post_ids)
+        else:
+            id_filter = PostScoreSample.post_id.in_(
+                select(PostScoreSample.post_id).where(PostScoreSample.ts > start).distinct()
+            )
+
+        base_ts = (
+            select(PostScoreSample.post_id, func.max(PostScoreSample.ts).label("ts"))
+            .where(PostScoreSample.ts <= start, id_filter)
+            .group_by(PostScoreSample.post_id)
+            .subquery()
+        )
+        base_rows = (await execute(self.db, (
+            select(PostScoreSample)
+            .join(base_ts, (PostScoreSample.post_id == base_ts.c.post_id) & (PostScoreSample.ts == base_ts.c.ts))
+        ))).scalars().all()
+        window_rows = (await execute(self.db, (
+            select(PostScoreSample)
+            .where(PostScoreSample.ts > start, PostScoreSample.ts <= now, id_filter)
+            .order_by(PostScoreSample.post_id, PostScoreSample.ts)
+        ))).scalars().all()
+
+        first: Dict[int, PostScoreSample] = {sample.post_id: sample for sample in base_rows}
+        last: Dict[int, PostScoreSample] = dict(first)
+        for sample in window_rows:
+            first.setdefault(sample.post_id, sample)
+            last[sample.post_id] = sample
+
+        results = []
+        for post_id, first_sample in first.items():
+            last_sample = last[post_id]
+            since = max(first_sample.ts, start)
+            elapsed_hours = (now - since).total_seconds() / 3600
+            points_delta = last_sample.points - first_sample.points
+            comments_delta = last_sample.comments_count - first_sample.comments_count
+            results.append({
+                "post_id": post_id,
+                "points": last_sample.points,
+                "comments_count": last_sample.comments_count,
+                "points_delta": points_delta,
+                "comments_delta": comments_delta,
+                "points_per_hour": round(points_delta / elapsed_hours, 3) if elapsed_hours > 0 else 0.0,
+                "comments_per_hour": round(comments_delta / elapsed_hours, 3) if elapsed_hours > 0 else 0.0,
+                "since": since.isoformat()
+            })
+        results.sort(key=lambda item: (item["points_per_hour"], item["post_id"]), reverse=True)
+        if limit is not None:
+            results = results[:limit]
+
+        # 附加帖子标题和产品ID
+        if results:
+            info = {
+                row.id: row
+                for row in (await execute(self.db, (
+                    select(Post.id, Post.title, Product.id.label("product_id"))
+                    .outerjoin(Product, Product.post_id == Post.id)
+                    .where(Post.id.in_([item["post_id"] for item in results]))
+                ))).all()
+            }
+            for item in results:
+                row = info.get(item["post_id"])
+                item["title"] = row.title if row else None
+                item["product_id"] = row.product_id if row else None
+
+        return results
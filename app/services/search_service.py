@@ -0,0 +1,252 @@
+"""
+产品搜索服务模块 - 基于数据库全文索引的产品搜索
+
+- SQLite: 查询 FTS5 虚拟表 products_fts（trigram 分词），按 bm25 排序；
+  trigram 分词器要求词条至少3个字符，更短的词条（如两字中文词）改用同一张表上的 LIKE 匹配；
+- PostgreSQL: 在 products.search_text 生成列（pg_trgm GIN索引）和标签名称上做 ILIKE 子串匹配，
+  按命中字段的权重之和排序（权重与 SQLite 的 bm25 字段权重一致）。
+
+两种数据库的词条都由 parse_terms 拆分，每个词条作为子串、忽略大小写，词条之间为"与"关系，
+可以分别命中产品文本和标签（与 SQLite 上包含 tags 列的索引行一致），中文词和词的一部分都能匹配。
+
+两种数据库都只负责匹配和排序，高亮统一在Python中生成，保证结果一致并对原文做HTML转义。
+"""
+import html
+import math
+import re
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.database import execute
+
+from app.models.product_card import ProductCard
+from app.models.search import FTS_COLUMNS, FTS_TABLE
+from app.services.product_service import ProductService
+
+# trigram 分词器能够匹配的最短词条长度
+MIN_TRIGRAM_TERM_LENGTH = 3
+
+# bm25 的字段权重，顺序与 FTS_COLUMNS 一致：名称、描述、解决的问题、目标受众、标签
+BM25_WEIGHTS = (10.0, 4.0, 2.0, 2.0, 6.0)
+
+# PostgreSQL 上各字段命中时的相关度，字段与权重同 FTS_COLUMNS 和 BM25_WEIGHTS
+POSTGRESQL_FIELD_WEIGHTS = {
+    "p.name": BM25_WEIGHTS[0],
+    "p.description": BM25_WEIGHTS[1],
+    "p.problem_solved": BM25_WEIGHTS[2],
+    "p.target_audience": BM25_WEIGHTS[3],
+}
+POSTGRESQL_TAG_WEIGHT = BM25_WEIGHTS[4]
+
+# 描述摘要的最大长度
+SNIPPET_LENGTH = 160
+
+
+class SearchService:
+    """产品搜索服务"""
+
+    def __init__(self, db: Union[Session, AsyncSession]):
+        """
+        初始化搜索服务
+
+        Args:
+            db: 数据库会话（同步或异步）
+        """
+        self.db = db
+
+    @staticmethod
+    def parse_terms(query: str) -> List[str]:
+        """将搜索词拆分为词条（去除引号和排除符号，忽略大小写重复）"""
+        terms = []
+        seen = set()
+        for raw in query.split():
+            term = raw.strip('"').lstrip("-")
+            if term and term.lower() not in seen and term.lower() != "or":
+                seen.add(term.lower())
+                terms.append(term)
+        return terms
+
+    @staticmethod
+    def like_pattern(term: str) -> str:
+        """将词条转换为子串匹配的 LIKE 模式（转义 \\、% 和 _）"""
+        return "%" + re.sub(r"([\\%_])", r"\\\1", term) + "%"
+
+    async def search_products(self, query: str, page: int = 1, per_page: int = 20) -> Dict[str, Any]:
+        """
+        全文搜索产品
+
+        Args:
+            query: 搜索词，多个词条之间为"与"关系
+            page: 页码
+            per_page: 每页数量
+
+        Returns:
+            包含产品、高亮片段、相关度和分页信息的字典
+        """
+        terms = self.parse_terms(query)
+        offset = (page - 1) * per_page
+        if not terms:
+            ranked, total = [], 0
+        elif self.db.get_bind().dialect.name == "postgresql":
+            ranked, total = await self._search_postgresql(terms, per_page, offset)
+        else:
+            ranked, total = await self._search_sqlite(terms, per_page, offset)
+
+        products = []
+        if ranked:
+            ids = [product_id for product_id, _ in ranked]
+            loaded = (await execute(
+                self.db, select(ProductCard).where(ProductCard.id.in_(ids))
+            )).scalars().all()
+            by_id = {product.id: product for product in loaded}
+            products = [by_id[product_id] for product_id in ids if product_id in by_id]
+
+        scores = {product_id: round(score, 4) for product_id, score in ranked}
+        highlights = {
+            product.id: {
+                "name": self.highlight(product.name, terms),
+                "description": self.highlight(product.description or "", terms, SNIPPET_LENGTH)
+            }
+            for product in products
+        }
+
+        return {
+            "products": products,
+            "products_api_format": [
+                {
+                    **ProductService.format_card_for_api(product),
+                    "score": scores[product.id],
+                    "highlights": highlights[product.id]
+                }
+                for product in products
+            ],
+            "highlights": highlights,
+            "total": total,
+            "pages": math.ceil(total / per_page),
+            "page": page,
+            "query": query
+        }
+
+    async def _search_sqlite(self, terms: List[str], limit: int, offset: int) -> Tuple[List[Tuple[int, float]], int]:
+        """在 FTS5 表上搜索，返回 (产品ID, 相关度) 列表和总数"""
+        conditions = []
+        params: Dict[str, Any] = {}
+
+        long_terms = [t for t in terms if len(t) >= MIN_TRIGRAM_TERM_LENGTH]
+        if long_terms:
+            # 每个词条作为短语，词条之间为AND
+            params["match"] = " ".join('"' + t.replace('"', '""') + '"' for t in long_terms)
+            conditions.append(f"{FTS_TABLE} MATCH :match")
+
+        for i, term in enumerate(t for t in terms if len(t) < MIN_TRIGRAM_TERM_LENGTH):
+            params[f"like{i}"] = SearchService.like_pattern(term)
+            conditions.append(
+                "(" + " OR ".join(f"{column} LIKE :like{i} ESCAPE '\\'" for column in FTS_COLUMNS) + ")"
+            )
+
+        where = " AND ".join(conditions)
+        if long_terms:
+            weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+            rank = f"-bm25({FTS_TABLE}, {weights})"
+        else:
+            # 没有可用于 MATCH 的词条时无法计算 bm25，按产品新旧排序
+            rank = "0.0"
+
+        rows = (await execute(
+            self.db,
+            text(
+                f"SELECT rowid AS id, {rank} AS score FROM {FTS_TABLE} WHERE {where} "
+                f"ORDER BY score DESC, rowid DESC LIMIT :limit OFFSET :offset"
+            ),
+            {**params, "limit": limit, "offset": offset}
+        )).all()
+        total = (await execute(self.db, text(f"SELECT count(*) FROM {FTS_TABLE} WHERE {where}"), params)).scalar()
+        return [(row.id, float(row.score)) for row in rows], total
+
+    @staticmethod
+    def build_postgresql_query(terms: List[str]) -> Tuple[str, Dict[str, Any]]:
+        """
+        构造 PostgreSQL 搜索的 CTE（结果为 matched(id, score)）和参数
+
+        每个词条取出 search_text 或任一标签名称包含该词条的产品（两者都走 pg_trgm 索引），
+        各词条的结果取交集；相关度为每个词条命中字段的权重之和。
+        """
+        params = {f"like{i}": SearchService.like_pattern(term) for i, term in enumerate(terms)}
+        tag_match = (
+            "SELECT {column} FROM product_tag pt JOIN tags t ON t.id = pt.tag_id "
+            "WHERE {where}t.name ILIKE :like{i}"
+        )
+        conditions = []
+        scores = []
+        for i in range(len(terms)):
+            conditions.append(
+                f"p.id IN (SELECT id FROM products WHERE search_text ILIKE :like{i} "
+                f"UNION {tag_match.format(column='pt.product_id', where='', i=i)})"
+            )
+            scores.extend(
+                f"CASE WHEN {column} ILIKE :like{i} THEN {weight} ELSE 0 END"
+                for column, weight in POSTGRESQL_FIELD_WEIGHTS.items()
+            )
+            scores.append(
+                f"CASE WHEN EXISTS ({tag_match.format(column='1', where='pt.product_id = p.id AND ', i=i)}) "
+                f"THEN {POSTGRESQL_TAG_WEIGHT} ELSE 0 END"
+            )
+        cte = (
+            f"WITH matched AS (SELECT p.id, {' + '.join(scores)} AS score "
+            f"FROM products p WHERE {' AND '.join(conditions)}) "
+        )
+        return cte, params
+
+    async def _search_postgresql(self, terms: List[str], limit: int, offset: int) -> Tuple[List[Tuple[int, float]], int]:
+        """在 search_text 生成列和标签名称上做子串匹配，返回 (产品ID, 相关度) 列表和总数"""
+        matched, params = self.build_postgresql_query(terms)
+        rows = (await execute(
+            self.db,
+            text(matched + "SELECT id, score FROM matched ORDER BY score DESC, id DESC LIMIT :limit OFFSET :offset"),
+            {**params, "limit": limit, "offset": offset}
+        )).all()
+        total = (await execute(self.db, text(matched + "SELECT count(*) FROM matched"), params)).scalar()
+        return [(row.id, float(row.score)) for row in rows], total
+
+    @staticmethod
+    def highlight(value: str, terms: List[str], max_length: Optional[int] = None) -> str:
+        """
+        生成HTML转义后的高亮文本，命中的词条以 <mark> 包裹
+
+        Args:
+            value: 原文
+            terms: 词条列表（忽略大小写）
+            max_length: 摘要最大长度，超出时截取第一个命中位置附近的片段
+        """
+        if not value:
+            return ""
+        pattern = None
+        if terms:
+            # 较长的词条优先匹配
+            alternatives = "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+            pattern = re.compile(alternatives, re.IGNORECASE)
+
+        prefix = suffix = ""
+        if max_length and len(value) > max_length:
+            first = pattern.search(value) if pattern else None
+            start = max(0, (first.start() if first else 0) - max_length // 4)
+            end = min(len(value), start + max_length)
+            start = max(0, end - max_length)
+            prefix = "…" if start > 0 else ""
+            suffix = "…" if end < len(value) else ""
+            value = value[start:end]
+
+        if pattern is None:
+            return prefix + html.escape(value) + suffix
+
+        parts = []
+        last = 0
+        for match in pattern.finditer(value):
+            parts.append(html.escape(value[last:match.start()]))
+            parts.append("<mark>" + html.escape(match.group(0)) + "</mark>")
+            last = match.end()
+        parts.append(html.escape(value[last:]))
+        return prefix + "".join(parts) + suffix
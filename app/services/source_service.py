@@ -0,0 +1,76 @@
+"""
+数据源服务模块 - 负责数据源的统计信息
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Union
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import count_cache
+from app.core.database import execute
+from app.models.posts import Post
+from app.models.products import Product
+from app.models.sources import Source
+
+# 统计缓存键（与产品列表总数共用缓存，采集入库时由 invalidate_product_caches 清除）
+SOURCE_STATS_CACHE_KEY = ("source_stats",)
+
+
+class SourceService:
+    """数据源服务，同时支持同步 Session 和 AsyncSession"""
+
+    def __init__(self, db: Union[Session, AsyncSession]):
+        """
+        初始化数据源服务
+
+        Args:
+            db: 数据库会话（同步或异步）
+        """
+        self.db = db
+
+    async def get_source_stats(self) -> List[Dict[str, Any]]:
+        """
+        在一次分组查询中统计每个来源的帖子数、产品数、最近采集时间以及近24小时和近7天的采集量
+        查询数量不随来源数量增长，结果在 COUNT_CACHE_TTL 内缓存
+
+        Returns:
+            按来源ID排序的统计列表
+        """
+        cached = count_cache.get(SOURCE_STATS_CACHE_KEY)
+        if cached is not None:
+            return cached
+
+        # collected_at 以UTC时间写入
+        now = datetime.utcnow()
+        day_ago = now - timedelta(days=1)
+        week_ago = now - timedelta(days=7)
+
+        stmt = (
+            select(
+                Source.id, Source.name, Source.url, Source.active,
+                func.count(Post.id).label("post_count"),
+                func.count(Product.id).label("product_count"),
+                func.max(Post.collected_at).label("last_collected_at"),
+                func.coalesce(func.sum(case((Post.collected_at >= day_ago, 1), else_=0)), 0).label("posts_24h"),
+                func.coalesce(func.sum(case((Post.collected_at >= week_ago, 1), else_=0)), 0).label("posts_7d"),
+            )
+            .outerjoin(Post, Post.source_id == Source.id)
+            .outerjoin(Product, Product.post_id == Post.id)
+            .group_by(Source.id, Source.name, Source.url, Source.active)
+            .order_by(Source.id)
+        )
+        stats = [dict(row._mapping) for row in (await execute(self.db, stmt)).all()]
+
+        count_cache.set(SOURCE_STATS_CACHE_KEY, stats)
+        return stats
+
+    @staticmethod
+    def format_stats_for_api(stats: Dict[str, Any]) -> Dict[str, Any]:
+        """将来源统计格式化为API返回格式"""
+        last_collected_at = stats["last_collected_at"]
+        return {
+            **stats,
+            "last_collected_at": last_collected_at.isoformat() if last_collected_at else None
+        }
@@ -0,0 +1,281 @@
+"""
+标签合并规划模块 - 负责离线计算标签合并计划并批量应用
+
+合并计划的生成分为两步：
+1. 从数据库一次性读取标签词表和产品关联，随后在进程池中并行计算相似标签对，
+   相似度计算期间不持有任何数据库事务；
+2. 按照与 TagService.auto_merge_similar_tags 相同的贪心策略（创建时间最早的标签优先作为主标签）
+   将相似标签对聚合成合并组。
+
+计划可以导出为JSON供人工审核，审核后再通过 apply_plan 在单个事务中批量应用。
+"""
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import invalidate_product_caches
+from app.core.config import settings
+from app.models.associations import product_tag_association
+from app.models.tag import Tag
+from app.utils.logger import logger
+
+# 合并计划文件格式版本
+PLAN_VERSION = 1
+
+# 标签数量低于该值时直接在当前进程计算，避免进程池的启动开销
+MIN_TAGS_FOR_PROCESS_POOL = 500
+
+# 进程池工作进程共享的标签名称列表和阈值（通过initializer设置，避免每个任务重复序列化）
+_worker_names: List[str] = []
+_worker_threshold: float = 0.0
+
+
+def _init_worker(names: List[str], threshold: float) -> None:
+    """初始化工作进程的共享数据"""
+    global _worker_names, _worker_threshold
+    _worker_names = names
+    _worker_threshold = threshold
+
+
+def _find_similar_pairs(names: List[str], threshold: float, rows: range) -> List[Tuple[int, int, float]]:
+    """
+    计算指定行与其后所有标签的相似度
+
+    先使用 real_quick_ratio / quick_ratio 这两个相似度上界做剪枝，
+    只有通过剪枝的标签对才计算完整的 ratio。
+
+    Returns:
+        (i, j, similarity) 列表，其中 i < j
+    """
+    pairs = []
+    for i in rows:
+        name_i = names[i]
+        for j in range(i + 1, len(names)):
+            matcher = SequenceMatcher(None, name_i, names[j])
+            if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+                continue
+            similarity = matcher.ratio()
+            if similarity >= threshold:
+                pairs.append((i, j, similarity))
+    return pairs
+
+
+def _find_similar_pairs_in_worker(rows: range) -> List[Tuple[int, int, float]]:
+    """进程池任务入口"""
+    return _find_similar_pairs(_worker_names, _worker_threshold, rows)
+
+
+class TagMergePlanner:
+    """标签合并规划器，负责生成、导出和应用标签合并计划"""
+
+    @staticmethod
+    def compute_similar_pairs(
+        names: List[str],
+        threshold: float,
+        workers: Optional[int] = None
+    ) -> List[Tuple[int, int, float]]:
+        """
+        计算所有相似度不低于阈值的标签对
+
+        Args:
+            names: 标准化后的标签名称列表
+            threshold: 相似度阈值
+            workers: 进程数，None时使用配置或CPU核数，1表示在当前进程计算
+
+        Returns:
+            (i, j, similarity) 列表，其中 i < j
+        """
+        if workers is None:
+            workers = settings.TAG_MERGE_WORKERS or os.cpu_count() or 1
+
+        if workers <= 1 or len(names) < MIN_TAGS_FOR_PROCESS_POOL:
+            return _find_similar_pairs(names, threshold, range(len(names)))
+
+        # 第i行需要比较 n-i-1 次，按步长交错切分行号以平衡各进程的工作量
+        chunk_count = workers * 4
+        chunks = [range(k, len(names), chunk_count) for k in range(chunk_count)]
+
+        pairs: List[Tuple[int, int, float]] = []
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(names, threshold)
+        ) as executor:
+            for chunk_pairs in executor.map(_find_similar_pairs_in_worker, chunks):
+                pairs.extend(chunk_pairs)
+        return pairs
+
+    @staticmethod
+    def build_plan(db: Session, threshold: float = 0.90, workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        生成标签合并计划（不修改数据库）
+
+        词表在独立的短连接上读取，不使用也不结束调用方会话中的事务（调用方未提交的更改不受影响），
+        计算相似度期间不占用数据库连接。
+
+        Args:
+            db: 数据库会话（只用于获取数据库引擎）
+            threshold: 相似度阈值
+            workers: 计算相似度使用的进程数
+
+        Returns:
+            合并计划字典，可直接序列化为JSON
+        """
+        engine = db.get_bind().engine
+        # 一次性读取词表，之后的相似度计算不再访问数据库
+        with engine.connect() as conn:
+            tag_rows = conn.execute(
+                select(Tag.id, Tag.name, Tag.normalized_name).order_by(Tag.created_at, Tag.id)
+            ).all()
+            product_counts = dict(conn.execute(
+                select(product_tag_association.c.tag_id, func.count())
+                .group_by(product_tag_association.c.tag_id)
+            ).all())
+
+        names = [row.normalized_name or row.name.lower() for row in tag_rows]
+        logger.info(f"开始计算 {len(names)} 个标签的相似度，阈值: {threshold}")
+        pairs = TagMergePlanner.compute_similar_pairs(names, threshold, workers)
+
+        adjacency: Dict[int, List[Tuple[int, float]]] = defaultdict(list)
+        for i, j, similarity in pairs:
+            adjacency[i].append((j, similarity))
+            adjacency[j].append((i, similarity))
+
+        # 与 auto_merge_similar_tags 相同的贪心策略：按创建时间遍历，最早的标签作为主标签
+        clusters = []
+        processed = set()
+        for i in range(len(tag_rows)):
+            if i in processed:
+                continue
+            members = sorted(
+                (item for item in adjacency.get(i, []) if item[0] not in processed),
+                key=lambda item: item[0]
+            )
+            if not members:
+                continue
+            processed.add(i)
+            processed.update(j for j, _ in members)
+            clusters.append((i, members))
+
+        # 统计每个合并组会影响的产品数量（拥有任意次要标签的产品）
+        secondary_ids = [tag_rows[j].id for _, members in clusters for j, _ in members]
+        products_by_tag: Dict[int, set] = defaultdict(set)
+        if secondary_ids:
+            with engine.connect() as conn:
+                rows = conn.execute(
+                    select(product_tag_association.c.tag_id, product_tag_association.c.product_id)
+                    .where(product_tag_association.c.tag_id.in_(secondary_ids))
+                ).all()
+            for tag_id, product_id in rows:
+                products_by_tag[tag_id].add(product_id)
+
+        def describe(index: int) -> Dict[str, Any]:
+            row = tag_rows[index]
+            return {
+                "id": row.id,
+                "name": row.name,
+                "normalized_name": row.normalized_name,
+                "product_count": product_counts.get(row.id, 0)
+            }
+
+        plan_clusters = []
+        for i, members in clusters:
+            affected = set()
+            secondaries = []
+            for j, similarity in members:
+                secondary = describe(j)
+                secondary["similarity"] = round(similarity, 4)
+                secondaries.append(secondary)
+                affected |= products_by_tag.get(tag_rows[j].id, set())
+            plan_clusters.append({
+                "primary": describe(i),
+                "secondaries": secondaries,
+                "affected_products": len(affected)
+            })
+
+        plan = {
+            "version": PLAN_VERSION,
+            "generated_at": datetime.utcnow().isoformat(),
+            "threshold": threshold,
+            "tag_count": len(tag_rows),
+            "merge_count": len(secondary_ids),
+            "clusters": plan_clusters
+        }
+        logger.info(f"合并计划生成完成: {len(plan_clusters)} 个合并组，共 {len(secondary_ids)} 个待合并标签")
+        return plan
+
+    @staticmethod
+    def save_plan(plan: Dict[str, Any], path: str) -> None:
+        """将合并计划写入JSON文件"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(plan, f, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def load_plan(path: str) -> Dict[str, Any]:
+        """从JSON文件读取合并计划"""
+        with open(path, "r", encoding="utf-8") as f:
+            plan = json.load(f)
+        if plan.get("version") != PLAN_VERSION:
+            raise ValueError(f"不支持的合并计划版本: {plan.get('version')}")
+        return plan
+
+    @staticmethod
+    def apply_plan(db: Session, plan: Dict[str, Any]) -> Dict[str, int]:
+        """
+        在单个事务中批量应用合并计划
+
+        计划生成后标签可能已被修改或删除：主标签不存在时跳过整个合并组，
+        次要标签不存在或标准化名称已变化时跳过该标签。
+
+        Returns:
+            包含 merged_count 和 skipped_count 的字典
+        """
+        from app.services.tag_service import TagService
+
+        clusters = plan.get("clusters", [])
+        tag_ids = set()
+        for cluster in clusters:
+            tag_ids.add(cluster["primary"]["id"])
+            tag_ids.update(s["id"] for s in cluster["secondaries"])
+        current_names = dict(db.execute(
+            select(Tag.id, Tag.normalized_name).where(Tag.id.in_(tag_ids))
+        ).all()) if tag_ids else {}
+
+        merged_count = 0
+        skipped_count = 0
+        try:
+            for cluster in clusters:
+                primary = cluster["primary"]
+                if primary["id"] not in current_names:
+                    logger.warning(f"主标签 '{primary['name']}' (ID: {primary['id']}) 已不存在，跳过该合并组")
+                    skipped_count += len(cluster["secondaries"])
+                    continue
+
+                secondary_ids = []
+                for secondary in cluster["secondaries"]:
+                    if current_names.get(secondary["id"]) != secondary["normalized_name"]:
+                        logger.warning(f"标签 '{secondary['name']}' (ID: {secondary['id']}) 已变化或不存在，跳过")
+                        skipped_count += 1
+                        continue
+                    secondary_ids.append(secondary["id"])
+
+                if secondary_ids:
+                    TagService.merge_tags(db, primary["id"], secondary_ids, commit=False)
+                    merged_count += len(secondary_ids)
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        if merged_count:
+            invalidate_product_caches()
+
+        logger.info(f"合并计划应用完成: 合并 {merged_count} 个标签，跳过 {skipped_count} 个")
+        return {"merged_count": merged_count, "skipped_count": skipped_count}
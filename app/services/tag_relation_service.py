@@ -0,0 +1,188 @@
+"""
+相关标签服务模块 - 根据标签共现矩阵离线计算每个标签的相关标签
+
+product_tag 关联表可以看作 产品×标签 的稀疏0/1矩阵 A，标签共现矩阵即 AᵀA。
+这里用 NumPy 以 COO 形式（行号、列号、计数）直接构造 AᵀA 的上三角部分，
+再按 Jaccard 或 PMI 打分，为每个标签保留 top-k 个相关标签写入 tag_relations 表。
+在线查询只需按 tag_id 读取至多 k 行。
+"""
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.associations import product_tag_association
+from app.models.tag import Tag, TagRelation
+from app.utils.logger import logger
+
+# 支持的相关度指标
+METRIC_JACCARD = "jaccard"
+METRIC_PMI = "pmi"
+
+
+class TagRelationService:
+    """相关标签服务，负责构建共现矩阵并提供相关标签查询"""
+
+    @staticmethod
+    def compute_relations(
+        product_ids: np.ndarray,
+        tag_ids: np.ndarray,
+        top_k: int = 10,
+        metric: str = METRIC_JACCARD,
+        min_co_count: int = 2
+    ) -> Dict[str, np.ndarray]:
+        """
+        根据 (产品ID, 标签ID) 关联对计算每个标签的 top-k 相关标签
+
+        Args:
+            product_ids: 关联对中的产品ID数组
+            tag_ids: 关联对中的标签ID数组
+            top_k: 每个标签保留的相关标签数量
+            metric: 相关度指标，jaccard 或 pmi
+            min_co_count: 最低共现次数，过滤偶然的共现
+
+        Returns:
+            包含 tag_id、related_tag_id、score、co_count 四个等长数组的字典
+        """
+        empty = {
+            "tag_id": np.empty(0, dtype=np.int64),
+            "related_tag_id": np.empty(0, dtype=np.int64),
+            "score": np.empty(0, dtype=np.float64),
+            "co_count": np.empty(0, dtype=np.int64)
+        }
+        if len(tag_ids) == 0:
+            return empty
+
+        # 将ID映射为连续下标
+        tag_values, tag_index = np.unique(tag_ids, return_inverse=True)
+        _, product_index = np.unique(product_ids, return_inverse=True)
+        tag_count = len(tag_values)
+        product_count = int(product_index.max()) + 1
+
+        # 按 (产品, 标签) 排序后，同一产品的标签相邻且有序
+        order = np.lexsort((tag_index, product_index))
+        products = product_index[order]
+        tags = tag_index[order]
+
+        # 同一产品内相距 d 的两个标签构成一个共现对（a < b），d 最大为单个产品的标签数-1
+        max_tags_per_product = int(np.bincount(products).max())
+        pair_keys = []
+        for distance in range(1, max_tags_per_product):
+            same_product = products[:-distance] == products[distance:]
+            first = tags[:-distance][same_product].astype(np.int64)
+            second = tags[distance:][same_product].astype(np.int64)
+            pair_keys.append(first * tag_count + second)
+        if not pair_keys:
+            return empty
+
+        keys, co_counts = np.unique(np.concatenate(pair_keys), return_counts=True)
+        keep = co_counts >= min_co_count
+        keys, co_counts = keys[keep], co_counts[keep]
+        if len(keys) == 0:
+            return empty
+
+        # 共现矩阵对称，补全下三角
+        first = keys // tag_count
+        second = keys % tag_count
+        rows = np.concatenate([first, second])
+        cols = np.concatenate([second, first])
+        co_counts = np.concatenate([co_counts, co_counts]).astype(np.float64)
+
+        frequency = np.bincount(tag_index, minlength=tag_count).astype(np.float64)
+        if metric == METRIC_PMI:
+            scores = np.log(co_counts * product_count / (frequency[rows] * frequency[cols]))
+        elif metric == METRIC_JACCARD:
+            scores = co_counts / (frequency[rows] + frequency[cols] - co_counts)
+        else:
+            raise ValueError(f"Unsupported metric: {metric}")
+
+        # 每个标签按分数降序取前 top_k 个
+        order = np.lexsort((-scores, rows))
+        rows, cols, scores, co_counts = rows[order], cols[order], scores[order], co_counts[order]
+        group_starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        group_sizes = np.diff(np.r_[group_starts, len(rows)])
+        rank = np.arange(len(rows)) - np.repeat(group_starts, group_sizes)
+        keep = rank < top_k
+
+        return {
+            "tag_id": tag_values[rows[keep]].astype(np.int64),
+            "related_tag_id": tag_values[cols[keep]].astype(np.int64),
+            "score": scores[keep],
+            "co_count": co_counts[keep].astype(np.int64)
+        }
+
+    @staticmethod
+    def rebuild(
+        db: Session,
+        top_k: int = 10,
+        metric: str = METRIC_JACCARD,
+        min_co_count: int = 2
+    ) -> int:
+        """
+        重新计算所有标签的相关标签并替换 tag_relations 表的内容
+
+        Returns:
+            写入的相关标签记录数
+        """
+        pairs = db.execute(
+            select(product_tag_association.c.product_id, product_tag_association.c.tag_id)
+        ).all()
+        if pairs:
+            pair_array = np.array(pairs, dtype=np.int64)
+            product_ids, tag_ids = pair_array[:, 0], pair_array[:, 1]
+        else:
+            product_ids = tag_ids = np.empty(0, dtype=np.int64)
+
+        relations = TagRelationService.compute_relations(
+            product_ids, tag_ids, top_k=top_k, metric=metric, min_co_count=min_co_count
+        )
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "tag_id": int(tag_id),
+                "related_tag_id": int(related_tag_id),
+                "score": float(score),
+                "co_count": int(co_count),
+                "created_at": now,
+                "updated_at": now
+            }
+            for tag_id, related_tag_id, score, co_count in zip(
+                relations["tag_id"], relations["related_tag_id"], relations["score"], relations["co_count"]
+            )
+        ]
+
+        try:
+            db.execute(delete(TagRelation))
+            if rows:
+                db.execute(insert(TagRelation), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        logger.info(f"相关标签重建完成: {len(pairs)} 条产品标签关联，写入 {len(rows)} 条相关标签记录")
+        return len(rows)
+
+    @staticmethod
+    def get_related_tags(db: Session, tag_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+        """获取指定标签的相关标签（按相关度降序）"""
+        rows = db.execute(
+            select(TagRelation.score, TagRelation.co_count, Tag.id, Tag.name, Tag.product_count)
+            .join(Tag, Tag.id == TagRelation.related_tag_id)
+            .where(TagRelation.tag_id == tag_id)
+            .order_by(TagRelation.score.desc())
+            .limit(limit)
+        ).all()
+        return [
+            {
+                "id": row.id,
+                "name": row.name,
+                "score": round(row.score, 4),
+                "co_count": row.co_count,
+                "product_count": row.product_count
+            }
+            for row in rows
+        ]
@@ -1,9 +1,17 @@
 from typing import List, Dict, Optional, Union, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select, insert, update, delete, literal, text
 
-from ..models.tag import Tag, TagCategory
+from ..models.tag import Tag, TagCategory, TagAlias, TagRelation
+from ..models.associations import product_tag_association
 from ..core.tag_utils import TagNormalizer
+from ..core.trigram_index import tag_trigram_index
+from ..core.cache import invalidate_product_caches
+from .product_card_service import ProductCardService
+
+# 相似标签搜索时从三元组索引中取出的候选数量和最低三元组相似度
+SIMILAR_TAG_CANDIDATES = 50
+SIMILAR_TAG_MIN_TRIGRAM_SCORE = 0.3
 
 
 class TagService:
@@ -39,6 +47,7 @@ class TagService:
         
         db.add(tag)
         db.commit()
+        invalidate_product_caches()
         db.refresh(tag)
         return tag
     
@@ -49,9 +58,37 @@ class TagService:
     
     @staticmethod
     def get_tag_by_name(db: Session, name: str) -> Optional[Tag]:
-        """根据标签名称获取标签（使用标准化名称进行查询）"""
+        """根据标签名称获取标签（使用标准化名称进行查询，并解析已合并标签的别名）"""
+        return TagService.resolve_tag(db, name)
+    
+    @staticmethod
+    def resolve_tag(db: Session, name: str) -> Optional[Tag]:
+        """
+        将标签名称解析为标签，依次尝试：
+        1. 与 normalized_name 完全一致（产品处理时创建的标签只做了 strip + lower）
+        2. 与标准化后的名称一致
+        3. 别名表中的标准化别名（已被合并的标签名称）
+        每一步都是一次索引查询
+        """
+        if not name or not name.strip():
+            return None
+        
+        lowered_name = name.strip().lower()
+        tag = db.query(Tag).filter(Tag.normalized_name == lowered_name).first()
+        if tag:
+            return tag
+        
         normalized_name = TagNormalizer.normalize_tag_name(name)
-        return db.query(Tag).filter(Tag.normalized_name == normalized_name).first()
+        if not normalized_name:
+            return None
+        if normalized_name != lowered_name:
+            tag = db.query(Tag).filter(Tag.normalized_name == normalized_name).first()
+            if tag:
+                return tag
+        
+        return db.query(Tag).join(TagAlias, TagAlias.tag_id == Tag.id).filter(
+            TagAlias.alias_normalized == normalized_name
+        ).first()
     
     @staticmethod
     def get_all_tags(db: Session, skip: int = 0, limit: int = 100) -> List[Tag]:
@@ -68,46 +105,91 @@ class TagService:
         """获取指定分类下的标签"""
         return db.query(Tag).filter(Tag.category_id == category_id).offset(skip).limit(limit).all()
         
+    @staticmethod
+    def search_similar_tags(
+        db: Session,
+        tag_name: str,
+        limit: int = 10,
+        min_score: float = 0.3
+    ) -> List[Tuple[Tag, float]]:
+        """
+        基于三元组相似度搜索最相似的标签
+        PostgreSQL 使用 pg_trgm 的 GIN 索引（% 运算符），其他数据库使用内存三元组索引
+        返回按相似度降序排列的 (标签, 相似度) 列表
+        """
+        normalized_name = TagNormalizer.normalize_tag_name(tag_name)
+        if not normalized_name:
+            return []
+
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(
+                text("SELECT set_config('pg_trgm.similarity_threshold', :threshold, true)"),
+                {"threshold": str(min_score)}
+            )
+            matches = db.execute(
+                text(
+                    "SELECT id, similarity(normalized_name, :name) AS score FROM tags "
+                    "WHERE normalized_name % :name ORDER BY score DESC, id LIMIT :limit"
+                ),
+                {"name": normalized_name, "limit": limit}
+            ).all()
+        else:
+            matches = tag_trigram_index.search(db, normalized_name, limit=limit, min_score=min_score)
+
+        if not matches:
+            return []
+        tags_by_id = {
+            tag.id: tag
+            for tag in db.query(Tag).filter(Tag.id.in_([tag_id for tag_id, _ in matches])).all()
+        }
+        return [(tags_by_id[tag_id], float(score)) for tag_id, score in matches if tag_id in tags_by_id]
+
     @staticmethod
     def find_similar_tags(db: Session, tag_name: str, threshold: float = 0.85) -> List[Tag]:
         """
         查找与给定标签名称相似的标签
-        返回相似度高于阈值的标签列表
+        先通过三元组索引取出候选标签，再用 SequenceMatcher 按阈值精确筛选
+        返回相似度高于阈值的标签列表（按相似度降序）
         """
         normalized_name = TagNormalizer.normalize_tag_name(tag_name)
-        all_tags = db.query(Tag).all()
+        candidates = TagService.search_similar_tags(
+            db, normalized_name, limit=SIMILAR_TAG_CANDIDATES, min_score=SIMILAR_TAG_MIN_TRIGRAM_SCORE
+        )
         
-        similar_tags = []
-        for tag in all_tags:
+        scored_tags = []
+        for tag, _ in candidates:
             if tag.normalized_name == normalized_name:
                 continue
                 
             similarity = TagNormalizer.calculate_similarity(normalized_name, tag.normalized_name)
             if similarity >= threshold:
-                similar_tags.append(tag)
+                scored_tags.append((similarity, tag))
                 
-        return similar_tags
+        scored_tags.sort(key=lambda item: item[0], reverse=True)
+        return [tag for _, tag in scored_tags]
     
     @staticmethod
-    def merge_tags(db: Session, primary_tag_id: int, secondary_tag_ids: List[int]) -> Tag:
+    def merge_tags(db: Session, primary_tag_id: int, secondary_tag_ids: List[int], commit: bool = True) -> Tag:
         """
         合并标签：将次要标签合并到主要标签中
         - 将次要标签的产品关联转移到主要标签
         - 将次要标签的别名添加到主要标签
         - 删除次要标签
+        commit为False时只执行更改不提交，由调用方统一提交（用于批量应用合并计划）
         """
         primary_tag = TagService.get_tag_by_id(db, primary_tag_id)
         if not primary_tag:
             raise ValueError(f"Primary tag with ID {primary_tag_id} not found")
             
         # 获取主标签的现有别名列表，确保它是一个列表
-        primary_aliases = primary_tag.aliases or []
+        primary_aliases = list(primary_tag.aliases or [])
         
-        for secondary_id in secondary_tag_ids:
-            secondary_tag = TagService.get_tag_by_id(db, secondary_id)
-            if not secondary_tag:
-                continue
-                
+        secondary_tags = db.query(Tag).filter(
+            Tag.id.in_(secondary_tag_ids),
+            Tag.id != primary_tag.id
+        ).all()
+        
+        for secondary_tag in secondary_tags:
             # 将次要标签名称添加为主标签的别名
             if secondary_tag.name != primary_tag.name and secondary_tag.name not in primary_aliases:
                 primary_aliases.append(secondary_tag.name)
@@ -118,19 +200,77 @@ class TagService:
                 if alias not in primary_aliases and alias != primary_tag.name:
                     primary_aliases.append(alias)
                     
-            # 将次要标签的产品关联转移到主标签
-            for product in secondary_tag.products:
-                if primary_tag not in product.tags:
-                    product.tags.append(primary_tag)
-                    
-            # 删除次要标签
-            db.delete(secondary_tag)
+        if secondary_tags:
+            merged_ids = [t.id for t in secondary_tags]
+            
+            # 同步别名表：已有别名改为指向主标签，次要标签的名称和别名登记为主标签的别名
+            db.execute(
+                update(TagAlias).where(TagAlias.tag_id.in_(merged_ids)).values(tag_id=primary_tag.id)
+            )
+            reserved = {primary_tag.normalized_name, TagNormalizer.normalize_tag_name(primary_tag.name)}
+            new_aliases = {}
+            for secondary_tag in secondary_tags:
+                for alias in [secondary_tag.name, secondary_tag.normalized_name] + list(secondary_tag.aliases or []):
+                    alias_normalized = TagNormalizer.normalize_tag_name(alias or "")
+                    if alias_normalized and alias_normalized not in reserved:
+                        new_aliases.setdefault(alias_normalized, alias)
+            if new_aliases:
+                existing = set(db.execute(
+                    select(TagAlias.alias_normalized).where(TagAlias.alias_normalized.in_(list(new_aliases)))
+                ).scalars())
+                db.add_all([
+                    TagAlias(alias_normalized=alias_normalized, alias=alias, tag_id=primary_tag.id)
+                    for alias_normalized, alias in new_aliases.items()
+                    if alias_normalized not in existing
+                ])
+                db.flush()
             
-        # 更新主标签的别名
+            # 将次要标签的产品关联转移到主标签（集合操作，不逐个加载产品）
+            affected_product_ids = db.execute(
+                select(product_tag_association.c.product_id)
+                .where(product_tag_association.c.tag_id.in_(merged_ids))
+                .distinct()
+            ).scalars().all()
+            already_tagged = select(product_tag_association.c.product_id).where(
+                product_tag_association.c.tag_id == primary_tag.id
+            )
+            db.execute(
+                insert(product_tag_association).from_select(
+                    ["product_id", "tag_id"],
+                    select(product_tag_association.c.product_id, literal(primary_tag.id))
+                    .where(
+                        product_tag_association.c.tag_id.in_(merged_ids),
+                        product_tag_association.c.product_id.notin_(already_tagged)
+                    )
+                    .distinct()
+                )
+            )
+            db.execute(
+                delete(product_tag_association).where(product_tag_association.c.tag_id.in_(merged_ids))
+            )
+            
+            # 删除次要标签（相关标签数据会在下次重建时重新计算）
+            db.execute(delete(TagRelation).where(
+                TagRelation.tag_id.in_(merged_ids) | TagRelation.related_tag_id.in_(merged_ids)
+            ))
+            db.execute(delete(Tag).where(Tag.id.in_(merged_ids)))
+            ProductCardService.refresh_products(db, affected_product_ids)
+            
+        # 更新主标签的别名和产品数量
         primary_tag.aliases = primary_aliases
+        if secondary_tags:
+            primary_tag.product_count = db.execute(
+                select(func.count())
+                .select_from(product_tag_association)
+                .where(product_tag_association.c.tag_id == primary_tag.id)
+            ).scalar()
         
-        db.commit()
-        db.refresh(primary_tag)
+        if commit:
+            db.commit()
+            invalidate_product_caches()
+            db.refresh(primary_tag)
+        else:
+            db.flush()
         return primary_tag
         
     @staticmethod
@@ -204,53 +344,88 @@ class TagService:
         return updated_count + merged_count
 
     @staticmethod
-    def auto_merge_similar_tags(db: Session, threshold: float = 0.90) -> Dict[str, int]:
+    def adjust_product_counts(db: Session, added_tag_ids: List[int], removed_tag_ids: List[int]) -> None:
         """
-        自动查找并合并高度相似的标签。
-        遍历所有标签，对于每个标签，查找其相似标签。
-        如果找到相似标签且相似度高于阈值，则将它们合并到最先创建的或使用次数最多的标签中。
+        增量更新标签的产品数量（不提交）
+        added_tag_ids: 新增了一个产品关联的标签ID
+        removed_tag_ids: 减少了一个产品关联的标签ID
         """
-        all_tags = db.query(Tag).order_by(Tag.created_at).all() # Process older tags first as potential primaries
-        merged_count = 0
-        processed_tag_ids = set() # Keep track of tags already merged or acted as primary
+        if added_tag_ids:
+            db.execute(
+                update(Tag).where(Tag.id.in_(added_tag_ids)).values(product_count=Tag.product_count + 1)
+            )
+        if removed_tag_ids:
+            db.execute(
+                update(Tag).where(Tag.id.in_(removed_tag_ids)).values(product_count=Tag.product_count - 1)
+            )
 
-        for i in range(len(all_tags)):
-            if all_tags[i].id in processed_tag_ids:
-                continue
+    @staticmethod
+    def reconcile_product_counts(db: Session) -> int:
+        """
+        根据 product_tag 关联表重新计算所有标签的产品数量，修正增量维护产生的偏差
+        返回被修正的标签数量
+        """
+        actual_count = (
+            select(func.count())
+            .select_from(product_tag_association)
+            .where(product_tag_association.c.tag_id == Tag.id)
+            .scalar_subquery()
+        )
+        result = db.execute(
+            update(Tag)
+            .where(Tag.product_count != actual_count)
+            .values(product_count=actual_count)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        if result.rowcount:
+            invalidate_product_caches()
+        return result.rowcount
 
-            primary_tag = all_tags[i]
-            
-            # Find other tags that are similar to this primary_tag's normalized_name
-            # We query again to avoid issues if some tags were deleted during the loop
-            candidate_tags = db.query(Tag).filter(
-                Tag.id != primary_tag.id, # Not itself
-                Tag.id.notin_(processed_tag_ids) # Not already processed
-            ).all()
+    @staticmethod
+    def get_popular_tags(db: Session, limit: Optional[int] = None) -> List[Tag]:
+        """按产品数量降序获取有关联产品的标签"""
+        query = db.query(Tag).filter(Tag.product_count > 0).order_by(Tag.product_count.desc(), Tag.name)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
 
-            secondary_tag_ids_to_merge = []
-            for secondary_tag_candidate in candidate_tags:
-                similarity = TagNormalizer.calculate_similarity(
-                    primary_tag.normalized_name, 
-                    secondary_tag_candidate.normalized_name
-                )
-                if similarity >= threshold:
-                    secondary_tag_ids_to_merge.append(secondary_tag_candidate.id)
-            
-            if secondary_tag_ids_to_merge:
-                try:
-                    print(f"Merging {len(secondary_tag_ids_to_merge)} tags into '{primary_tag.name}' (ID: {primary_tag.id}) with threshold {threshold}")
-                    TagService.merge_tags(db, primary_tag.id, secondary_tag_ids_to_merge)
-                    merged_count += len(secondary_tag_ids_to_merge)
-                    processed_tag_ids.add(primary_tag.id)
-                    for sec_id in secondary_tag_ids_to_merge:
-                        processed_tag_ids.add(sec_id)
-                except Exception as e:
-                    print(f"Error during auto-merge for primary tag {primary_tag.id}: {e}")
-                    db.rollback() # Rollback on error for this merge group
+    @staticmethod
+    def rebuild_alias_table(db: Session) -> int:
+        """
+        根据标签的 aliases JSON 字段重建别名表
+        用于别名表上线前已合并的历史数据，返回写入的别名数量
+        """
+        db.execute(delete(TagAlias))
+        
+        seen = set()
+        for tag in db.query(Tag).filter(Tag.aliases.isnot(None)).order_by(Tag.id).all():
+            reserved = {tag.normalized_name, TagNormalizer.normalize_tag_name(tag.name)}
+            for alias in tag.aliases or []:
+                alias_normalized = TagNormalizer.normalize_tag_name(alias or "")
+                if not alias_normalized or alias_normalized in seen or alias_normalized in reserved:
+                    continue
+                seen.add(alias_normalized)
+                db.add(TagAlias(alias_normalized=alias_normalized, alias=alias, tag_id=tag.id))
+        
+        db.commit()
+        invalidate_product_caches()
+        return len(seen)
 
-        if merged_count > 0:
-             print(f"Auto-merged a total of {merged_count} tags.")
-        else:
+    @staticmethod
+    def auto_merge_similar_tags(db: Session, threshold: float = 0.90, workers: Optional[int] = None) -> Dict[str, int]:
+        """
+        自动查找并合并高度相似的标签。
+        先由 TagMergePlanner 离线生成合并计划（按创建时间遍历，最早创建的标签作为主标签），
+        再在单个事务中批量应用。
+        """
+        from .tag_merge_planner import TagMergePlanner
+
+        plan = TagMergePlanner.build_plan(db, threshold=threshold, workers=workers)
+        if not plan["clusters"]:
             print("No tags found to auto-merge with the given threshold.")
-            
-        return {"merged_count": merged_count} 
\ No newline at end of file
+            return {"merged_count": 0}
+
+        result = TagMergePlanner.apply_plan(db, plan)
+        print(f"Auto-merged a total of {result['merged_count']} tags.")
+        return {"merged_count": result["merged_count"]}
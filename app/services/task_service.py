@@ -12,17 +12,31 @@ from app.core.database import SessionLocal
 from app.core.scheduler import scheduler
 from app.core.config import settings
 from app.services.hackernews_service import HackerNewsService
+from app.services.collection_service import CollectionService
 from app.services.product_service import ProductService
+from app.services.product_card_service import ProductCardService
+from app.services.trending_service import TrendingService
+from app.services.score_history_service import ScoreHistoryService
 from app.services.tag_service import TagService
+from app.services.tag_relation_service import TagRelationService
 from app.utils.logger import logger
 
+# 已被替换、不再注册的任务ID（collect_hackernews 已并入 collect_sources）
+RETIRED_JOB_IDS = ("collect_hackernews",)
+
 class TaskService:
     """任务服务，负责注册和管理所有数据收集任务"""
     
     @staticmethod
     def register_tasks():
         """注册所有定时任务"""
-        TaskService.register_hackernews_task()
+        TaskService.register_collection_task()
+        TaskService.register_hackernews_rescore_task()
+        TaskService.register_score_history_task()
+        TaskService.register_tag_count_reconcile_task()
+        TaskService.register_tag_relations_task()
+        TaskService.register_product_cards_task()
+        TaskService.register_trending_task()
         
         # 如果启用了AI分析，注册产品处理任务
         if settings.ENABLE_AI_ANALYSIS:
@@ -30,23 +44,45 @@ class TaskService:
             TaskService.register_tag_merge_task()
             TaskService.register_featured_products_task()
         
-        # 未来添加更多任务
-        # TaskService.register_indiehackers_task()
-        
         logger.info("所有定时任务已注册")
     
     @staticmethod
-    def register_hackernews_task():
-        """注册HackerNews数据收集任务"""
+    def register_collection_task():
+        """注册数据收集任务（所有启用的数据源在同一任务中并发采集，新增数据源无需新增任务）"""
         # 使用cron触发器，设置为每天早上10点执行
         scheduler.add_job(
-            func=TaskService.run_hackernews_collection,
-            job_id="collect_hackernews",
+            func=TaskService.run_collection,
+            job_id="collect_sources",
             cron_expression="0 16 * * *", 
-            job_name="HackerNews每日收集"
+            job_name="数据源每日收集"
+        )
+        
+        logger.info("已注册数据收集任务，将在每天上午10:00执行")
+    
+    @staticmethod
+    def register_hackernews_rescore_task():
+        """注册HackerNews帖子分数刷新任务"""
+        scheduler.add_job(
+            func=TaskService.run_hackernews_rescore,
+            job_id="rescore_hackernews",
+            interval_seconds=settings.HN_RESCORE_INTERVAL,
+            job_name="刷新HackerNews帖子分数"
+        )
+        
+        logger.info(f"已注册HackerNews帖子分数刷新任务，每 {settings.HN_RESCORE_INTERVAL} 秒执行一次")
+    
+    @staticmethod
+    def register_score_history_task():
+        """注册分数时间序列压缩任务"""
+        # 使用cron触发器，在每天凌晨3:30执行
+        scheduler.add_job(
+            func=TaskService.run_score_history_compaction,
+            job_id="compact_score_history",
+            cron_expression="30 3 * * *",
+            job_name="压缩帖子分数时间序列"
         )
         
-        logger.info("已注册HackerNews数据收集任务，将在每天上午10:00执行")
+        logger.info("已注册帖子分数时间序列压缩任务，将在每天凌晨3:30执行")
     
     @staticmethod
     def register_product_processing_task():
@@ -73,6 +109,57 @@ class TaskService:
         
         logger.info("已注册标签自动合并任务，将在每天上午10:20执行")
     
+    @staticmethod
+    def register_tag_count_reconcile_task():
+        """注册标签产品数量校准任务"""
+        # 使用cron触发器，在每天凌晨3:00执行
+        scheduler.add_job(
+            func=TaskService.run_tag_count_reconcile,
+            job_id="reconcile_tag_counts",
+            cron_expression="0 3 * * *",
+            job_name="校准标签产品数量"
+        )
+        
+        logger.info("已注册标签产品数量校准任务，将在每天凌晨3:00执行")
+    
+    @staticmethod
+    def register_tag_relations_task():
+        """注册相关标签重建任务"""
+        # 使用cron触发器，在每天凌晨3:10执行（在标签产品数量校准之后）
+        scheduler.add_job(
+            func=TaskService.run_tag_relations_rebuild,
+            job_id="rebuild_tag_relations",
+            cron_expression="10 3 * * *",
+            job_name="重建相关标签"
+        )
+        
+        logger.info("已注册相关标签重建任务，将在每天凌晨3:10执行")
+    
+    @staticmethod
+    def register_product_cards_task():
+        """注册产品卡片重建任务"""
+        # 使用cron触发器，在每天凌晨3:20执行（在相关标签重建之后），校正增量同步可能遗漏的卡片
+        scheduler.add_job(
+            func=TaskService.run_product_cards_rebuild,
+            job_id="rebuild_product_cards",
+            cron_expression="20 3 * * *",
+            job_name="重建产品卡片"
+        )
+        
+        logger.info("已注册产品卡片重建任务，将在每天凌晨3:20执行")
+    
+    @staticmethod
+    def register_trending_task():
+        """注册热度分数计算任务"""
+        scheduler.add_job(
+            func=TaskService.run_trending_refresh,
+            job_id="refresh_trending_scores",
+            interval_seconds=settings.TRENDING_REFRESH_INTERVAL,
+            job_name="计算热度分数"
+        )
+        
+        logger.info(f"已注册热度分数计算任务，每 {settings.TRENDING_REFRESH_INTERVAL} 秒执行一次")
+    
     @staticmethod
     def register_featured_products_task():
         """注册精选产品更新任务"""
@@ -86,6 +173,36 @@ class TaskService:
         
         logger.info("已注册精选产品更新任务，将在每天上午10:30执行")
     
+    @staticmethod
+    def run_collection():
+        """执行所有数据源采集任务的包装函数"""
+        # 创建数据库会话
+        db = SessionLocal()
+        
+        try:
+            # 创建事件循环并执行异步任务
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            
+            # 运行异步任务并获取结果
+            result = loop.run_until_complete(CollectionService.run_collection(db))
+            
+            # 关闭事件循环
+            loop.close()
+            
+            logger.info(f"数据收集任务执行完成，保存了 {result} 条新帖子")
+            return result
+            
+        except Exception as e:
+            logger.error(f"执行数据收集任务时出错: {e}")
+            # 打印完整的异常堆栈
+            import traceback
+            logger.error(traceback.format_exc())
+            return 0
+            
+        finally:
+            db.close()
+    
     @staticmethod
     def run_hackernews_collection():
         """执行HackerNews数据收集任务的包装函数"""
@@ -116,6 +233,57 @@ class TaskService:
         finally:
             db.close()
     
+    @staticmethod
+    def run_hackernews_rescore():
+        """执行HackerNews帖子分数刷新任务的包装函数"""
+        # 创建数据库会话
+        db = SessionLocal()
+        
+        try:
+            # 创建事件循环并执行异步任务
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            
+            # 运行异步任务并获取结果
+            result = loop.run_until_complete(HackerNewsService.run_rescore(db))
+            
+            # 关闭事件循环
+            loop.close()
+            
+            logger.info(f"HackerNews帖子分数刷新任务执行完成，{result} 条帖子的分数有变化")
+            return result
+            
+        except Exception as e:
+            logger.error(f"执行HackerNews帖子分数刷新任务时出错: {e}")
+            # 打印完整的异常堆栈
+            import traceback
+            logger.error(traceback.format_exc())
+            return 0
+            
+        finally:
+            db.close()
+    
+    @staticmethod
+    def run_score_history_compaction():
+        """执行分数时间序列压缩任务"""
+        # 创建数据库会话
+        db = SessionLocal()
+        
+        try:
+            result = ScoreHistoryService.compact(db)
+            logger.info(f"分数时间序列压缩任务执行完成: {result}")
+            return result
+            
+        except Exception as e:
+            logger.error(f"执行分数时间序列压缩任务时出错: {e}")
+            # 打印完整的异常堆栈
+            import traceback
+            logger.error(traceback.format_exc())
+            return {}
+            
+        finally:
+            db.close()
+    
     @staticmethod
     def run_product_processing():
         """执行产品处理任务的包装函数"""
@@ -134,6 +302,10 @@ class TaskService:
             min_points = settings.AI_ANALYSIS_MIN_POINTS
             result = loop.run_until_complete(service.process_unprocessed_posts(min_points))
             
+            # 有新产品时刷新首页精选快照
+            if result > 0:
+                loop.run_until_complete(service.refresh_featured_snapshot())
+            
             # 关闭事件循环
             loop.close()
             
@@ -150,6 +322,38 @@ class TaskService:
         finally:
             db.close()
     
+    @staticmethod
+    def run_post_processing(post_id: int) -> Dict[str, Any]:
+        """
+        处理单个帖子（后台任务队列的工作函数，在工作线程中执行）
+
+        Returns:
+            包含 product_id 的任务结果
+
+        Raises:
+            RuntimeError: 处理失败时抛出，任务状态记为失败
+        """
+        # 创建数据库会话
+        db = SessionLocal()
+
+        try:
+            # 工作线程没有事件循环，为本次任务创建一个
+            loop = asyncio.new_event_loop()
+            try:
+                service = ProductService(db)
+                product = loop.run_until_complete(service.process_post(post_id))
+                if not product:
+                    raise RuntimeError(f"Failed to process post {post_id}")
+
+                # 刷新首页精选快照
+                loop.run_until_complete(service.refresh_featured_snapshot())
+                return {"post_id": post_id, "product_id": product.id}
+            finally:
+                loop.close()
+
+        finally:
+            db.close()
+
     @staticmethod
     def run_tag_auto_merge():
         """执行标签自动合并任务"""
@@ -176,6 +380,95 @@ class TaskService:
         finally:
             db.close()
     
+    @staticmethod
+    def run_tag_count_reconcile():
+        """执行标签产品数量校准任务"""
+        # 创建数据库会话
+        db = SessionLocal()
+        
+        try:
+            fixed_count = TagService.reconcile_product_counts(db)
+            logger.info(f"标签产品数量校准任务执行完成，修正了 {fixed_count} 个标签")
+            return fixed_count
+            
+        except Exception as e:
+            logger.error(f"执行标签产品数量校准任务时出错: {e}")
+            # 打印完整的异常堆栈
+            import traceback
+            logger.error(traceback.format_exc())
+            return 0
+            
+        finally:
+            db.close()
+    
+    @staticmethod
+    def run_tag_relations_rebuild():
+        """执行相关标签重建任务"""
+        # 创建数据库会话
+        db = SessionLocal()
+        
+        try:
+            count = TagRelationService.rebuild(
+                db,
+                top_k=settings.TAG_RELATION_TOP_K,
+                metric=settings.TAG_RELATION_METRIC,
+                min_co_count=settings.TAG_RELATION_MIN_CO_COUNT
+            )
+            logger.info(f"相关标签重建任务执行完成，写入了 {count} 条相关标签记录")
+            return count
+            
+        except Exception as e:
+            logger.error(f"执行相关标签重建任务时出错: {e}")
+            # 打印完整的异常堆栈
+            import traceback
+            logger.error(traceback.format_exc())
+            return 0
+            
+        finally:
+            db.close()
+    
+    @staticmethod
+    def run_product_cards_rebuild():
+        """执行产品卡片重建任务"""
+        # 创建数据库会话
+        db = SessionLocal()
+        
+        try:
+            count = ProductCardService.rebuild_all(db)
+            logger.info(f"产品卡片重建任务执行完成，写入了 {count} 张卡片")
+            return count
+            
+        except Exception as e:
+            logger.error(f"执行产品卡片重建任务时出错: {e}")
+            # 打印完整的异常堆栈
+            import traceback
+            logger.error(traceback.format_exc())
+            return 0
+            
+        finally:
+            db.close()
+    
+    @staticmethod
+    def run_trending_refresh():
+        """执行热度分数计算任务"""
+        # 创建数据库会话
+        db = SessionLocal()
+        
+        try:
+            count = TrendingService.refresh_scores(db)
+            logger.info(f"热度分数计算任务执行完成，更新了 {count} 个产品")
+            return count
+            
+        except Exception as e:
+            logger.error(f"执行热度分数计算任务时出错: {e}")
+            # 打印完整的异常堆栈
+            import traceback
+            logger.error(traceback.format_exc())
+            return 0
+            
+        finally:
+            db.close()
+    
     @staticmethod
     def run_featured_products_update():
         """执行精选产品更新任务"""
@@ -193,6 +486,9 @@ class TaskService:
             # 运行异步任务并获取结果
             result = loop.run_until_complete(service.generate_images_for_featured_products())
             
+            # 刷新首页精选快照（包含新生成的概念图）
+            loop.run_until_complete(service.refresh_featured_snapshot())
+            
             # 关闭事件循环
             loop.close()
             
@@ -213,6 +509,12 @@ class TaskService:
     def start_scheduler():
         """启动调度器"""
         scheduler.start()
+        
+        # 持久化存储（PostgreSQL）中可能残留已被替换的任务，启动后移除
+        stored_job_ids = {job.id for job in scheduler.get_jobs()}
+        for job_id in RETIRED_JOB_IDS:
+            if job_id in stored_job_ids:
+                scheduler.remove_job(job_id)
     
     @staticmethod
     def shutdown_scheduler():
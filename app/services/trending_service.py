@@ -0,0 +1,146 @@
+"""
+热度趋势服务模块 - 计算随时间衰减的热度分数（trending 排序）
+
+采用 HackerNews 的排名公式：score = (P - 1) / (T + 2) ^ G
+- P: 热度（points + comments_count，与 popular 排序一致）
+- T: 帖子发布至今的小时数
+- G: 重力系数 TRENDING_GRAVITY，越大衰减越快
+
+分数由定时任务用 NumPy 对发布时间在统计窗口内的帖子批量计算，写入 product_cards.trending_score（带索引），
+列表按该列排序时只需索引扫描；超出统计窗口的产品分数置0。
+"""
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import and_, bindparam, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import invalidate_product_caches
+from app.core.config import settings
+from app.models.posts import Post
+from app.models.product_card import ProductCard
+from app.models.products import Product
+from app.utils.logger import logger
+
+# 每批更新的卡片数量
+TRENDING_UPDATE_BATCH_SIZE = 1000
+
+
+class TrendingService:
+    """热度趋势服务"""
+
+    @staticmethod
+    def compute_scores(popularity: np.ndarray, age_hours: np.ndarray, gravity: Optional[float] = None) -> np.ndarray:
+        """
+        按排名公式批量计算热度分数
+
+        Args:
+            popularity: 热度数组
+            age_hours: 发布至今的小时数数组（负值按0处理）
+            gravity: 重力系数，None时使用配置
+
+        Returns:
+            分数数组（非负）
+        """
+        gravity = settings.TRENDING_GRAVITY if gravity is None else gravity
+        points = np.maximum(np.asarray(popularity, dtype=np.float64) - 1.0, 0.0)
+        age = np.maximum(np.asarray(age_hours, dtype=np.float64), 0.0)
+        return points / np.power(age + 2.0, gravity)
+
+    @staticmethod
+    def score_posts(
+        popularity: Sequence[int],
+        published_at: Sequence[Optional[datetime]],
+        collected_at: Sequence[datetime],
+        now: Optional[datetime] = None
+    ) -> np.ndarray:
+        """
+        根据帖子的发布时间计算热度分数，发布时间超出 TRENDING_WINDOW_DAYS 的分数为0
+
+        published_at 由爬虫按本地时间写入，collected_at 按UTC写入，
+        因此分别与本地时间和UTC时间相减；缺少发布时间时以采集时间代替。
+        """
+        if not len(popularity):
+            return np.empty(0, dtype=np.float64)
+        local_now = now or datetime.now()
+        utc_now = now or datetime.utcnow()
+        age_hours = np.array([
+            ((local_now - published) if published else (utc_now - collected)).total_seconds() / 3600.0
+            for published, collected in zip(published_at, collected_at)
+        ])
+        scores = TrendingService.compute_scores(np.asarray(popularity), age_hours)
+        scores[age_hours > settings.TRENDING_WINDOW_DAYS * 24] = 0.0
+        return scores
+
+    @staticmethod
+    def _in_window(now: Optional[datetime] = None):
+        """
+        发布时间在统计窗口内的帖子条件，与 score_posts 的年龄计算一致：
+        按本地时间比较 published_at，缺少发布时间时按UTC时间比较 collected_at
+        """
+        window = timedelta(days=settings.TRENDING_WINDOW_DAYS)
+        local_cutoff = (now or datetime.now()) - window
+        utc_cutoff = (now or datetime.utcnow()) - window
+        return or_(
+            Post.published_at >= local_cutoff,
+            and_(Post.published_at.is_(None), Post.collected_at >= utc_cutoff)
+        )
+
+    @staticmethod
+    def refresh_scores(db: Session, now: Optional[datetime] = None) -> int:
+        """
+        重新计算近期产品的热度分数并提交
+
+        先按发布时间取出统计窗口内的卡片（一次查询），用 NumPy 计算分数后按主键批量更新，
+        窗口外仍有分数的卡片用一条 UPDATE 置0。
+
+        Returns:
+            更新的卡片数量
+        """
+        window = TrendingService._in_window(now)
+        recent = (
+            select(Product.id)
+            .join(Post, Post.id == Product.post_id)
+            .where(window)
+        )
+        rows = db.execute(
+            select(ProductCard.id, ProductCard.popularity, Post.published_at, Post.collected_at)
+            .join(Product, Product.id == ProductCard.id)
+            .join(Post, Post.id == Product.post_id)
+            .where(window)
+        ).all()
+
+        scores = TrendingService.score_posts(
+            [row.popularity for row in rows],
+            [row.published_at for row in rows],
+            [row.collected_at for row in rows],
+            now
+        )
+        params: List[dict] = [
+            {"card_id": row.id, "score": float(score)} for row, score in zip(rows, scores)
+        ]
+        # 热度分数不属于导出字段，显式保留 updated_at，避免 onupdate 使增量导出重复发送未变化的产品
+        update_scores = (
+            update(ProductCard.__table__)
+            .where(ProductCard.__table__.c.id == bindparam("card_id"))
+            .values(trending_score=bindparam("score"), updated_at=ProductCard.__table__.c.updated_at)
+        )
+
+        try:
+            expired = db.execute(
+                update(ProductCard)
+                .where(ProductCard.trending_score > 0, ProductCard.id.notin_(recent))
+                .values(trending_score=0.0, updated_at=ProductCard.updated_at)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            for start in range(0, len(params), TRENDING_UPDATE_BATCH_SIZE):
+                db.execute(update_scores, params[start:start + TRENDING_UPDATE_BATCH_SIZE])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        invalidate_product_caches()
+
+        logger.info(f"热度分数已更新: {len(params)} 个近期产品，{expired} 个产品移出统计窗口")
+        return len(params) + expired
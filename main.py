@@ -25,6 +25,10 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 # 配置模板
 templates = Jinja2Templates(directory="templates")
 
+# 配置响应缓存
+from app.core.response_cache import ResponseCacheMiddleware, response_cache
+app.add_middleware(ResponseCacheMiddleware, cache=response_cache)
+
 # 导入路由
 from app.api.endpoints import router as api_router
 app.include_router(api_router)
@@ -93,6 +97,9 @@ async def shutdown_event():
         logger.info("应用关闭中...")
         # 关闭调度器
         TaskService.shutdown_scheduler()
+        # 关闭后台任务队列（取消尚未开始的任务）
+        from app.core.jobs import job_queue
+        job_queue.shutdown()
         logger.info("应用关闭完成")
     except Exception as e:
         logger.error(f"应用关闭时出错: {e}")
@@ -6,35 +6,61 @@
 import sys
 import os
 import argparse
+from typing import Optional
 
 # 添加项目根目录到Python路径
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from app.core.database import SessionLocal
-from app.services.tag_service import TagService
+from app.services.tag_merge_planner import TagMergePlanner
 from app.utils.logger import logger
 
-def auto_merge_tags(threshold: float = 0.70, dry_run: bool = False):
+def print_plan(plan: dict):
+    """打印合并计划摘要"""
+    clusters = plan.get("clusters", [])
+    if not clusters:
+        print(f"没有找到相似度 >= {plan.get('threshold')} 的标签")
+        return
+    
+    print(f"\n合并计划: {len(clusters)} 组，共 {plan.get('merge_count', 0)} 个标签将被合并")
+    for i, cluster in enumerate(clusters, 1):
+        primary = cluster["primary"]
+        print(f"\n组 {i}: 主标签 '{primary['name']}' (ID: {primary['id']}, 产品数: {primary['product_count']})"
+              f"，影响产品 {cluster['affected_products']} 个")
+        for secondary in cluster["secondaries"]:
+            print(f"  - '{secondary['name']}' (ID: {secondary['id']}, 相似度: {secondary['similarity']:.3f}, "
+                  f"产品数: {secondary['product_count']})")
+
+def auto_merge_tags(threshold: float = 0.70, dry_run: bool = False, plan_out: Optional[str] = None,
+                    workers: Optional[int] = None):
     """
     执行标签自动合并
     
     Args:
         threshold: 相似度阈值，默认0.90
-        dry_run: 是否为试运行模式，不实际执行合并
+        dry_run: 是否为试运行模式，只生成合并计划，不实际执行合并
+        plan_out: 合并计划JSON的输出路径
+        workers: 计算相似度使用的进程数
     """
     db = SessionLocal()
     
     try:
         logger.info(f"开始标签自动合并，相似度阈值: {threshold}")
         
+        # 生成合并计划（相似度计算不占用数据库事务）
+        plan = TagMergePlanner.build_plan(db, threshold=threshold, workers=workers)
+        
+        if plan_out:
+            TagMergePlanner.save_plan(plan, plan_out)
+            print(f"合并计划已写入: {plan_out}")
+        
         if dry_run:
-            logger.info("试运行模式：将显示可能的合并操作，但不会实际执行")
-            # 在试运行模式下，我们需要模拟合并过程
-            # 这里简化处理，实际可以扩展TagService来支持dry_run模式
-            logger.warning("试运行模式暂未完全实现，将执行实际合并")
+            logger.info("试运行模式：仅显示合并计划，不会实际执行")
+            print_plan(plan)
+            return 0
         
         # 执行自动合并
-        result = TagService.auto_merge_similar_tags(db, threshold=threshold)
+        result = TagMergePlanner.apply_plan(db, plan)
         merged_count = result.get('merged_count', 0)
         
         if merged_count > 0:
@@ -56,6 +82,31 @@ def auto_merge_tags(threshold: float = 0.70, dry_run: bool = False):
     finally:
         db.close()
 
+def apply_saved_plan(plan_path: str):
+    """
+    应用之前导出并审核过的合并计划
+    
+    Args:
+        plan_path: 合并计划JSON文件路径
+    """
+    db = SessionLocal()
+    
+    try:
+        plan = TagMergePlanner.load_plan(plan_path)
+        logger.info(f"应用合并计划: {plan_path} (生成于 {plan.get('generated_at')})")
+        
+        result = TagMergePlanner.apply_plan(db, plan)
+        print(f"成功合并了 {result['merged_count']} 个标签，跳过 {result['skipped_count']} 个")
+        return result['merged_count']
+        
+    except Exception as e:
+        logger.error(f"❌ 应用合并计划时出错: {e}")
+        print(f"错误: {e}")
+        return 0
+        
+    finally:
+        db.close()
+
 def show_similar_tags(threshold: float = 0.90):
     """
     显示相似标签但不执行合并
@@ -129,7 +180,26 @@ def main():
     parser.add_argument(
         "--dry-run",
         action="store_true",
-        help="试运行模式，显示可能的合并操作但不实际执行"
+        help="试运行模式，显示合并计划但不实际执行"
+    )
+    
+    parser.add_argument(
+        "--plan-out",
+        type=str,
+        help="将合并计划写入指定的JSON文件，便于审核"
+    )
+    
+    parser.add_argument(
+        "--apply-plan",
+        type=str,
+        help="应用之前导出的合并计划JSON文件"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="计算相似度使用的进程数，默认使用配置或CPU核数"
     )
     
     parser.add_argument(
@@ -149,10 +219,12 @@ def main():
     print("标签自动合并工具")
     print("=" * 50)
     
-    if args.show_similar:
+    if args.apply_plan:
+        apply_saved_plan(args.apply_plan)
+    elif args.show_similar:
         show_similar_tags(args.threshold)
     else:
-        auto_merge_tags(args.threshold, args.dry_run)
+        auto_merge_tags(args.threshold, args.dry_run, args.plan_out, args.workers)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
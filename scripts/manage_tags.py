@@ -4,6 +4,7 @@
 提供命令行工具来管理标签，包括：
 - 填充现有标签的normalized_name字段
 - 自动合并相似度高的标签
+- 根据标签的aliases字段重建别名查询表
 """
 import sys
 import os
@@ -42,6 +43,12 @@ def main():
         help="Automatically find and merge highly similar tags."
     )
     
+    parser.add_argument(
+        "--rebuild-aliases",
+        action="store_true",
+        help="Rebuild the tag_aliases lookup table from the aliases JSON of existing tags."
+    )
+    
     parser.add_argument(
         "--threshold",
         type=float,
@@ -51,9 +58,9 @@ def main():
 
     args = parser.parse_args()
 
-    if not args.populate_normalized and not args.auto_merge:
+    if not args.populate_normalized and not args.auto_merge and not args.rebuild_aliases:
         parser.print_help()
-        print("\nError: Please specify an action (--populate-normalized or --auto-merge).")
+        print("\nError: Please specify an action (--populate-normalized, --auto-merge or --rebuild-aliases).")
         sys.exit(1)
 
     if args.threshold < 0.0 or args.threshold > 1.0:
@@ -68,6 +75,11 @@ def main():
             count = TagService.populate_normalized_names_for_existing_tags(db)
             logger.info(f"Finished: Populated/merged {count} tags.")
             
+        if args.rebuild_aliases:
+            logger.info("Starting: Rebuild tag alias lookup table...")
+            count = TagService.rebuild_alias_table(db)
+            logger.info(f"Finished: Wrote {count} aliases.")
+            
         if args.auto_merge:
             logger.info(f"Starting: Auto-merge similar tags with threshold >= {args.threshold}...")
             result = TagService.auto_merge_similar_tags(db, threshold=args.threshold)
@@ -71,10 +71,22 @@ def run_scheduler(is_daemon=False):
 def run_once(task_id=None):
     """立即运行指定任务一次"""
     try:
-        if task_id == "hackernews" or task_id is None:
+        if task_id == "collect" or task_id is None:
+            logger.info("开始执行所有数据源采集任务...")
+            result = TaskService.run_collection()
+            logger.info(f"任务执行完成，收集了 {result} 条新帖子")
+        elif task_id == "hackernews":
             logger.info("开始执行HackerNews数据收集任务...")
             result = TaskService.run_hackernews_collection()
             logger.info(f"任务执行完成，收集了 {result} 条新帖子")
+        elif task_id == "hackernews-rescore":
+            logger.info("开始执行HackerNews帖子分数刷新任务...")
+            result = TaskService.run_hackernews_rescore()
+            logger.info(f"任务执行完成，{result} 条帖子的分数有变化")
+        elif task_id == "score-history":
+            logger.info("开始执行分数时间序列压缩任务...")
+            result = TaskService.run_score_history_compaction()
+            logger.info(f"任务执行完成: {result}")
         elif task_id == "products":
             logger.info("开始执行产品处理任务...")
             result = TaskService.run_product_processing()
@@ -83,6 +95,22 @@ def run_once(task_id=None):
             logger.info("开始执行标签自动合并任务...")
             result = TaskService.run_tag_auto_merge()
             logger.info(f"任务执行完成，合并了 {result} 个标签")
+        elif task_id == "tag-counts":
+            logger.info("开始执行标签产品数量校准任务...")
+            result = TaskService.run_tag_count_reconcile()
+            logger.info(f"任务执行完成，修正了 {result} 个标签")
+        elif task_id == "tag-relations":
+            logger.info("开始执行相关标签重建任务...")
+            result = TaskService.run_tag_relations_rebuild()
+            logger.info(f"任务执行完成，写入了 {result} 条相关标签记录")
+        elif task_id == "product-cards":
+            logger.info("开始执行产品卡片重建任务...")
+            result = TaskService.run_product_cards_rebuild()
+            logger.info(f"任务执行完成，写入了 {result} 张产品卡片")
+        elif task_id == "trending":
+            logger.info("开始执行热度分数计算任务...")
+            result = TaskService.run_trending_refresh()
+            logger.info(f"任务执行完成，更新了 {result} 个产品的热度分数")
         elif task_id == "featured":
             logger.info("开始执行精选产品更新任务...")
             result = TaskService.run_featured_products_update()
@@ -114,7 +142,7 @@ if __name__ == "__main__":
     parser.add_argument(
         "--task", 
         type=str, 
-        choices=["hackernews", "products", "tags", "featured"],
+        choices=["collect", "hackernews", "hackernews-rescore", "score-history", "products", "tags", "tag-counts", "tag-relations", "product-cards", "trending", "featured"],
         help="指定要运行的任务ID，仅在--run-once时有效"
     )
     
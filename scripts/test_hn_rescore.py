@@ -0,0 +1,208 @@
+"""
+测试HackerNews帖子分数刷新的脚本
+
+使用内存SQLite数据库和临时的帖子缓存文件，用假的网络请求模拟HN API，检查：
+- 采集时已较旧的帖子在缓存有效期内被刷新时仍然请求网络，连续未变化次数只随真实请求增长；
+- 分数变化时更新帖子并清零连续未变化次数，首页精选快照中的分数同步更新；
+- 新帖子早期连续未变化后仍按最长间隔继续刷新，之后的分数变化能被更新。
+"""
+import sys
+import os
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models import Source, Post, Product
+from app.scrapers import item_cache
+from app.scrapers.hackernews import HackerNewsClient
+from app.services.hackernews_service import HackerNewsService
+from app.services.product_card_service import ProductCardService
+from app.services.product_service import ProductService
+
+# 模拟的刷新任务运行间隔和运行时长（小时）
+RUN_INTERVAL_HOURS = 0.25
+RUN_HOURS = 6
+
+# 帖子在采集时已发布的时长（小时），对应的缓存有效期为4小时
+POST_AGE_AT_COLLECTION_HOURS = 48
+
+
+class FakeHackerNewsAPI:
+    """替代 fetch_json 的假HN API，按帖子ID返回数据并记录请求次数"""
+
+    def __init__(self, items: dict):
+        self.items = items
+        self.requests = 0
+
+    async def fetch_json(self, client, url: str):
+        self.requests += 1
+        item_id = int(url.rsplit("/", 1)[1].split(".")[0])
+        return dict(self.items[item_id])
+
+
+def create_test_session():
+    """创建内存数据库和一个采集时已发布48小时的HN帖子"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+
+    source = Source(name="HackerNews", url="https://news.ycombinator.com/", active=True)
+    db.add(source)
+    db.flush()
+
+    collected_at = datetime.utcnow()
+    published_at = collected_at - timedelta(hours=POST_AGE_AT_COLLECTION_HOURS)
+    post = Post(
+        source_id=source.id,
+        original_id="1001",
+        title="Show HN: Old Product",
+        url="https://example.com/old",
+        published_at=published_at,
+        points=50,
+        comments_count=10,
+        collected_at=collected_at
+    )
+    db.add(post)
+    db.commit()
+    return db, post
+
+
+def check(name: str, passed: bool, detail: str = "") -> bool:
+    """打印检查结果"""
+    status = "通过" if passed else "失败"
+    print(f"[{status}] {name}{': ' + detail if detail else ''}")
+    return passed
+
+
+async def run_rescore(db, now: datetime) -> int:
+    """运行一次分数刷新"""
+    return await HackerNewsService(db).rescore_recent_posts(now=now)
+
+
+async def run_checks() -> bool:
+    """执行所有分数刷新检查"""
+    results = []
+    original_fetch_json = HackerNewsClient.fetch_json
+    original_cache_path = settings.HN_ITEM_CACHE_PATH
+    original_cache_enabled = settings.HN_ITEM_CACHE
+
+    with tempfile.TemporaryDirectory() as directory:
+        settings.HN_ITEM_CACHE = True
+        settings.HN_ITEM_CACHE_PATH = os.path.join(directory, "hn_items.db")
+        item_cache._item_cache = None
+        db, post = create_test_session()
+
+        # 采集时写入的缓存条目：发布于48小时前，在缓存中4小时内都是新鲜的
+        item = {
+            "id": 1001, "type": "story", "title": post.title,
+            "time": int(datetime.now().timestamp()) - POST_AGE_AT_COLLECTION_HOURS * 3600,
+            "score": 50, "descendants": 10,
+        }
+        cache = item_cache.get_item_cache()
+        cache.set(1001, item)
+
+        api = FakeHackerNewsAPI({1001: item})
+        HackerNewsClient.fetch_json = lambda client, url: api.fetch_json(client, url)
+        try:
+            # 分数不变：每次到期的刷新都必须请求网络，连续未变化次数等于请求次数
+            collected_at = post.collected_at
+            steps = int(RUN_HOURS / RUN_INTERVAL_HOURS)
+            for step in range(1, steps + 1):
+                await run_rescore(db, collected_at + timedelta(hours=step * RUN_INTERVAL_HOURS))
+            db.expire_all()
+            post = db.get(Post, post.id)
+            results.append(check(
+                "缓存有效期内的刷新请求网络", api.requests > 0, f"{api.requests} 次请求"
+            ))
+            results.append(check(
+                "连续未变化次数只随真实请求增长",
+                post.score_stable_count == api.requests,
+                f"连续未变化 {post.score_stable_count} 次，请求 {api.requests} 次"
+            ))
+            results.append(check(
+                "刷新结果写回缓存", cache.snapshot()["writes"] == 1 + api.requests
+            ))
+
+            # 分数变化：更新帖子、清零连续未变化次数，写回缓存并更新精选快照
+            db.add(Product(post_id=post.id, name="Old Product", description="Description"))
+            db.commit()
+            ProductCardService.rebuild_all(db)
+            await ProductService(db).refresh_featured_snapshot()
+            api.items[1001] = {**item, "score": 80, "descendants": 25}
+            requests_before = api.requests
+            later = collected_at + timedelta(days=3)
+            changed = await run_rescore(db, later)
+            db.expire_all()
+            post = db.get(Post, post.id)
+            results.append(check(
+                "分数变化时更新帖子",
+                changed == 1 and api.requests == requests_before + 1
+                and (post.points, post.comments_count, post.score_stable_count) == (80, 25, 0),
+                f"点赞 {post.points}，评论 {post.comments_count}，连续未变化 {post.score_stable_count} 次"
+            ))
+            results.append(check(
+                "缓存中为最新数据", cache.get(1001)["score"] == 80
+            ))
+            featured_points = [card["post"]["points"] for card in await ProductService(db).get_featured_cards()]
+            results.append(check(
+                "精选快照中为最新分数", featured_points == [80], f"快照分数 {featured_points}"
+            ))
+
+            # 新帖子早期连续未变化：达到 HN_RESCORE_STABLE_LIMIT 后仍按最长间隔刷新
+            fresh_collected_at = later
+            fresh = Post(
+                source_id=post.source_id,
+                original_id="2002",
+                title="Show HN: Slow Starter",
+                url="https://example.com/slow",
+                published_at=fresh_collected_at,
+                points=3,
+                comments_count=0,
+                collected_at=fresh_collected_at
+            )
+            db.add(fresh)
+            db.commit()
+            fresh_item = {
+                "id": 2002, "type": "story", "title": fresh.title,
+                "time": int(datetime.now().timestamp()), "score": 3, "descendants": 0,
+            }
+            api.items[2002] = fresh_item
+            for step in range(1, int(16 / RUN_INTERVAL_HOURS) + 1):
+                hours = step * RUN_INTERVAL_HOURS
+                if hours == 6:
+                    # 安静期过后开始获得关注
+                    api.items[2002] = {**fresh_item, "score": 40, "descendants": 12}
+                await run_rescore(db, fresh_collected_at + timedelta(hours=hours))
+            db.expire_all()
+            fresh = db.get(Post, fresh.id)
+            results.append(check(
+                "早期未变化的帖子继续刷新",
+                (fresh.points, fresh.comments_count) == (40, 12),
+                f"点赞 {fresh.points}，评论 {fresh.comments_count}"
+            ))
+        finally:
+            HackerNewsClient.fetch_json = original_fetch_json
+            settings.HN_ITEM_CACHE_PATH = original_cache_path
+            settings.HN_ITEM_CACHE = original_cache_enabled
+            item_cache._item_cache = None
+            db.close()
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_checks())
+    sys.exit(0 if success else 1)
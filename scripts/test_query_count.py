@@ -0,0 +1,183 @@
+"""
+测试产品列表查询数量的脚本
+
+使用内存SQLite数据库构造测试数据，统计产品列表、精选产品和产品详情执行的SQL数量，
+确保查询数量是固定值，不随每页产品数量增长（防止N+1查询回归）。
+"""
+import sys
+import os
+import asyncio
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.cache import count_cache
+from app.core.database import Base
+from app.models import Source, Post, Product, Tag
+from app.services.product_card_service import ProductCardService
+from app.services.product_service import ProductService
+from app.services.source_service import SourceService
+
+# 各操作允许的最大查询数量
+# 列表: 总数 + 产品卡片（总数缓存在每次检查前清空，统计未命中缓存的情况）
+LISTING_MAX_QUERIES = 2
+# 精选: 今日产品 + 标签 + 补充产品 + 标签
+FEATURED_MAX_QUERIES = 4
+# 详情: 产品(含帖子和来源) + 标签
+DETAIL_MAX_QUERIES = 2
+# 批量详情: 与单个详情相同，不随产品数量增长
+BATCH_DETAIL_MAX_QUERIES = 2
+# 来源统计: 一次分组查询，不随来源数量增长
+SOURCE_STATS_MAX_QUERIES = 1
+# 首页精选快照: 按主键读取一行
+FEATURED_SNAPSHOT_MAX_QUERIES = 1
+
+
+class QueryCounter:
+    """统计引擎执行的SQL数量"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def reset(self):
+        self.count = 0
+
+
+def create_test_session():
+    """创建内存数据库并填充测试数据"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+
+    sources = [
+        Source(name="HackerNews", url="https://news.ycombinator.com/", active=True),
+        Source(name="IndieHackers", url="https://www.indiehackers.com/", active=True)
+    ]
+    db.add_all(sources)
+    tags = [Tag(name=f"tag{i}", normalized_name=f"tag{i}") for i in range(8)]
+    db.add_all(tags)
+    db.flush()
+
+    now = datetime.utcnow()
+    for i in range(40):
+        post = Post(
+            source_id=sources[i % 2].id,
+            original_id=str(i),
+            title=f"Show HN: Product {i}",
+            url=f"https://example.com/{i}",
+            content="content",
+            points=i * 3,
+            comments_count=i,
+            collected_at=now - timedelta(hours=i)
+        )
+        db.add(post)
+        db.flush()
+        product = Product(post_id=post.id, name=f"Product {i}", description=f"Description {i}")
+        product.tags = [tags[i % 8], tags[(i + 3) % 8]]
+        db.add(product)
+    db.commit()
+    ProductCardService.rebuild_all(db)
+    db.expunge_all()
+
+    return engine, db
+
+
+def check(name: str, actual: int, expected_max: int) -> bool:
+    """打印并检查查询数量"""
+    passed = actual <= expected_max
+    status = "通过" if passed else "失败"
+    print(f"[{status}] {name}: {actual} 次查询 (上限 {expected_max})")
+    return passed
+
+
+async def run_checks() -> bool:
+    """执行所有查询数量检查"""
+    engine, db = create_test_session()
+    counter = QueryCounter(engine)
+    service = ProductService(db)
+    results = []
+
+    try:
+        for sort_by in ["latest", "popular", "name"]:
+            for source in [None, "HackerNews"]:
+                counts = []
+                for per_page in [5, 20]:
+                    db.expunge_all()
+                    count_cache.clear()
+                    counter.reset()
+                    data = await service.get_products_with_pagination(
+                        page=1, per_page=per_page, source_name=source, sort_by_value=sort_by
+                    )
+                    # 模拟模板和API访问卡片数据
+                    for card in data["products"]:
+                        _ = [t["name"] for t in card.tags]
+                        _ = card.source_name
+                    counts.append(counter.count)
+                label = f"产品列表 sort_by={sort_by} source={source}"
+                results.append(check(label, max(counts), LISTING_MAX_QUERIES))
+                if counts[0] != counts[1]:
+                    print(f"[失败] {label}: 查询数量随每页数量变化 {counts}")
+                    results.append(False)
+
+        db.expunge_all()
+        counter.reset()
+        featured = await service.get_featured_products(limit=3)
+        for product in featured:
+            _ = [t.name for t in product.tags]
+            _ = product.post.source.name
+        results.append(check("精选产品", counter.count, FEATURED_MAX_QUERIES))
+
+        await service.refresh_featured_snapshot()
+        db.expunge_all()
+        counter.reset()
+        cards = await service.get_featured_cards()
+        _ = [(card["name"], [t["name"] for t in card["tags"]], card["created_at"]) for card in cards]
+        results.append(check("首页精选快照", counter.count, FEATURED_SNAPSHOT_MAX_QUERIES))
+
+        db.expunge_all()
+        counter.reset()
+        product = await service.get_product_detail(1)
+        _ = [t.name for t in product.tags]
+        _ = product.post.source.name
+        _ = product.business_model
+        results.append(check("产品详情", counter.count, DETAIL_MAX_QUERIES))
+
+        counts = []
+        for ids in [[3, 1, 2], list(range(40, 0, -1))]:
+            db.expunge_all()
+            counter.reset()
+            products = await service.get_product_details(ids)
+            _ = [ProductService.format_product_detail(product) for product in products]
+            counts.append(counter.count)
+            if [product.id for product in products] != ids:
+                print("[失败] 批量产品详情: 返回顺序与请求不一致")
+                results.append(False)
+        results.append(check("批量产品详情", max(counts), BATCH_DETAIL_MAX_QUERIES))
+
+        count_cache.clear()
+        counter.reset()
+        stats = await SourceService(db).get_source_stats()
+        _ = [(item["name"], item["post_count"], item["product_count"]) for item in stats]
+        results.append(check("来源统计", counter.count, SOURCE_STATS_MAX_QUERIES))
+    finally:
+        db.close()
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_checks())
+    sys.exit(0 if success else 1)
@@ -0,0 +1,88 @@
+"""
+测试响应缓存中间件的脚本
+
+使用进程内缓存后端和一个按请求顺序返回ID的最小应用，检查：
+- 同名参数顺序不同的请求（如批量接口的 ids=1&ids=3 与 ids=3&ids=1）不共用缓存，结果保持请求顺序；
+- 不同参数名的顺序不影响缓存命中；
+- 数据版本号变化后缓存失效。
+"""
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.response_cache import MemoryResponseCache, ResponseCacheMiddleware
+
+
+def batch(request):
+    """按请求顺序返回ID，模拟 /api/products/batch"""
+    return JSONResponse({"ids": [int(value) for value in request.query_params.getlist("ids")]})
+
+
+def products(request):
+    """返回查询参数，模拟 /api/products"""
+    return JSONResponse(dict(request.query_params))
+
+
+def create_client(cache: MemoryResponseCache) -> TestClient:
+    """创建挂载响应缓存中间件的测试应用"""
+    app = Starlette(routes=[
+        Route("/api/products/batch", batch),
+        Route("/api/products", products),
+    ])
+    app.add_middleware(ResponseCacheMiddleware, cache=cache)
+    return TestClient(app)
+
+
+def check(name: str, passed: bool, detail: str = "") -> bool:
+    """打印检查结果"""
+    status = "通过" if passed else "失败"
+    print(f"[{status}] {name}{': ' + detail if detail else ''}")
+    return passed
+
+
+def run_checks() -> bool:
+    """执行所有响应缓存检查"""
+    cache = MemoryResponseCache()
+    client = create_client(cache)
+    results = []
+
+    first = client.get("/api/products/batch?ids=3&ids=1")
+    second = client.get("/api/products/batch?ids=1&ids=3")
+    results.append(check(
+        "批量接口: 同名参数顺序不同时不共用缓存",
+        second.headers["X-Cache"] == "MISS" and second.json()["ids"] == [1, 3],
+        f"X-Cache {second.headers['X-Cache']}，结果 {second.json()['ids']}（首次请求 {first.json()['ids']}）"
+    ))
+    repeat = client.get("/api/products/batch?ids=1&ids=3")
+    results.append(check(
+        "批量接口: 相同顺序的请求命中缓存",
+        repeat.headers["X-Cache"] == "HIT" and repeat.json()["ids"] == [1, 3],
+        f"X-Cache {repeat.headers['X-Cache']}，结果 {repeat.json()['ids']}"
+    ))
+
+    client.get("/api/products?page=2&sort_by=popular")
+    swapped = client.get("/api/products?sort_by=popular&page=2")
+    results.append(check(
+        "列表接口: 不同参数名的顺序不影响命中", swapped.headers["X-Cache"] == "HIT",
+        f"X-Cache {swapped.headers['X-Cache']}"
+    ))
+
+    cache.bump_version()
+    after_bump = client.get("/api/products?page=2&sort_by=popular")
+    results.append(check(
+        "版本号变化后缓存失效", after_bump.headers["X-Cache"] == "MISS",
+        f"X-Cache {after_bump.headers['X-Cache']}"
+    ))
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = run_checks()
+    sys.exit(0 if success else 1)
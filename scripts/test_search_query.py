@@ -0,0 +1,158 @@
+"""
+测试产品全文搜索的脚本
+
+- 检查 build_postgresql_query 构造的SQL：每个词条单独绑定（已转义的）子串模式，词条之间为"与"关系，
+  产品文本和标签名称都用 ILIKE 匹配；
+- 用同一组测试数据在 SQLite（内存数据库）和 PostgreSQL（设置 TEST_POSTGRES_URL 时，需要 pg_trgm 扩展）上
+  执行相同的查询，检查两种数据库的结果一致：多个词条可以分别命中名称和标签，词的一部分和中文词都能匹配。
+
+用法: TEST_POSTGRES_URL=postgresql+psycopg2://user@host/dbname python scripts/test_search_query.py
+"""
+import sys
+import os
+import asyncio
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models import Source, Post, Product, Tag
+from app.services.product_card_service import ProductCardService
+from app.services.search_service import SearchService
+
+# 测试产品：名称、描述、目标受众、标签
+PRODUCTS = [
+    ("Notebook Pro", "A data tool", "", ["collaborative"]),
+    ("Notebook Lite", "A data tool", "", []),
+    ("小红书数据助手", "帮助中小企业分析社交媒体数据的工具", "营销团队", []),
+    ("100% Uptime", "monitor_tool for sites", "", []),
+]
+
+# 查询及期望命中的产品（不关心顺序）
+EXPECTED = {
+    "notebook collaborative": {"Notebook Pro"},  # 名称和标签分别命中
+    "note": {"Notebook Pro", "Notebook Lite"},  # 词的一部分
+    "NOTEBOOK": {"Notebook Pro", "Notebook Lite"},  # 忽略大小写
+    "collab": {"Notebook Pro"},  # 标签名称的一部分
+    "社交媒体": {"小红书数据助手"},  # 描述中的中文词
+    "营销": {"小红书数据助手"},  # 两字中文词
+    "100%": {"100% Uptime"},  # LIKE 通配符按原字符匹配
+    "monitor_": {"100% Uptime"},
+    "tool data": {"Notebook Pro", "Notebook Lite"},
+    "xyz": set(),
+}
+
+
+def check(name: str, passed: bool, detail: str = "") -> bool:
+    """打印检查结果"""
+    status = "通过" if passed else "失败"
+    print(f"[{status}] {name}{': ' + detail if detail else ''}")
+    return passed
+
+
+def check_postgresql_query() -> bool:
+    """检查 PostgreSQL 搜索SQL的构造"""
+    terms = SearchService.parse_terms('"Notebook" -collaborative OR 100%')
+    cte, params = SearchService.build_postgresql_query(terms)
+    compiled = str(text(cte + "SELECT id, score FROM matched").compile(dialect=postgresql.dialect()))
+    conditions = cte.split(" WHERE ", 1)[1]
+
+    results = [
+        check("PostgreSQL: 词条与SQLite一致", terms == ["Notebook", "collaborative", "100%"], f"{terms}"),
+        check(
+            "PostgreSQL: 每个词条单独绑定转义后的子串模式",
+            params == {"like0": "%Notebook%", "like1": "%collaborative%", "like2": "%100\\%%"}
+            and all(f"%(like{i})s" in compiled for i in range(3)),
+            f"{params}"
+        ),
+        check(
+            "PostgreSQL: 词条之间为\"与\"关系",
+            conditions.count("p.id IN (") == 3 and conditions.count(") AND p.id IN (") == 2
+        ),
+        check(
+            "PostgreSQL: 产品文本和标签名称都用 ILIKE 匹配",
+            all(
+                f"search_text ILIKE :like{i}" in cte and f"t.name ILIKE :like{i}" in cte
+                for i in range(3)
+            )
+        ),
+    ]
+    return all(results)
+
+
+def create_test_session(engine):
+    """创建表并写入测试产品"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+
+    source = Source(name="HackerNews", url="https://news.ycombinator.com/", active=True)
+    db.add(source)
+    db.flush()
+    tags = {}
+    for i, (name, description, target_audience, tag_names) in enumerate(PRODUCTS):
+        post = Post(
+            source_id=source.id,
+            original_id=str(i),
+            title=f"Show HN: {name}",
+            url=f"https://example.com/{i}",
+            collected_at=datetime.utcnow()
+        )
+        db.add(post)
+        db.flush()
+        product = Product(
+            post_id=post.id, name=name, description=description, target_audience=target_audience
+        )
+        product.tags = [
+            tags.setdefault(tag_name, Tag(name=tag_name, normalized_name=tag_name)) for tag_name in tag_names
+        ]
+        db.add(product)
+    db.commit()
+    ProductCardService.rebuild_all(db)
+    return db
+
+
+async def check_search(label: str, engine) -> bool:
+    """在指定数据库上执行所有查询并与期望结果比较"""
+    db = create_test_session(engine)
+    results = []
+    try:
+        for query, expected in EXPECTED.items():
+            data = await SearchService(db).search_products(query)
+            names = {product.name for product in data["products"]}
+            results.append(check(
+                f"{label}: \"{query}\"", names == expected and data["total"] == len(expected),
+                f"{sorted(names)}"
+            ))
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+    return all(results)
+
+
+async def run_checks() -> bool:
+    """执行所有搜索检查"""
+    sqlite_engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    results = [check_postgresql_query(), await check_search("SQLite", sqlite_engine)]
+
+    postgres_url = os.environ.get("TEST_POSTGRES_URL")
+    if postgres_url:
+        results.append(await check_search("PostgreSQL", create_engine(postgres_url)))
+    else:
+        print("[跳过] PostgreSQL: 未设置 TEST_POSTGRES_URL")
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_checks())
+    sys.exit(0 if success else 1)
@@ -0,0 +1,101 @@
+"""
+测试新标签相似度复用（TAG_CANONICALIZE_THRESHOLD）的脚本
+
+使用内存SQLite数据库，检查处理产品标签时拼写相近的不同技术不会被合并到已有标签
+（如 "preact" 与 "react" 的相似度为0.91），而完全相同的标签仍然复用。
+"""
+import sys
+import os
+import asyncio
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models import Source, Post, Product, Tag
+from app.services.product_service import ProductService
+
+# 除默认配置外，额外检查的阈值
+STRICT_THRESHOLD = 0.97
+
+
+def create_test_session():
+    """创建内存数据库，包含已有标签 "react" 和两个产品"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+
+    source = Source(name="HackerNews", url="https://news.ycombinator.com/", active=True)
+    db.add(source)
+    db.add(Tag(name="react", normalized_name="react"))
+    db.flush()
+    for i in range(2):
+        post = Post(
+            source_id=source.id,
+            original_id=str(i),
+            title=f"Show HN: Product {i}",
+            url=f"https://example.com/{i}",
+            collected_at=datetime.utcnow()
+        )
+        db.add(post)
+        db.flush()
+        db.add(Product(post_id=post.id, name=f"Product {i}", description=f"Description {i}"))
+    db.commit()
+    return db
+
+
+def check(name: str, passed: bool, detail: str = "") -> bool:
+    """打印检查结果"""
+    status = "通过" if passed else "失败"
+    print(f"[{status}] {name}{': ' + detail if detail else ''}")
+    return passed
+
+
+async def check_threshold(label: str, threshold: float) -> bool:
+    """在指定阈值下处理标签，检查 preact 独立成标签、react 复用已有标签"""
+    original_threshold = settings.TAG_CANONICALIZE_THRESHOLD
+    settings.TAG_CANONICALIZE_THRESHOLD = threshold
+    db = create_test_session()
+    try:
+        service = ProductService(db)
+        first, second = db.query(Product).order_by(Product.id).all()
+        await service._process_tags(first, ["Preact"])
+        await service._process_tags(second, ["React"])
+        db.commit()
+
+        tag_names = sorted(tag.normalized_name for tag in db.query(Tag).all())
+        first_tags = [tag.normalized_name for tag in first.tags]
+        second_tags = [tag.normalized_name for tag in second.tags]
+        results = [
+            check(f"{label}: preact 不合并到 react", first_tags == ["preact"], f"产品标签 {first_tags}"),
+            check(f"{label}: 相同标签复用", second_tags == ["react"], f"产品标签 {second_tags}"),
+            check(f"{label}: 标签表", tag_names == ["preact", "react"], f"{tag_names}"),
+        ]
+        return all(results)
+    finally:
+        settings.TAG_CANONICALIZE_THRESHOLD = original_threshold
+        db.close()
+
+
+async def run_checks() -> bool:
+    """执行所有标签复用检查"""
+    results = [
+        await check_threshold(f"默认阈值 {settings.TAG_CANONICALIZE_THRESHOLD}", settings.TAG_CANONICALIZE_THRESHOLD),
+        await check_threshold(f"阈值 {STRICT_THRESHOLD}", STRICT_THRESHOLD),
+    ]
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_checks())
+    sys.exit(0 if success else 1)